@@ -11,6 +11,13 @@ if curl -s http://localhost:8000/health/ > /dev/null; then
     local_check=true
 fi
 
+# Readiness: database, warmed template cache and email backlog (503 if not ready)
+if curl -sf http://localhost:8000/health/ready > /dev/null; then
+    echo "Application is ready to serve (Local)"
+else
+    echo "Application is not ready (Local): $(curl -s http://localhost:8000/health/ready)"
+fi
+
 sleep 5
 
 if curl -s http://new.solathomas.com/health/ > /dev/null; then
@@ -34,8 +34,18 @@ terminate_gunicorn() {
     pkill -f gunicorn
 }
 
+# Function to terminate the email dispatcher (it finishes its current batch first)
+terminate_email_dispatcher() {
+    echo "Terminating email dispatcher..."
+    if [ -f /home/esolathomas/email_dispatcher.pid ]; then
+        kill -TERM $(cat /home/esolathomas/email_dispatcher.pid) 2>/dev/null || true
+        rm -f /home/esolathomas/email_dispatcher.pid
+    fi
+}
+
 # Main shutdown sequence
 echo "Starting graceful shutdown..."
 terminate_runner
 terminate_gunicorn
+terminate_email_dispatcher
 echo "Shutdown complete"
@@ -106,31 +106,63 @@ else:
 " || echo -e "${RED}Failed to create superuser. Will continue without it.${NC}"
 fi
 
-# Collect static files with clear flag to ensure fresh copy
+# Generate responsive image variants (unchanged images are skipped)
+echo -e "${YELLOW}Generating responsive image variants...${NC}"
+python manage.py build_images
+
+# The templates load Bootstrap and Font Awesome from static/vendor/, which is
+# committed; install it only if a checkout lacks it, and don't serve
+# unstyled pages when that fails
+if [ ! -f static/vendor/bootstrap/css/bootstrap.min.css ]; then
+    echo -e "${YELLOW}Installing vendored Bootstrap and Font Awesome...${NC}"
+    if ! python manage.py vendor_assets --no-rewrite; then
+        echo -e "${RED}Could not install Bootstrap and Font Awesome into static/vendor/. Aborting startup.${NC}"
+        exit 1
+    fi
+fi
+
+# Combine the SVG icons into the sprite the {% icon %} tag refers to
+echo -e "${YELLOW}Building icon sprite...${NC}"
+python manage.py build_icons
+
+# Collect static files; only files whose content changed since the last run
+# are copied and compressed (pass --clear to force a full rebuild)
 echo -e "${YELLOW}Collecting static files...${NC}"
-python manage.py collectstatic --no-input --clear
+python manage.py collectstatic --no-input
 
 # Ensure proper permissions on static files
 echo -e "${YELLOW}Setting proper permissions on static files...${NC}"
 chmod -R 755 /home/esolathomas/ws/sola_thomas_website/staticfiles/
 
-# Debug static files
-echo -e "${YELLOW}Debugging static files...${NC}"
-python /home/esolathomas/ws/scripts/check_static_files.py
+# Write sitemap.xml and robots.txt; lastmod only moves for pages this deploy changed
+echo -e "${YELLOW}Building sitemap...${NC}"
+python manage.py build_sitemap || echo -e "${RED}Sitemap build failed; serving one without lastmod.${NC}"
+
+# Check that every asset the pages reference exists (reports only; startup continues)
+echo -e "${YELLOW}Checking static asset references...${NC}"
+python manage.py check_assets || echo -e "${RED}Some pages reference missing static files.${NC}"
 
-# Check image files specifically
-echo -e "${YELLOW}Checking image files...${NC}"
-python /home/esolathomas/ws/scripts/check_image_files.py
+# Start the email dispatcher: views only queue mail in the outbox table
+# (core.outbox) and this process sends it, with retries and backoff
+echo -e "${YELLOW}Starting email dispatcher...${NC}"
+if [ -f /home/esolathomas/email_dispatcher.pid ]; then
+    kill -TERM $(cat /home/esolathomas/email_dispatcher.pid) 2>/dev/null || true
+fi
+nohup python manage.py dispatch_email >> /home/esolathomas/out/email_dispatcher.log 2>&1 &
+echo $! > /home/esolathomas/email_dispatcher.pid
 
 echo -e "${GREEN}Starting Gunicorn server...${NC}"
 
-# Start gunicorn in the foreground
+# Start gunicorn in the foreground; gunicorn.conf.py warms each new worker up
+# (imports, templates, one render of every public page) before it serves.
+# SERVER_PROFILE picks the worker class and application: sync (default),
+# gevent or asgi (uvicorn workers); see gunicorn.conf.py
+export SERVER_PROFILE=${SERVER_PROFILE:-sync}
 exec gunicorn \
+    --config gunicorn.conf.py \
     --pid /home/esolathomas/gunicorn.pid \
     --bind 0.0.0.0:8000 \
     --workers 1 \
-    --worker-class sync \
-    --worker-connections 100 \
     --timeout 120 \
     --keep-alive 5 \
     --max-requests 200 \
@@ -138,5 +170,4 @@ exec gunicorn \
     --log-level info \
     --access-logfile - \
     --error-logfile - \
-    --capture-output \
-    sola_thomas_website.wsgi:application
\ No newline at end of file
+    --capture-output
\ No newline at end of file
@@ -11,6 +11,7 @@ from datetime import datetime, timedelta
 from .models import WorkOrder, Invoice, Review, ServiceNote, ServiceRequest
 from .forms import ReviewForm, InvoiceForm, CustomUserForm, ServiceForm, ServiceNoteForm, ProcessRequestForm
 from .tokens import account_activation_token
+from core.outbox import dispatch_pending
 
 class ModelTests(TestCase):
     def setUp(self):
@@ -470,6 +471,8 @@ class UtilsTests(TestCase):
         
         # Test email sending
         send_service_notification(self.work_order)
+        self.assertEqual(len(mail.outbox), 0)  # only queued
+        dispatch_pending()
         
         # Check that one message has been sent
         self.assertEqual(len(mail.outbox), 1)
@@ -485,6 +488,8 @@ class UtilsTests(TestCase):
         
         # Test email sending
         send_invoice_notification(self.invoice)
+        self.assertEqual(len(mail.outbox), 0)  # only queued
+        dispatch_pending()
         
         # Check that one message has been sent
         self.assertEqual(len(mail.outbox), 1)
@@ -500,6 +505,8 @@ class UtilsTests(TestCase):
         
         # Test email sending
         send_note_response_notification(self.note)
+        self.assertEqual(len(mail.outbox), 0)  # only queued
+        dispatch_pending()
         
         # Check that one message has been sent
         self.assertEqual(len(mail.outbox), 1)
@@ -515,6 +522,8 @@ class UtilsTests(TestCase):
         
         # Test email sending
         send_request_status_notification(self.service_request)
+        self.assertEqual(len(mail.outbox), 0)  # only queued
+        dispatch_pending()
         
         # Check that one message has been sent
         self.assertEqual(len(mail.outbox), 1)
@@ -525,6 +534,18 @@ class UtilsTests(TestCase):
         # Verify the message is sent to the right person
         self.assertEqual(mail.outbox[0].to[0], self.user.email)
 
+    def test_returning_to_a_status_notifies_again(self):
+        from .utils import send_request_status_notification
+
+        for status in ('approved', 'pending', 'approved'):
+            self.service_request.status = status
+            self.service_request.processed_at = timezone.now()
+            self.service_request.save()
+            send_request_status_notification(self.service_request)
+            send_request_status_notification(self.service_request)  # a resubmitted form
+        dispatch_pending()
+        self.assertEqual(len(mail.outbox), 3)
+
 class TokenTests(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(
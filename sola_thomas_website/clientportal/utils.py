@@ -1,11 +1,12 @@
-from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
 from django.utils import timezone
 
+from core.outbox import enqueue
+
 def send_service_notification(service):
     """
-    Send a notification email when a new service is created.
+    Queue a notification email when a new service is created.
     """
     mail_subject = 'New Work Order Added to Your Account'
     message = render_to_string('clientportal/emails/service_notification.html', {
@@ -14,18 +15,17 @@ def send_service_notification(service):
         'domain': settings.SITE_DOMAIN,
     })
     
-    return send_mail(
+    return enqueue(
         mail_subject,
         message,
-        settings.DEFAULT_FROM_EMAIL,
-        [service.user.email],
-        fail_silently=False,
+        service.user.email,
         html_message=message,
+        idempotency_key=f'service-notification:{service.pk}',
     )
 
 def send_invoice_notification(invoice):
     """
-    Send a notification email when a new invoice is created.
+    Queue a notification email when a new invoice is created.
     """
     mail_subject = 'New Invoice from Sola-Thomas Solutions'
     message = render_to_string('clientportal/emails/invoice_notification.html', {
@@ -34,18 +34,17 @@ def send_invoice_notification(invoice):
         'domain': settings.SITE_DOMAIN,
     })
     
-    return send_mail(
+    return enqueue(
         mail_subject,
         message,
-        settings.DEFAULT_FROM_EMAIL,
-        [invoice.user.email],
-        fail_silently=False,
+        invoice.user.email,
         html_message=message,
+        idempotency_key=f'invoice-notification:{invoice.pk}',
     )
 
 def send_note_response_notification(note):
     """
-    Send a notification email when admin responds to a user's note.
+    Queue a notification email when admin responds to a user's note.
     """
     mail_subject = 'Response to Your Note from Sola-Thomas Solutions'
     message = render_to_string('clientportal/emails/note_response_notification.html', {
@@ -53,18 +52,17 @@ def send_note_response_notification(note):
         'domain': settings.SITE_DOMAIN,
     })
     
-    return send_mail(
+    return enqueue(
         mail_subject,
         message,
-        settings.DEFAULT_FROM_EMAIL,
-        [note.user.email],
-        fail_silently=False,
+        note.user.email,
         html_message=message,
+        idempotency_key=f'note-response:{note.pk}:{note.response_date}',
     )
 
 def send_request_status_notification(service_request):
     """
-    Send a notification email when a service request status is updated.
+    Queue a notification email when a service request status is updated.
     """
     status_display = service_request.get_status_display()
     mail_subject = f'Service Request {status_display}: {service_request.title}'
@@ -74,11 +72,14 @@ def send_request_status_notification(service_request):
         'domain': settings.SITE_DOMAIN,
     })
     
-    return send_mail(
+    return enqueue(
         mail_subject,
         message,
-        settings.DEFAULT_FROM_EMAIL,
-        [service_request.user.email],
-        fail_silently=False,
+        service_request.user.email,
         html_message=message,
+        # the time of the change, so going back to an earlier status notifies again
+        idempotency_key=(
+            f'service-request-status:{service_request.pk}:{service_request.status}:'
+            f'{service_request.processed_at or service_request.updated_at}'
+        ),
     )
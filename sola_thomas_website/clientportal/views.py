@@ -9,7 +9,7 @@ from django.template.loader import render_to_string
 from django.utils import timezone
 from django.conf import settings
 from django.db.models import Exists, OuterRef, Count, Q
-from django.core.mail import send_mail
+from core.outbox import enqueue
 from .models import WorkOrder, Invoice, Review, ServiceNote, ServiceRequest
 from .forms import ReviewForm, InvoiceForm, CustomUserForm, ServiceForm, ServiceNoteForm, ServiceNoteResponseForm, ServiceRequestForm, ProcessRequestForm
 from .tokens import account_activation_token
@@ -88,21 +88,21 @@ def admin_dashboard(request):
             user.is_active = False  # User is inactive until they activate account
             user.save()
             
-            # Send activation email using settings.SITE_DOMAIN
+            # Queue the activation email (core.outbox) using settings.SITE_DOMAIN
             mail_subject = 'Activate your Sola-Thomas account'
+            token = account_activation_token.make_token(user)
             message = render_to_string('clientportal/account_activation_email.html', {
                 'user': user,
                 'domain': settings.SITE_DOMAIN,
                 'uid': urlsafe_base64_encode(force_bytes(user.pk)),
-                'token': account_activation_token.make_token(user),
+                'token': token,
             })
-            send_mail(
+            enqueue(
                 mail_subject,
                 message,
-                settings.DEFAULT_FROM_EMAIL,
-                [user.email],
-                fail_silently=False,
+                user.email,
                 html_message=message,
+                idempotency_key=f'activation:{user.pk}:{token}',
             )
             
             messages.success(request, f"User {user.username} created successfully. An activation email has been sent.")
@@ -298,22 +298,22 @@ def resend_activation_email(request, user_id):
     pending_user = get_object_or_404(User, pk=user_id, is_active=False)
     
     if request.method == 'POST':
-        # Send activation email using settings.SITE_DOMAIN
+        # Queue the activation email (core.outbox) using settings.SITE_DOMAIN
         mail_subject = 'Activate your Sola-Thomas account'
+        token = account_activation_token.make_token(pending_user)
         message = render_to_string('clientportal/account_activation_email.html', {
             'user': pending_user,
             'domain': settings.SITE_DOMAIN,
             'uid': urlsafe_base64_encode(force_bytes(pending_user.pk)),
-            'token': account_activation_token.make_token(pending_user),
+            'token': token,
         })
         
-        send_mail(
+        enqueue(
             mail_subject,
             message,
-            settings.DEFAULT_FROM_EMAIL,
-            [pending_user.email],
-            fail_silently=False,
+            pending_user.email,
             html_message=message,
+            idempotency_key=f'activation:{pending_user.pk}:{token}',
         )
         
         messages.success(request, f"Activation email resent to {pending_user.username} ({pending_user.email}).")
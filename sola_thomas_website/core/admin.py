@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Contact
+from .models import Contact, OutboxMessage
 
 @admin.register(Contact)
 class ContactAdmin(admin.ModelAdmin):
@@ -7,3 +7,10 @@ class ContactAdmin(admin.ModelAdmin):
     list_filter = ('is_read', 'created_at')
     search_fields = ('name', 'email', 'message')
     date_hierarchy = 'created_at'
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to_email', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('subject', 'to_email', 'idempotency_key')
+    readonly_fields = ('idempotency_key', 'attempts', 'claimed_at', 'last_error', 'created_at', 'sent_at')
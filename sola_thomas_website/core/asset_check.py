@@ -0,0 +1,175 @@
+"""
+Offline checks of the assets pages refer to.
+
+Pages are either rendered in-process through their views or read from a
+plain HTML site. Every ``href``/``src``/``srcset`` and every ``url()`` in the
+stylesheets they load is resolved to a file on disk; references that don't
+resolve are reported, along with how many requests and how many bytes each
+page costs a first-time visitor.
+"""
+import gzip
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from html.parser import HTMLParser
+from pathlib import Path
+
+from .assets import SiteResolver, StaticResolver, css_references, html_references, is_local
+from .routes import public_urls
+from .static_build import render_url
+
+# Served compressed, so their transfer size is their gzipped size
+COMPRESSIBLE_EXTENSIONS = ('.html', '.css', '.js', '.svg', '.json', '.xml', '.txt', '.map')
+FONT_EXTENSIONS = ('.woff2', '.woff', '.ttf', '.otf', '.eot')
+NOSCRIPT_RE = re.compile(r'<noscript\b.*?</noscript>', re.IGNORECASE | re.S)
+
+
+@lru_cache(maxsize=1024)
+def _transfer_size(path, mtime):
+    data = Path(path).read_bytes()
+    if path.endswith(COMPRESSIBLE_EXTENSIONS):
+        return len(gzip.compress(data, compresslevel=9, mtime=0))
+    return len(data)
+
+
+def transfer_size(path):
+    """Bytes sent to transfer a file, assuming text formats are gzipped."""
+    path = Path(path)
+    return _transfer_size(str(path), path.stat().st_mtime)
+
+
+class PageReport:
+    """The assets one page loads, and the references that don't resolve."""
+
+    def __init__(self, page, html):
+        self.page = page
+        self.html_bytes = len(gzip.compress(html.encode(), compresslevel=9, mtime=0))
+        self.assets = {}  # static path -> (kind, bytes)
+        self.candidates = set()  # srcset alternatives; they exist but aren't all fetched
+        self.external = []
+        self.missing = []  # (reference, where it was found)
+        self.render_blocking = render_blocking(html)
+        self.error = None
+
+    @property
+    def requests(self):
+        return 1 + len(self.assets) + len(self.external)
+
+    @property
+    def weight(self):
+        return self.html_bytes + sum(size for _kind, size in self.assets.values())
+
+    def largest(self, count=3, kind=None):
+        """The heaviest assets (of one ``kind``) as ``(bytes, static_path)``, largest first."""
+        assets = [(size, name) for name, (k, size) in self.assets.items() if kind in (None, k)]
+        return sorted(assets, reverse=True)[:count]
+
+
+class _RenderBlockingParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocking = []
+        self._in_head = True
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'body':
+            self._in_head = False
+        elif tag == 'link' and 'stylesheet' in (attrs.get('rel') or '').lower().split():
+            if attrs.get('media', 'all') in ('all', 'screen') and attrs.get('href'):
+                self.blocking.append(attrs['href'])
+        elif tag == 'script' and self._in_head and attrs.get('src'):
+            if not {'async', 'defer'} & set(attrs) and attrs.get('type') != 'module':
+                self.blocking.append(attrs['src'])
+
+
+def render_blocking(html):
+    """
+    The stylesheets and synchronous ``<head>`` scripts a browser must fetch
+    before it can first paint ``html``. Stylesheets inside ``<noscript>`` are
+    skipped, as browsers with scripting never see them.
+    """
+    parser = _RenderBlockingParser()
+    parser.feed(NOSCRIPT_RE.sub('', html))
+    parser.close()
+    return parser.blocking
+
+
+def _css_reference_kind(url):
+    if url.split('?')[0].split('#')[0].lower().endswith(FONT_EXTENSIONS):
+        return 'font'
+    return 'stylesheet' if url.split('?')[0].endswith('.css') else 'image'
+
+
+def check_page(page, html, resolver):
+    """
+    Resolve every reference ``html`` makes, following stylesheets, and return
+    a PageReport. ``page`` is the page's URL (or path, for a plain site).
+    """
+    report = PageReport(page, html)
+    pending = [(kind, url, page, page) for kind, url in html_references(html)]
+    while pending:
+        kind, url, base, referrer = pending.pop(0)
+        if not is_local(url):
+            if url.startswith(('http://', 'https://', '//')) and url not in report.external:
+                report.external.append(url)
+            continue
+        name = resolver.static_path(url, base)
+        if name is None or name in report.assets or (kind == 'candidate' and name in report.candidates):
+            continue
+        source = resolver.resolve(url, base)
+        if source is None:
+            report.missing.append((url, referrer))
+            continue
+        if kind == 'candidate':
+            report.candidates.add(name)
+            continue
+        report.assets[name] = (kind, transfer_size(source))
+        if source.suffix == '.css':
+            css = source.read_text(encoding='utf-8', errors='replace')
+            css_url = resolver.url_for(name)
+            pending.extend((_css_reference_kind(ref), ref, css_url, name) for ref in css_references(css))
+    return report
+
+
+def check_pages(pages, resolver, workers=None):
+    """Check ``(page, html)`` pairs concurrently; returns PageReports in order."""
+    pages = list(pages)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda item: check_page(item[0], item[1], resolver), pages))
+
+
+def django_pages():
+    """
+    Yield ``(url, html)`` for every public page, rendered through its view.
+    Pages that fail to render are yielded with ``html`` set to the exception.
+    """
+    for url, _name in public_urls():
+        try:
+            yield url, render_url(url)[0]
+        except Exception as e:
+            yield url, e
+
+
+def site_pages(root):
+    """Yield ``(path, html)`` for every HTML file in a plain site directory."""
+    root = Path(root)
+    for path in sorted(root.rglob('*.html')):
+        rel = path.relative_to(root)
+        if not any(part.startswith('.') for part in rel.parts):
+            yield rel.as_posix(), path.read_text(encoding='utf-8')
+
+
+def check_django_pages(workers=None):
+    rendered = list(django_pages())
+    failed = [(url, error) for url, error in rendered if isinstance(error, Exception)]
+    reports = check_pages([(url, html) for url, html in rendered if isinstance(html, str)], StaticResolver(), workers)
+    for url, error in failed:
+        report = PageReport(url, '')
+        report.error = error
+        reports.append(report)
+    return reports
+
+
+def check_site(root, workers=None):
+    return check_pages(site_pages(root), SiteResolver(root), workers)
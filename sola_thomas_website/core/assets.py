@@ -0,0 +1,217 @@
+"""
+Helpers for finding the local assets a rendered page or stylesheet refers to.
+
+Shared by the static build commands so that every stage agrees on what counts
+as a reference and where on disk it lives.
+"""
+import hashlib
+import posixpath
+import re
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+
+CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)(?P<url>[^'")]+)\1\s*\)""")
+CSS_IMPORT_RE = re.compile(r"""@import\s+(['"])(?P<url>[^'"]+)\1""")
+
+
+def file_hash(path):
+    """Return the sha256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_local(url):
+    """True for references served by us rather than a CDN, data: URI or anchor."""
+    if not url or url.startswith(('#', 'data:', 'mailto:', 'tel:', 'javascript:')):
+        return False
+    parts = urlsplit(url)
+    return not parts.scheme and not parts.netloc
+
+
+def css_references(css):
+    """Return the url() and @import targets in a stylesheet, in order."""
+    urls = [m.group('url').strip() for m in CSS_URL_RE.finditer(css)]
+    urls += [m.group('url').strip() for m in CSS_IMPORT_RE.finditer(css)]
+    return [url for url in urls if not url.startswith('data:')]
+
+
+class ReferenceParser(HTMLParser):
+    """
+    Collect asset references from an HTML document.
+
+    Each reference is a ``(kind, url)`` tuple where kind is one of
+    ``stylesheet``, ``script``, ``image``, ``candidate`` (an alternative from a
+    ``srcset``, of which the browser fetches one), ``icon``, ``preload`` or
+    ``link``.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.references = []
+        self._in_style = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'link' and attrs.get('href'):
+            rel = (attrs.get('rel') or '').lower().split()
+            if 'stylesheet' in rel:
+                kind = 'stylesheet'
+            elif 'icon' in rel or 'apple-touch-icon' in rel:
+                kind = 'icon'
+            elif 'preload' in rel:
+                kind = 'preload'
+            else:
+                kind = 'link'
+            self.references.append((kind, attrs['href']))
+        elif tag == 'script' and attrs.get('src'):
+            self.references.append(('script', attrs['src']))
+        elif tag in ('img', 'source', 'video', 'audio'):
+            if attrs.get('src'):
+                self.references.append(('image', attrs['src']))
+            for candidate in (attrs.get('srcset') or '').split(','):
+                url = candidate.strip().split(' ')[0]
+                if url:
+                    self.references.append(('candidate', url))
+        elif tag == 'style':
+            self._in_style = True
+        if attrs.get('style'):
+            for url in css_references(attrs['style']):
+                self.references.append(('image', url))
+
+    def handle_endtag(self, tag):
+        if tag == 'style':
+            self._in_style = False
+
+    def handle_data(self, data):
+        if self._in_style:
+            for url in css_references(data):
+                self.references.append(('image', url))
+
+
+class _TagParser(HTMLParser):
+    def handle_starttag(self, tag, attrs):
+        self.tag = tag
+        self.attrs = dict(attrs)
+
+    handle_startendtag = handle_starttag
+
+
+def tag_attributes(markup):
+    """Return the attributes of the single start tag in ``markup`` as a dict."""
+    parser = _TagParser(convert_charrefs=True)
+    parser.feed(markup)
+    parser.close()
+    return getattr(parser, 'attrs', {})
+
+
+def rebase_url(url, stylesheet_href):
+    """
+    Rewrite a url() from a stylesheet so it still works when the rule is moved
+    into a page that links the stylesheet as ``stylesheet_href``.
+    """
+    if not is_local(url) or url.startswith('/'):
+        return url
+    return posixpath.normpath(posixpath.join(posixpath.dirname(stylesheet_href), url))
+
+
+def html_references(html):
+    """Return ``(kind, url)`` asset references found in an HTML document."""
+    parser = ReferenceParser()
+    parser.feed(html)
+    parser.close()
+    return parser.references
+
+
+class StaticResolver:
+    """
+    Map URLs under ``STATIC_URL`` to their source files via the staticfiles finders.
+
+    Fingerprinted names from a collected manifest (``css/theme.1a2b3c.css``)
+    resolve to the source file they were hashed from.
+    """
+
+    def __init__(self, static_url=None):
+        self.static_url = static_url or settings.STATIC_URL
+        self.hashed_files = getattr(staticfiles_storage, 'hashed_files', {})
+        self.unhashed = {hashed: name for name, hashed in self.hashed_files.items()}
+
+    def static_path(self, url, base=None):
+        """Return the path relative to ``STATIC_URL`` for a reference, or None."""
+        if not is_local(url):
+            return None
+        path = unquote(urlsplit(url).path)
+        if not path.startswith('/') and base:
+            path = posixpath.normpath(posixpath.join(posixpath.dirname(base), path))
+        if not path.startswith(self.static_url):
+            return None
+        return path[len(self.static_url):]
+
+    def resolve(self, url, base=None):
+        """Return the source file for a static reference, or None if it isn't one."""
+        name = self.static_path(url, base)
+        if name is None:
+            return None
+        found = finders.find(name) or finders.find(self.unhashed.get(name, name))
+        return Path(found) if found else None
+
+    def url_for(self, name, page=None):
+        """Return the URL a page should use for the static file ``name``."""
+        return self.static_url + name
+
+    def served_url(self, url, base=None):
+        """
+        The URL the storage serves a static reference at. References worked
+        out from source files (a stylesheet's ``url()`` rebased onto the page)
+        use unhashed names; once collected with a manifest they are served
+        under the hashed one.
+        """
+        name = self.static_path(url, base)
+        if name is None or name not in self.hashed_files:
+            return url
+        return staticfiles_storage.url(name)
+
+
+class SiteResolver:
+    """Map URLs in a plain HTML site (such as ``static_site/``) to files under its root."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def static_path(self, url, base=None):
+        """Return the path relative to the site root for a reference, or None."""
+        if not is_local(url):
+            return None
+        path = unquote(urlsplit(url).path)
+        if path.startswith('/'):
+            path = path.lstrip('/')
+        elif base:
+            path = posixpath.join(posixpath.dirname(base.lstrip('/')), path)
+        path = posixpath.normpath(path)
+        if path.startswith('..'):
+            return None
+        return path
+
+    def resolve(self, url, base=None):
+        """Return the file a reference points at, or None if it isn't local."""
+        name = self.static_path(url, base)
+        if name is None:
+            return None
+        path = self.root / name
+        return path if path.is_file() else None
+
+    def url_for(self, name, page=None):
+        """
+        Return the URL for the file ``name``: relative to ``page`` when given,
+        otherwise relative to the site root.
+        """
+        if page is None:
+            return name
+        return posixpath.relpath(name, posixpath.dirname(page.lstrip('/')) or '.')
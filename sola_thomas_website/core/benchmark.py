@@ -0,0 +1,250 @@
+"""
+Load-test the site under each gunicorn server profile.
+
+``benchmark`` starts gunicorn with one of the ``SERVER_PROFILES`` in
+``gunicorn.conf.py`` (sync, gevent, asgi) on a free local port, waits until
+its workers are warmed up and answering ``/health/``, then has a number of
+concurrent clients request the public pages and the health check over
+keep-alive connections, and reports throughput and latency percentiles.
+
+Those clients read every response at full speed, which a single sync worker
+handles well. With ``slow_clients`` the same load runs while that many more
+clients, like visitors on poor mobile connections, keep trickling requests
+in over ``trickle`` seconds each; a sync worker is tied up reading each of
+them, while gevent and asgi workers go on serving the others.
+
+The clients are threads in this process, so absolute numbers are bounded by
+the machine running both sides; compare profiles against each other on the
+same machine rather than reading them as production capacity.
+"""
+import http.client
+import os
+import runpy
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from importlib.util import find_spec
+
+from django.conf import settings
+
+from .routes import public_urls
+
+GUNICORN_CONFIG = 'gunicorn.conf.py'
+
+
+def server_profiles():
+    """``SERVER_PROFILES`` from gunicorn.conf.py."""
+    return runpy.run_path(str(settings.BASE_DIR / GUNICORN_CONFIG))['SERVER_PROFILES']
+
+
+def available(profile):
+    """Whether the packages ``profile`` runs on are installed."""
+    return find_spec(server_profiles()[profile]['requires']) is not None
+
+
+def benchmark_urls():
+    return [url for url, _name in public_urls()] + ['/health/']
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Result:
+    """Latencies (in seconds) and failures of one profile's run."""
+
+    def __init__(self, profile, latencies, errors, seconds, slow_clients=0):
+        self.profile = profile
+        self.latencies = sorted(latencies)
+        self.errors = errors
+        self.seconds = seconds
+        self.slow_clients = slow_clients
+
+    @property
+    def requests_per_second(self):
+        return len(self.latencies) / self.seconds if self.seconds else 0.0
+
+    def percentile(self, p):
+        """The ``p``th percentile latency in milliseconds."""
+        if not self.latencies:
+            return 0.0
+        index = min(len(self.latencies) - 1, round(p / 100 * (len(self.latencies) - 1)))
+        return self.latencies[index] * 1000
+
+
+class Server:
+    """gunicorn running ``profile`` on a local port, for use as a context manager."""
+
+    def __init__(self, profile, workers=1, port=None, startup_timeout=60):
+        self.profile = profile
+        self.workers = workers
+        self.port = port or free_port()
+        self.startup_timeout = startup_timeout
+        self.process = None
+
+    def __enter__(self):
+        env = dict(os.environ, SERVER_PROFILE=self.profile)
+        # A file rather than a pipe, which would block a chatty server once full
+        self.log = tempfile.TemporaryFile(mode='w+')
+        self.process = subprocess.Popen(
+            [
+                sys.executable, '-m', 'gunicorn',
+                '--config', GUNICORN_CONFIG,
+                '--bind', f'127.0.0.1:{self.port}',
+                '--workers', str(self.workers),
+                '--log-level', 'warning',
+            ],
+            cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.DEVNULL, stderr=self.log,
+        )
+        try:
+            self.wait_until_up()
+        except Exception:
+            self.__exit__(None, None, None)
+            raise
+        return self
+
+    def wait_until_up(self):
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                self.log.seek(0)
+                raise RuntimeError(f"{self.profile} server exited: {self.log.read().strip()[-2000:]}")
+            try:
+                status, _ = fetch(http.client.HTTPConnection('127.0.0.1', self.port, timeout=5), '/health/')
+                if status == 200:
+                    return
+            except OSError:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError(f"{self.profile} server didn't answer /health/ within {self.startup_timeout}s")
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.log.close()
+
+
+def fetch(connection, url, host='localhost'):
+    """Request ``url`` on ``connection`` and read the whole response; returns ``(status, size)``."""
+    connection.request('GET', url, headers={'Host': host, 'Accept-Encoding': 'gzip, br'})
+    response = connection.getresponse()
+    return response.status, len(response.read())
+
+
+def trickle(port, url, host, seconds, pieces=10):
+    """
+    Request ``url`` on a new connection, sending the request in ``pieces``
+    spread over ``seconds``, and read the whole response; returns the status.
+    """
+    request = f'GET {url} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n'.encode()
+    size = -(-len(request) // pieces)
+    with socket.create_connection(('127.0.0.1', port), timeout=30 + seconds) as sock:
+        for offset in range(0, len(request), size):
+            sock.sendall(request[offset:offset + size])
+            time.sleep(seconds / pieces)
+        response = b''
+        while chunk := sock.recv(65536):
+            response += chunk
+    status_line = response.split(b'\r\n', 1)[0].split()
+    if len(status_line) < 2:
+        raise http.client.BadStatusLine(response[:80])
+    return int(status_line[1])
+
+
+def load(port, urls, concurrency, requests, host='localhost', slow_clients=0, trickle_seconds=1.0):
+    """
+    Have ``concurrency`` clients, each on its own keep-alive connection,
+    make ``requests`` requests between them, cycling through ``urls``, while
+    ``slow_clients`` others keep trickling requests in (see ``trickle``).
+    Returns ``(latencies, errors, seconds)``; latencies are the fast clients'.
+    """
+    latencies, errors = [], []
+    lock = threading.Lock()
+    remaining = iter(range(requests))
+
+    def client():
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        while True:
+            with lock:
+                number = next(remaining, None)
+            if number is None:
+                break
+            url = urls[number % len(urls)]
+            start = time.perf_counter()
+            try:
+                status, _size = fetch(connection, url, host)
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                with lock:
+                    errors.append(f'{url}: {e}')
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                if status == 200:
+                    latencies.append(elapsed)
+                else:
+                    errors.append(f'{url}: HTTP {status}')
+        connection.close()
+
+    done = threading.Event()
+
+    def slow_client(number):
+        while not done.is_set():
+            url = urls[number % len(urls)]
+            number += 1
+            try:
+                status = trickle(port, url, host, trickle_seconds)
+                error = None if status == 200 else f'HTTP {status}'
+            except (OSError, http.client.HTTPException) as e:
+                error = e
+            if error is not None and not done.is_set():
+                with lock:
+                    errors.append(f'{url} (slow client): {error}')
+
+    slow = [threading.Thread(target=slow_client, args=(n,)) for n in range(slow_clients)]
+    for thread in slow:
+        thread.start()
+    if slow_clients:
+        # Let the slow clients occupy the server before measuring
+        time.sleep(trickle_seconds / 2)
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    done.set()
+    for thread in slow:
+        thread.join()
+    return latencies, errors, seconds
+
+
+def benchmark(profile, concurrency=20, requests=2000, workers=1, warmup_requests=100, slow_clients=0,
+              trickle_seconds=1.0):
+    """
+    Run ``profile`` and load-test it; returns a list of Results: one at full
+    speed and, with ``slow_clients``, one with that many slow clients too.
+    """
+    urls = benchmark_urls()
+    host = next((host for host in settings.ALLOWED_HOSTS if '*' not in host and not host.startswith('.')), 'localhost')
+    results = []
+    with Server(profile, workers=workers) as server:
+        load(server.port, urls, concurrency, warmup_requests, host)
+        for slow in sorted({0, slow_clients}):
+            latencies, errors, seconds = load(
+                server.port, urls, concurrency, requests, host, slow_clients=slow, trickle_seconds=trickle_seconds,
+            )
+            results.append(Result(profile, latencies, errors, seconds, slow_clients=slow))
+    return results
@@ -0,0 +1,84 @@
+"""
+Page weight budgets.
+
+Each page's measurements from ``core.asset_check`` are compared against the
+limits in ``settings.PERFORMANCE_BUDGETS``, a JSON file checked into the
+repository::
+
+    {
+        "django": {
+            "default": {"weight_kib": 800, "requests": 20, ...},
+            "pages": {"/services/home-services/": {"weight_kib": 1600}}
+        },
+        "static_site": {...}
+    }
+
+A page's budget is the target's ``default`` updated with its entry under
+``pages``. Metrics a budget leaves out are not checked.
+"""
+import json
+import math
+from pathlib import Path
+
+# Metric name -> how to measure it from a PageReport
+METRICS = {
+    'weight_kib': lambda report: report.weight / 1024,
+    'requests': lambda report: report.requests,
+    'render_blocking': lambda report: len(report.render_blocking),
+    'largest_image_kib': lambda report: max([size for size, _name in report.largest(1, kind='image')] or [0]) / 1024,
+}
+
+
+def measure(report):
+    """Return ``{metric: value}`` for a PageReport."""
+    return {name: measure(report) for name, measure in METRICS.items()}
+
+
+def load_budgets(path):
+    path = Path(path)
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def save_budgets(path, budgets):
+    Path(path).write_text(json.dumps(budgets, indent=4, sort_keys=True) + '\n')
+
+
+def budget_for(budgets, target, page):
+    """The limits that apply to ``page`` of ``target`` (``django`` or ``static_site``)."""
+    section = budgets.get(target, {})
+    budget = dict(section.get('default', {}))
+    budget.update(section.get('pages', {}).get(page, {}))
+    return budget
+
+
+def over_budget(measurements, budget):
+    """Return ``(metric, value, limit)`` for every metric over its limit."""
+    return [
+        (metric, measurements[metric], limit)
+        for metric, limit in sorted(budget.items())
+        if metric in measurements and measurements[metric] > limit
+    ]
+
+
+def record_budgets(budgets, target, reports, headroom=0.1):
+    """
+    Set each page's budget to its current measurements plus ``headroom``,
+    for pages whose measurements exceed the target's defaults.
+    """
+    section = budgets.setdefault(target, {})
+    defaults = section.get('default', {})
+    pages = section.setdefault('pages', {})
+    for report in reports:
+        if report.error:
+            continue
+        measurements = measure(report)
+        entry = {
+            metric: math.ceil(value * (1 + headroom)) if metric.endswith('_kib') else value
+            for metric, value in measurements.items()
+            if value > defaults.get(metric, math.inf)
+        }
+        if entry:
+            pages[report.page] = entry
+        else:
+            pages.pop(report.page, None)
+    return budgets
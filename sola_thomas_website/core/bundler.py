@@ -0,0 +1,232 @@
+"""
+Per-page CSS and JavaScript bundles.
+
+Every local stylesheet a page links is stripped of the rules no template can
+produce, minified and concatenated into a single bundle; the page's local
+scripts are concatenated the same way. Bundles are named after their content
+hash, so pages that use the same files share one bundle.
+
+Which rules to keep is decided from the source templates rather than the
+rendered page, so markup that only appears for some requests (form errors,
+messages, the mobile menu) keeps its styles. Class names that only occur in
+JavaScript (``classList.add('shrink')``) are picked up from the site's
+scripts, and the classes Bootstrap's own JavaScript toggles are listed in
+``settings.ASSET_BUNDLE_SAFELIST``.
+"""
+import hashlib
+import posixpath
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.template.utils import get_app_template_dirs
+from django.utils.html import escape
+
+from .assets import CSS_URL_RE, tag_attributes
+from .css import SIMPLE_RE, Inventory, StyleRule, filter_rules, html_inventory, parse_css, selector_matches, serialize
+
+BUNDLE_DIR = 'bundles'
+
+TAG_RE = re.compile(
+    r'(?P<indent>[ \t]*)(?P<tag><link\b[^>]*>|<script\b[^>]*>\s*</script>)(?P<eol>[ \t]*\n?)',
+    re.IGNORECASE,
+)
+TEMPLATE_TAG_RE = re.compile(r'{%.*?%}|{#.*?#}', re.S)
+TEMPLATE_VAR_RE = re.compile(r'{{.*?}}', re.S)
+# class="..." passed to tags that render markup, e.g. {% icon 'sun' class="theme-icon" %}
+TAG_CLASS_ARGUMENT_RE = re.compile(r'''\bclass=(["'])(.*?)\1''')
+JS_STRING_RE = re.compile(r'''(['"`])((?:\\.|(?!\1).)*)\1''', re.S)
+JS_TOKEN_RE = re.compile(r'[A-Za-z_][\w-]*')
+JS_PREFIX_RE = re.compile(r'([A-Za-z_][\w-]*-)\$\{')
+
+
+def template_sources():
+    """Every file whose markup or scripts can put a class on a public page."""
+    dirs = [Path(d) for engine in settings.TEMPLATES for d in engine.get('DIRS', ())]
+    dirs += [Path(d) for d in get_app_template_dirs('templates')]
+    files = [path for d in dirs for path in d.rglob('*.html')]
+    site = Path(settings.STATIC_SITE_ROOT)
+    files += sorted(site.glob('*.html'))
+    static_dirs = [Path(d[1] if isinstance(d, (list, tuple)) else d) for d in settings.STATICFILES_DIRS]
+    for d in static_dirs + [site]:
+        files += sorted((d / 'js').rglob('*.js'))
+    return sorted(set(files))
+
+
+def template_inventory(text):
+    """
+    Inventory of a Django template, with template tags and variables blanked
+    out. Classes passed to tags as ``class="..."`` are included.
+    """
+    inventory = html_inventory(TEMPLATE_VAR_RE.sub('x', TEMPLATE_TAG_RE.sub(' ', text)))
+    for tag in TEMPLATE_TAG_RE.findall(text):
+        for _quote, classes in TAG_CLASS_ARGUMENT_RE.findall(tag):
+            inventory.classes.update(classes.split())
+    return inventory
+
+
+def script_inventory(text):
+    """
+    Inventory of the names a script could add to the DOM.
+
+    Every identifier-like word inside a string literal is treated as a
+    possible class, id, tag and attribute name. Template literals such as
+    ``alert-${type}`` are returned separately as prefixes.
+    """
+    words = set()
+    prefixes = set()
+    for _quote, literal in JS_STRING_RE.findall(text):
+        words.update(JS_TOKEN_RE.findall(literal))
+        prefixes.update(JS_PREFIX_RE.findall(literal))
+    return Inventory(words, words, words, words), prefixes
+
+
+@lru_cache(maxsize=1)
+def _used(fingerprint):
+    inventory = Inventory(classes=getattr(settings, 'ASSET_BUNDLE_SAFELIST', ()))
+    prefixes = set()
+    for path, _mtime in fingerprint:
+        text = Path(path).read_text(encoding='utf-8', errors='replace')
+        if path.endswith('.js'):
+            found, found_prefixes = script_inventory(text)
+            inventory.update(found)
+            prefixes |= found_prefixes
+        else:
+            inventory.update(template_inventory(text))
+    return inventory, frozenset(prefixes)
+
+
+def used_names():
+    """
+    The Inventory of every name the templates and scripts use, plus the class
+    prefixes scripts build names from. Cached until one of the files changes.
+    """
+    return _used(tuple((str(path), path.stat().st_mtime) for path in template_sources()))
+
+
+@lru_cache(maxsize=64)
+def _parsed(path, mtime):
+    with open(path, encoding='utf-8', errors='replace') as f:
+        return parse_css(f.read())
+
+
+def _with_prefixed_classes(rules, inventory, prefixes):
+    """Add the classes in ``rules`` that start with one of ``prefixes`` to a copy of ``inventory``."""
+    if not prefixes:
+        return inventory
+    classes = set()
+    pending = list(rules)
+    while pending:
+        rule = pending.pop()
+        if isinstance(rule, StyleRule):
+            for selector in rule.selectors:
+                classes.update(name for prefix, name in SIMPLE_RE.findall(selector) if prefix == '.')
+        elif rule.rules:
+            pending.extend(rule.rules)
+    extra = {name for name in classes if name.startswith(tuple(prefixes))}
+    return Inventory(inventory.tags, inventory.classes | extra, inventory.ids, inventory.attributes)
+
+
+def _rebase(css, context, stylesheet_name):
+    """Point the url()s of a stylesheet at the same files from inside BUNDLE_DIR."""
+    base = context.resolver.url_for(stylesheet_name)
+
+    def replace(match):
+        name = context.resolver.static_path(match.group('url'), base)
+        if name is None:
+            return match.group(0)
+        return f'url("{posixpath.relpath(name, BUNDLE_DIR)}")'
+
+    return CSS_URL_RE.sub(replace, css)
+
+
+def bundle_css(sources, context):
+    """
+    Return one minified stylesheet made from ``sources``, a list of
+    ``(static_path, file)`` pairs, keeping only rules the templates can use.
+    """
+    inventory, prefixes = used_names()
+    chunks = []
+    for name, path in sources:
+        rules = _parsed(str(path), path.stat().st_mtime)
+        used = _with_prefixed_classes(rules, inventory, prefixes)
+        rules = filter_rules(rules, lambda selector: selector_matches(selector, used))
+        chunks.append(_rebase(serialize(rules, minify=True), context, name))
+    return ''.join(chunks)
+
+
+def bundle_js(sources):
+    """Concatenate scripts; classic scripts share one global scope, so this is safe."""
+    chunks = [path.read_text(encoding='utf-8').strip() for _name, path in sources]
+    return '\n;\n'.join(chunks) + '\n'
+
+
+def emit_bundle(content, extension, context):
+    digest = hashlib.sha256(content.encode()).hexdigest()[:12]
+    return context.emit(f'{BUNDLE_DIR}/{digest}.{extension}', content)
+
+
+def _bundleable(attrs, context):
+    """
+    Return ``(kind, static_path, file)`` for a tag that can go in a bundle,
+    or None. Only local, render-blocking stylesheets and plain classic
+    scripts qualify.
+    """
+    if 'href' in attrs:
+        rel = (attrs.get('rel') or '').lower().split()
+        if 'stylesheet' not in rel or attrs.get('media', 'all') not in ('all', 'screen'):
+            return None
+        kind, url = 'css', attrs['href']
+    elif 'src' in attrs:
+        if {'async', 'defer', 'nomodule', 'integrity'} & set(attrs) or attrs.get('type') not in (None, 'text/javascript'):
+            return None
+        kind, url = 'js', attrs['src']
+    else:
+        return None
+    source = context.resolve(url)
+    if source is None:
+        return None
+    return kind, context.resolver.static_path(url, context.url), source
+
+
+def bundle_assets(html, context):
+    """
+    Page processor: replace a page's local stylesheets and scripts with one
+    CSS and one JS bundle.
+
+    Each bundle takes the place of the last tag it replaces, so the bundled
+    files still come after any CDN stylesheet or script they used to follow.
+    """
+    matches = {'css': [], 'js': []}
+    for match in TAG_RE.finditer(html):
+        found = _bundleable(tag_attributes(match.group('tag')), context)
+        if found:
+            kind, name, source = found
+            matches[kind].append((match, name, source))
+
+    replacements = {}
+    for kind, found in matches.items():
+        if not found:
+            continue
+        sources = [(name, source) for _match, name, source in found]
+        if kind == 'css':
+            url = emit_bundle(bundle_css(sources, context), 'css', context)
+            tag = f'<link rel="stylesheet" href="{escape(url)}">'
+        else:
+            url = emit_bundle(bundle_js(sources), 'js', context)
+            tag = f'<script src="{escape(url)}"></script>'
+        for match, _name, _source in found[:-1]:
+            replacements[match.start()] = (match.end(), '')
+        last = found[-1][0]
+        replacements[last.start()] = (last.end(), last.group('indent') + tag + last.group('eol'))
+
+    parts = []
+    position = 0
+    for start in sorted(replacements):
+        end, text = replacements[start]
+        parts.append(html[position:start])
+        parts.append(text)
+        position = end
+    parts.append(html[position:])
+    return ''.join(parts)
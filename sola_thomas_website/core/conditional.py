@@ -0,0 +1,97 @@
+"""
+Conditional GET for pages rendered from templates.
+
+``conditional_page`` gives a view an ``ETag`` worked out without rendering
+anything: it hashes the template, every template it extends or includes, the
+deploy version (templates, static files and settings; see ``core.deploy``),
+the current year (the footer's copyright) and the view's context. A browser
+or CDN revalidating a page it already has gets a bodiless ``304`` before the
+view runs.
+
+There is no ``Last-Modified``: no file's modification time covers a changed
+setting or a new year, and a client revalidating with ``If-Modified-Since``
+alone would keep the stale page.
+"""
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+
+from django.template import loader
+from django.template.loader_tags import ExtendsNode, IncludeNode
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from .assets import file_hash
+from .deploy import deploy_version
+
+
+def _constant_names(template):
+    """
+    The names of the templates ``template`` extends or includes, or None if
+    any of them is chosen at render time.
+    """
+    names = []
+    for node in template.nodelist.get_nodes_by_type(ExtendsNode):
+        names.append(node.parent_name.var)
+    for node in template.nodelist.get_nodes_by_type(IncludeNode):
+        names.append(node.template.var)
+    if not all(isinstance(name, str) for name in names):
+        return None
+    return names
+
+
+@lru_cache(maxsize=128)
+def template_dependencies(template_name):
+    """
+    Source files of ``template_name`` and every template it extends or
+    includes, directly or not; None if one of them can't be known before
+    rendering (an ``{% include %}`` of a variable, say).
+    """
+    pending, seen, paths = [template_name], set(), []
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        template = loader.get_template(name).template
+        names = _constant_names(template)
+        if names is None or not template.origin.name:
+            return None
+        paths.append(Path(template.origin.name))
+        pending.extend(names)
+    return tuple(sorted(paths))
+
+
+@lru_cache(maxsize=128)
+def _templates_digest(fingerprint):
+    digest = hashlib.sha256()
+    for path, _mtime in fingerprint:
+        digest.update(f'{Path(path).name}\0{file_hash(path)}\n'.encode())
+    return digest.hexdigest()
+
+
+def page_etag(template_name, context=None):
+    """ETag for ``template_name`` rendered with ``context``, or None if it can't be known."""
+    paths = template_dependencies(template_name)
+    if paths is None:
+        return None
+    templates = _templates_digest(tuple((str(path), path.stat().st_mtime) for path in paths))
+    digest = hashlib.sha256(f'{deploy_version()}\0{timezone.localdate().year}\0{templates}\0'.encode())
+    digest.update(json.dumps(context or {}, sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:32]
+
+
+def conditional_page(template_name, context=None):
+    """
+    Decorator for a view that renders ``template_name``: add an ETag and
+    answer ``If-None-Match`` with 304 before it runs.
+
+    ``context``, if given, is called with the request and returns whatever
+    the view passes to the template that could change the output. Works on
+    sync and async views alike.
+    """
+    # condition() keeps async views async, so ASGI serves them without a thread
+    return condition(
+        etag_func=lambda request, *args, **kwargs: page_etag(template_name, context(request) if context else None),
+    )
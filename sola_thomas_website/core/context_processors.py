@@ -0,0 +1,21 @@
+from .deploy import deploy_version
+
+
+def page_chrome(request):
+    """
+    What the cached parts of ``base.html`` (navigation, footer) vary on: the
+    kind of visitor, since the navigation differs for signed-in users and
+    staff, and the deploy, so a deploy replaces every cached fragment.
+
+    Markup with a ``{% csrf_token %}`` (the logout form, the login modal)
+    must stay outside ``{% cache %}``: the token is per visitor, and a cached
+    one would make every other visitor's POST fail.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        variant = 'anonymous'
+    elif user.is_staff:
+        variant = 'staff'
+    else:
+        variant = 'authenticated'
+    return {'chrome_variant': variant, 'deploy_version': deploy_version()}
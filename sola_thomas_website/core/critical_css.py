@@ -0,0 +1,95 @@
+"""
+Critical CSS inlining.
+
+For every local stylesheet a page links, the rules that style the part of the
+page visible before scrolling are copied into an inline ``<style>`` in the
+``<head>``, and the stylesheet itself is loaded without blocking rendering.
+Stylesheets on other origins (the Bootstrap and Font Awesome CDNs) can't be
+read at build time and are left as they are.
+"""
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.html import escape
+
+from .assets import CSS_URL_RE, rebase_url, tag_attributes
+from .css import filter_rules, html_inventory, parse_css, selector_matches, serialize
+
+LINK_RE = re.compile(r'<link\b[^>]*>', re.IGNORECASE)
+CRITICAL_MARKER = 'data-critical'
+
+# At-rules worth inlining; animations and imports can wait for the full sheet
+CRITICAL_AT_RULES = ('@font-face',)
+
+
+def above_the_fold(html):
+    """
+    The markup visible before scrolling: everything up to the end of the
+    first ``<section>`` in the body (every page opens with a hero section),
+    capped at ``CRITICAL_CSS_FOLD_SIZE`` characters of body.
+    """
+    body = html.find('<body')
+    body = 0 if body == -1 else body
+    limit = body + settings.CRITICAL_CSS_FOLD_SIZE
+    end = html.find('</section>', body)
+    return html[:min(end + len('</section>'), limit) if end != -1 else limit]
+
+
+@lru_cache(maxsize=64)
+def _parsed(path, mtime):
+    with open(path, encoding='utf-8', errors='replace') as f:
+        return parse_css(f.read())
+
+
+def critical_rules(css_path, inventory, href):
+    """Serialized rules from ``css_path`` that apply to ``inventory``, urls rebased."""
+    rules = filter_rules(
+        _parsed(str(css_path), css_path.stat().st_mtime),
+        lambda selector: selector_matches(selector, inventory),
+        lambda rule: rule.name in CRITICAL_AT_RULES,
+    )
+    css = serialize(rules, minify=True)
+    return CSS_URL_RE.sub(lambda m: f'url("{rebase_url(m.group("url"), href)}")', css)
+
+
+def async_stylesheet(href):
+    """Markup that loads a stylesheet without blocking first paint."""
+    href = escape(href)
+    return (
+        f'<link rel="preload" href="{href}" as="style" '
+        f'onload="this.onload=null;this.rel=\'stylesheet\'">'
+        f'<noscript><link rel="stylesheet" href="{href}"></noscript>'
+    )
+
+
+def inline_critical_css(html, context):
+    """
+    Page processor: inline above-the-fold rules and defer local stylesheets.
+
+    Pages that already carry an inlined critical block are returned unchanged.
+    """
+    head_end = html.find('</head>')
+    if head_end == -1 or CRITICAL_MARKER in html[:head_end]:
+        return html
+    inventory = html_inventory(above_the_fold(html))
+    critical = []
+
+    def replace(match):
+        attrs = tag_attributes(match.group(0))
+        rel = (attrs.get('rel') or '').lower().split()
+        href = attrs.get('href')
+        if 'stylesheet' not in rel or attrs.get('media', 'all') not in ('all', 'screen'):
+            return match.group(0)
+        source = context.resolve(href)
+        if source is None:
+            return match.group(0)
+        marker = '' if critical else '\x00'
+        critical.append(critical_rules(source, inventory, href))
+        return marker + async_stylesheet(href)
+
+    head = LINK_RE.sub(replace, html[:head_end])
+    if not critical:
+        return html
+    style = f'<style {CRITICAL_MARKER}>{"".join(critical)}</style>'
+    return head.replace('\x00', style, 1) + html[head_end:]
@@ -0,0 +1,267 @@
+"""
+A small CSS parser for the build steps that rewrite stylesheets.
+
+It only understands as much CSS as those steps need: comments, strings,
+style rules and block at-rules such as ``@media``. Declarations are kept as
+opaque text.
+"""
+import re
+from html.parser import HTMLParser
+
+# At-rules whose block contains further style rules rather than declarations
+GROUPING_AT_RULES = ('@media', '@supports', '@layer', '@container', '@document')
+
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+
+
+class StyleRule:
+    def __init__(self, selectors, body):
+        self.selectors = selectors
+        self.body = body
+
+    def render(self, minify=False):
+        selectors = ','.join(self.selectors) if minify else ', '.join(self.selectors)
+        body = minify_declarations(self.body) if minify else self.body.strip()
+        if minify:
+            return f'{selectors}{{{body}}}'
+        return f'{selectors} {{\n    {body}\n}}\n'
+
+
+class AtRule:
+    """An at-rule; ``rules`` is a list for grouping rules and None otherwise."""
+
+    def __init__(self, prelude, body=None, rules=None):
+        self.prelude = prelude
+        self.body = body
+        self.rules = rules
+
+    @property
+    def name(self):
+        return self.prelude.split(None, 1)[0].split('(')[0].lower()
+
+    def render(self, minify=False):
+        prelude = ' '.join(self.prelude.split())
+        if self.rules is not None:
+            inner = ''.join(rule.render(minify) for rule in self.rules)
+            return f'{prelude}{{{inner}}}' if minify else f'{prelude} {{\n{inner}}}\n'
+        if self.body is None:
+            return f'{prelude};' if minify else f'{prelude};\n'
+        body = minify_block(self.body) if minify else self.body.strip()
+        return f'{prelude}{{{body}}}' if minify else f'{prelude} {{\n    {body}\n}}\n'
+
+
+def _find_block_end(css, start):
+    """Index of the ``}`` closing the block opened just before ``start``."""
+    depth = 1
+    i = start
+    while i < len(css):
+        char = css[i]
+        if char in '"\'':
+            i = _skip_string(css, i)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(css)
+
+
+def _skip_string(css, i):
+    quote = css[i]
+    i += 1
+    while i < len(css) and css[i] != quote:
+        i += 2 if css[i] == '\\' else 1
+    return i + 1
+
+
+def parse_css(css):
+    """Parse a stylesheet into a list of StyleRule and AtRule objects."""
+    return _parse(COMMENT_RE.sub('', css))
+
+
+def _parse(css):
+    rules = []
+    i = 0
+    while i < len(css):
+        # Find the next '{' or ';' outside of strings and parentheses
+        j = i
+        parens = 0
+        while j < len(css):
+            char = css[j]
+            if char in '"\'':
+                j = _skip_string(css, j)
+                continue
+            if char == '(':
+                parens += 1
+            elif char == ')':
+                parens -= 1
+            elif parens == 0 and char in '{;}':
+                break
+            j += 1
+        prelude = css[i:j].strip()
+        if j >= len(css):
+            break
+        if css[j] in ';}':
+            if prelude.startswith('@'):
+                rules.append(AtRule(prelude))
+            i = j + 1
+            continue
+        end = _find_block_end(css, j + 1)
+        block = css[j + 1:end]
+        if prelude.startswith('@'):
+            if prelude.lower().startswith(GROUPING_AT_RULES):
+                rules.append(AtRule(prelude, rules=_parse(block)))
+            else:
+                rules.append(AtRule(prelude, body=block))
+        elif prelude:
+            rules.append(StyleRule(split_selectors(prelude), block))
+        i = end + 1
+    return rules
+
+
+def split_top_level(text, separator):
+    """Split ``text`` on ``separator`` where it isn't inside quotes, () or []."""
+    parts = []
+    depth = 0
+    start = i = 0
+    while i < len(text):
+        char = text[i]
+        if char in '"\'':
+            i = _skip_string(text, i)
+            continue
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+        i += 1
+    parts.append(text[start:])
+    return parts
+
+
+def split_selectors(prelude):
+    """Split a selector list on top-level commas."""
+    return [' '.join(s.split()) for s in split_top_level(prelude, ',') if s.strip()]
+
+
+def serialize(rules, minify=False):
+    return ''.join(rule.render(minify) for rule in rules)
+
+
+def minify_declarations(body):
+    declarations = []
+    for declaration in split_top_level(body, ';'):
+        prop, colon, value = declaration.partition(':')
+        if colon:
+            declarations.append(f"{prop.strip()}:{' '.join(value.split())}")
+    return ';'.join(declarations)
+
+
+def minify_block(body):
+    """Minify the body of a non-grouping at-rule such as @font-face or @keyframes."""
+    body = ' '.join(body.split())
+    return re.sub(r'\s*([{};:,])\s*', r'\1', body).replace(';}', '}')
+
+
+def minify_css(css):
+    return serialize(parse_css(css), minify=True)
+
+
+class Inventory:
+    """The tags, classes, ids and attribute names present in some markup."""
+
+    def __init__(self, tags=(), classes=(), ids=(), attributes=()):
+        self.tags = set(tags)
+        self.classes = set(classes)
+        self.ids = set(ids)
+        self.attributes = set(attributes)
+
+    def update(self, other):
+        self.tags |= other.tags
+        self.classes |= other.classes
+        self.ids |= other.ids
+        self.attributes |= other.attributes
+        return self
+
+
+class _InventoryParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.inventory = Inventory()
+
+    def handle_starttag(self, tag, attrs):
+        self.inventory.tags.add(tag)
+        for name, value in attrs:
+            self.inventory.attributes.add(name)
+            if name == 'class' and value:
+                self.inventory.classes.update(value.split())
+            elif name == 'id' and value:
+                self.inventory.ids.add(value)
+
+    handle_startendtag = handle_starttag
+
+
+def html_inventory(html):
+    """Collect an Inventory from rendered HTML."""
+    parser = _InventoryParser()
+    parser.feed(html)
+    parser.close()
+    return parser.inventory
+
+
+PSEUDO_RE = re.compile(r'::?[\w-]+(\((?:[^()]|\([^()]*\))*\))?')
+ATTRIBUTE_RE = re.compile(r'\[\s*([\w-]+)[^\]]*\]')
+COMBINATOR_RE = re.compile(r'\s*[>+~]\s*|\s+')
+SIMPLE_RE = re.compile(r'([.#]?)((?:\\.|[\w-])+|\*)')
+
+
+def selector_matches(selector, inventory):
+    """
+    True if every element a selector asks for exists somewhere in ``inventory``.
+
+    Structure is ignored (``.a .b`` matches whenever both classes are used) and
+    pseudo-classes are treated as always satisfied, so this errs towards
+    keeping rules.
+    """
+    selector = PSEUDO_RE.sub('', selector)
+    for name in ATTRIBUTE_RE.findall(selector):
+        if name not in inventory.attributes:
+            return False
+    selector = ATTRIBUTE_RE.sub('', selector)
+    for compound in COMBINATOR_RE.split(selector.strip()):
+        for prefix, name in SIMPLE_RE.findall(compound):
+            name = name.replace('\\', '')
+            if prefix == '.' and name not in inventory.classes:
+                return False
+            if prefix == '#' and name not in inventory.ids:
+                return False
+            if not prefix and name != '*' and name.lower() not in inventory.tags:
+                return False
+    return True
+
+
+def filter_rules(rules, keep_selector, keep_at_rule=lambda rule: True):
+    """
+    Return ``rules`` with selectors rejected by ``keep_selector`` removed.
+
+    Style rules left with no selectors and grouping at-rules left empty are
+    dropped; other at-rules are kept if ``keep_at_rule`` accepts them.
+    """
+    kept = []
+    for rule in rules:
+        if isinstance(rule, StyleRule):
+            selectors = [s for s in rule.selectors if keep_selector(s)]
+            if selectors:
+                kept.append(StyleRule(selectors, rule.body))
+        elif rule.rules is not None:
+            inner = filter_rules(rule.rules, keep_selector, keep_at_rule)
+            if inner:
+                kept.append(AtRule(rule.prelude, rules=inner))
+        elif keep_at_rule(rule):
+            kept.append(rule)
+    return kept
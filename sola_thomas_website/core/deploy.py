@@ -0,0 +1,99 @@
+"""
+A version string identifying what a deploy serves.
+
+The version is a hash of every template, every static file and the
+settings, so it changes whenever a deploy changes what a page could render,
+and nothing else does. Caches of rendered output put it in their keys, and so start afresh
+after each deploy without anyone having to clear them.
+"""
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path, PurePath
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.template.utils import get_app_template_dirs
+from django.views.debug import SafeExceptionReporterFilter
+
+from .assets import file_hash
+
+IGNORE_PATTERNS = ['CVS', '.*', '*~']
+
+
+def template_files():
+    """``(name, path)`` for every file in the project and app template directories."""
+    directories = [Path(d) for engine in settings.TEMPLATES for d in engine.get('DIRS', [])]
+    directories += [Path(d) for d in get_app_template_dirs('templates')]
+    for directory in directories:
+        if directory.is_dir():
+            for path in sorted(path for path in directory.rglob('*') if path.is_file()):
+                yield path.relative_to(directory).as_posix(), path
+
+
+def static_files():
+    """
+    ``(name, path)`` for the static files: the collected manifest when there
+    is one (its entries are content hashes already), otherwise every file the
+    finders see.
+    """
+    manifest_name = getattr(staticfiles_storage, 'manifest_name', None)
+    if manifest_name and staticfiles_storage.exists(manifest_name):
+        yield manifest_name, Path(staticfiles_storage.path(manifest_name))
+        return
+    for finder in finders.get_finders():
+        for name, storage in finder.list(IGNORE_PATTERNS):
+            yield name, Path(storage.path(name))
+
+
+def compute_static_version():
+    digest = hashlib.sha256()
+    for name, path in sorted(static_files()):
+        digest.update(f'static:{name}\0{file_hash(path)}\n'.encode())
+    return digest.hexdigest()[:12]
+
+
+def _setting_value(value):
+    if isinstance(value, PurePath):
+        return str(value)
+    raise TypeError
+
+
+def compute_settings_version():
+    """
+    A hash of the settings (secrets masked, as on Django's error pages), so
+    changing one the templates can read, like ``GA_TRACKING_ID``, is a new
+    deploy too. Values JSON can't represent consistently are left out.
+    """
+    digest = hashlib.sha256()
+    for name, value in sorted(SafeExceptionReporterFilter().get_safe_settings().items()):
+        try:
+            digest.update(f'{name}\0{json.dumps(value, sort_keys=True, default=_setting_value)}\n'.encode())
+        except (TypeError, ValueError):
+            continue
+    return digest.hexdigest()[:12]
+
+
+def compute_deploy_version():
+    digest = hashlib.sha256()
+    for name, path in template_files():
+        digest.update(f'template:{name}\0{file_hash(path)}\n'.encode())
+    digest.update(f'static:{compute_static_version()}\n'.encode())
+    digest.update(f'settings:{compute_settings_version()}'.encode())
+    return digest.hexdigest()[:12]
+
+
+@lru_cache(maxsize=1)
+def static_version():
+    """A hash of the static files alone, worked out once per process."""
+    return compute_static_version()
+
+
+@lru_cache(maxsize=1)
+def deploy_version():
+    """
+    The current deploy's version, worked out once per process; a deploy
+    restarts the workers.
+    """
+    return compute_deploy_version()
@@ -1,10 +1,16 @@
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, Content
+from asgiref.sync import sync_to_async
 from django.conf import settings
 import logging
 
+from .email_transport import transport
+from .lazy import lazy_import
+
 logger = logging.getLogger(__name__)
 
+# sendgrid (and cryptography under it) is imported by the first send, not
+# by every process that imports the views
+sendgrid_mail = lazy_import('sendgrid.helpers.mail')
+
 def send_email(subject, message, to_email, html_message=None):
     """
     Utility function to send emails using SendGrid
@@ -21,7 +27,7 @@ def send_email(subject, message, to_email, html_message=None):
     try:
         # Create email message
         if html_message:
-            email = Mail(
+            email = sendgrid_mail.Mail(
                 from_email=settings.DEFAULT_FROM_EMAIL,
                 to_emails=to_email,
                 subject=subject,
@@ -29,18 +35,17 @@ def send_email(subject, message, to_email, html_message=None):
                 html_content=html_message
             )
         else:
-            email = Mail(
+            email = sendgrid_mail.Mail(
                 from_email=settings.DEFAULT_FROM_EMAIL,
                 to_emails=to_email,
                 subject=subject,
                 plain_text_content=message
             )
         
-        # Send email via SendGrid
-        sg = SendGridAPIClient(settings.SENDGRID_API_KEY)
-        response = sg.send(email)
-        logger.info(f"Email sent successfully with status code: {response.status_code}")
-        return response.status_code
+        # Send email via SendGrid over the process's pooled connections
+        response = transport().send(email.get())
+        logger.info(f"Email sent successfully with status code: {response.status}")
+        return response.status
     except Exception as e:
         logger.error(f"Failed to send email: {str(e)}")
         return None
@@ -74,3 +79,10 @@ def send_contact_notification(name, email, subject, message, html_content=None):
     """
     
     return send_email(email_subject, email_body, settings.CONTACT_EMAIL, html_content)
+
+
+# Async versions for async views. The transport blocks on the network,
+# so the send runs in a thread of its own; thread_sensitive=False keeps one
+# slow send from holding up the thread every other sync call shares.
+send_email_async = sync_to_async(send_email, thread_sensitive=False)
+send_contact_notification_async = sync_to_async(send_contact_notification, thread_sensitive=False)
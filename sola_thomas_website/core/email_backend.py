@@ -0,0 +1,41 @@
+"""
+Django email backend that sends through the process-wide ``core.email_transport``.
+
+It is django-sendgrid-v5's backend (same settings: sandbox mode, tracking,
+echo to stdout, the ``sendgrid_email_sent`` signal) with the HTTP call
+replaced, so ``send_mail`` reuses pooled connections instead of opening
+one per message.
+"""
+import logging
+
+from sendgrid_backend import SendgridBackend as BaseSendgridBackend
+from sendgrid_backend.signals import sendgrid_email_sent
+
+from .email_transport import EmailTransportError, transport
+
+logger = logging.getLogger(__name__)
+
+
+class SendgridBackend(BaseSendgridBackend):
+    def send_messages(self, email_messages):
+        if self.stream:
+            self.echo_to_output_stream(email_messages)
+        success = 0
+        for msg in email_messages:
+            data = self._build_sg_mail(msg)
+            fail_flag = True
+            try:
+                response = transport().send(data)
+                msg.extra_headers['status'] = response.status
+                x_message_id = response.headers.get('x-message-id')
+                if x_message_id:
+                    msg.extra_headers['message_id'] = x_message_id
+                success += 1
+                fail_flag = False
+            except EmailTransportError as e:
+                logger.error("Failed to send email, error: %s, response body: %s", e, e.body)
+                if not self.fail_silently:
+                    raise
+            finally:
+                sendgrid_email_sent.send(sender=self.__class__, message=msg, fail_flag=fail_flag)
+        return success
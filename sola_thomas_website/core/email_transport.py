@@ -0,0 +1,173 @@
+"""
+One SendGrid connection pool per process, shared by every way we send mail.
+
+``SendGridAPIClient`` goes through ``python_http_client``, which opens a
+new HTTPS connection, TLS handshake included, for every message; that
+handshake was most of each send's time. ``transport()`` returns this
+process's ``EmailTransport``, which keeps up to ``EMAIL_TRANSPORT_POOL_SIZE``
+keep-alive connections to the API in a urllib3 pool and reuses them.
+``core.email.send_email`` and the Django email backend
+(``core.email_backend.SendgridBackend``, which ``send_mail`` and the outbox
+dispatcher use) both send through it.
+
+urllib3's pool is thread-safe, and under gevent's monkey patching its locks
+and sockets cooperate with other greenlets. The pool is created on the first
+send and again in a forked child, so workers never share sockets with the
+process they were forked from.
+
+Every send's latency is recorded in ``transport().metrics``; its
+``summary()`` also reports how many connections were opened, so reuse is
+visible (``connections`` far below ``sends``). The dispatcher logs it.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+from .lazy import lazy_import
+
+logger = logging.getLogger(__name__)
+
+urllib3 = lazy_import('urllib3')
+
+SEND_PATH = '/v3/mail/send'
+
+
+class EmailTransportError(Exception):
+    """A send failed: the API answered with an error, or couldn't be reached (``status`` is then None)."""
+
+    def __init__(self, message, status=None, body=None):
+        super().__init__(message)
+        self.status = status
+        self.body = body
+
+
+class SendMetrics:
+    """Latencies of the last ``size`` sends, and counts of every send and failure."""
+
+    def __init__(self, size=1000):
+        self.latencies = deque(maxlen=size)
+        self.sends = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds, ok=True):
+        with self._lock:
+            self.latencies.append(seconds)
+            self.sends += 1
+            if not ok:
+                self.errors += 1
+
+    def percentile(self, p):
+        """The ``p``th percentile latency of the recent sends, in milliseconds."""
+        with self._lock:
+            latencies = sorted(self.latencies)
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, round(p / 100 * (len(latencies) - 1)))] * 1000
+
+    def summary(self):
+        return {
+            'sends': self.sends,
+            'errors': self.errors,
+            'p50_ms': round(self.percentile(50), 1),
+            'p95_ms': round(self.percentile(95), 1),
+            'max_ms': round(self.percentile(100), 1),
+        }
+
+
+class EmailTransport:
+    """Posts mail to the SendGrid v3 API over pooled keep-alive connections."""
+
+    def __init__(self, api_key, host, pool_size, timeout):
+        self.api_key = api_key
+        self.host = host.rstrip('/')
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.metrics = SendMetrics()
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self):
+        if self._pool is None or self._pid != os.getpid():
+            with self._lock:
+                if self._pool is None or self._pid != os.getpid():
+                    self._pool = urllib3.connection_from_url(
+                        self.host,
+                        maxsize=self.pool_size,
+                        # wait for a free connection rather than open one we can't keep
+                        block=True,
+                        timeout=urllib3.Timeout(connect=self.timeout, read=self.timeout),
+                        # a POST that may have reached the API isn't resent; the
+                        # outbox retries whole messages instead
+                        retries=urllib3.Retry(total=2, connect=2, read=0, status=0, redirect=0),
+                        headers={
+                            'Authorization': f'Bearer {self.api_key}',
+                            'Content-Type': 'application/json',
+                            'Accept': 'application/json',
+                        },
+                    )
+                    self._pid = os.getpid()
+        return self._pool
+
+    @property
+    def connections(self):
+        """Connections opened by this process's pool so far."""
+        return self._pool.num_connections if self._pool is not None and self._pid == os.getpid() else 0
+
+    def send(self, payload):
+        """
+        Post one v3 mail ``payload`` (the dict ``Mail.get()`` returns); returns
+        the urllib3 response. Raises ``EmailTransportError`` on failure.
+        """
+        start = time.perf_counter()
+        ok = False
+        try:
+            try:
+                response = self.pool.urlopen('POST', SEND_PATH, body=json.dumps(payload).encode())
+            except urllib3.exceptions.HTTPError as e:
+                raise EmailTransportError(f"SendGrid unreachable: {e}") from e
+            if response.status >= 400:
+                body = response.data.decode(errors='replace')
+                raise EmailTransportError(f"SendGrid answered {response.status}", response.status, body)
+            ok = True
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            self.metrics.record(elapsed, ok)
+            logger.info("Email send took %.1f ms (%s)", elapsed * 1000, 'ok' if ok else 'failed')
+
+    def summary(self):
+        return dict(self.metrics.summary(), connections=self.connections)
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def transport():
+    """This process's ``EmailTransport``, built from the settings on first use."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = EmailTransport(
+                    settings.SENDGRID_API_KEY,
+                    settings.SENDGRID_HOST_URL,
+                    settings.EMAIL_TRANSPORT_POOL_SIZE,
+                    settings.EMAIL_TRANSPORT_TIMEOUT,
+                )
+    return _transport
+
+
+def reset_transport():
+    """Drop the process's transport, so the next ``transport()`` reads the settings again."""
+    global _transport
+    with _transport_lock:
+        _transport = None
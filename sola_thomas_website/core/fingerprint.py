@@ -0,0 +1,141 @@
+"""
+Content-hashed asset names for the plain HTML site build.
+
+Every asset in the build gets a copy named after its content
+(``css/theme.css`` -> ``css/theme.1a2b3c4d5e6f.css``) and the pages and
+stylesheets are rewritten to use those names, so a host can cache assets
+forever and only revalidate the HTML. The unhashed originals stay in place
+for anything that builds URLs at runtime.
+
+The mapping is written to ``asset-manifest.json`` next to the pages, and is
+also how the next build finds the hashed files it no longer needs.
+"""
+import hashlib
+import json
+import posixpath
+import re
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from .assets import CSS_IMPORT_RE, CSS_URL_RE
+
+ASSET_MANIFEST_NAME = 'asset-manifest.json'
+
+# Files fetched by a well-known name (or not at all) rather than from a page
+UNHASHED_EXTENSIONS = ('.html', '.md', '.txt', '.xml', '.json', '.webmanifest')
+HASH_STEM_RE = re.compile(r'^[0-9a-f]{12}$')
+
+HTML_URL_ATTRIBUTE_RE = re.compile(r'''\b(?P<attr>href|src|srcset|poster|content)\s*=\s*(?P<quote>["'])(?P<value>.*?)(?P=quote)''')
+
+
+def _replace_group(match, group, new):
+    """``match``'s text with ``group`` replaced by ``new``."""
+    start, end = match.span(group)
+    text = match.group(0)
+    return text[:start - match.start()] + new + text[end - match.start():]
+
+
+def hashed_name(name, content):
+    """
+    ``css/theme.css`` -> ``css/theme.<12 hex digits of sha256>.css``
+
+    Names that are already just a hash (the bundler's output) have the hash
+    replaced instead of getting a second one.
+    """
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    root, ext = posixpath.splitext(name)
+    if HASH_STEM_RE.match(posixpath.basename(root)):
+        return posixpath.join(posixpath.dirname(root), digest + ext)
+    return f'{root}.{digest}{ext}'
+
+
+class Fingerprinter:
+    """
+    Write hashed copies of files in ``output_dir`` and rewrite references to
+    them. ``resolver`` is the site's SiteResolver, used to work out which
+    file a reference points at.
+    """
+
+    def __init__(self, output_dir, resolver):
+        self.output_dir = Path(output_dir)
+        self.resolver = resolver
+        self.paths = {}
+
+    def _rewrite(self, url, base, page):
+        name = self.resolver.static_path(url, base)
+        if name not in self.paths:
+            return url
+        fragment = urlsplit(url).fragment
+        return self.resolver.url_for(self.paths[name], page) + (f'#{fragment}' if fragment else '')
+
+    def rewrite_css(self, css, name):
+        """Point the url()s and @imports of the stylesheet ``name`` at hashed names."""
+        directory = posixpath.dirname(name)
+
+        def replace(match):
+            url = match.group('url')
+            new = self._rewrite(url, name, None)
+            if new == url:
+                return match.group(0)
+            return _replace_group(match, 'url', posixpath.relpath(new, directory or '.'))
+
+        return CSS_IMPORT_RE.sub(replace, CSS_URL_RE.sub(replace, css))
+
+    def rewrite_html(self, html, page):
+        """Point a page's attribute and inline-CSS references at hashed names."""
+        def attribute(match):
+            value = match.group('value')
+            if match.group('attr') == 'srcset':
+                candidates = []
+                for candidate in value.split(','):
+                    parts = candidate.strip().split(None, 1)
+                    if parts:
+                        parts[0] = self._rewrite(parts[0], page, page)
+                    candidates.append(' '.join(parts))
+                new = ', '.join(candidates)
+            else:
+                new = self._rewrite(value, page, page)
+            return _replace_group(match, 'value', new)
+
+        def css_url(match):
+            return _replace_group(match, 'url', self._rewrite(match.group('url'), page, page))
+
+        return CSS_URL_RE.sub(css_url, HTML_URL_ATTRIBUTE_RE.sub(attribute, html))
+
+    def add(self, names):
+        """
+        Write hashed copies of ``names`` (paths relative to ``output_dir``),
+        except pages and other files in UNHASHED_EXTENSIONS. Stylesheets are done last, after the files they refer to, so their
+        contents (and hence their hashes) use the hashed names.
+        """
+        names = sorted(
+            (name for name in names if not name.endswith(UNHASHED_EXTENSIONS)),
+            key=lambda name: (name.endswith('.css'), name),
+        )
+        for name in names:
+            path = self.output_dir / name
+            if name.endswith('.css'):
+                content = self.rewrite_css(path.read_text(encoding='utf-8'), name).encode()
+            else:
+                content = path.read_bytes()
+            hashed = hashed_name(name, content)
+            target = self.output_dir / hashed
+            if not target.exists():
+                target.write_bytes(content)
+            self.paths[name] = hashed
+        return self.paths
+
+
+def load_asset_manifest(output_dir):
+    path = Path(output_dir) / ASSET_MANIFEST_NAME
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text()).get('paths', {})
+
+
+def save_asset_manifest(output_dir, paths):
+    """Write the name -> hashed name mapping, with a version derived from all hashes."""
+    version = hashlib.sha256(json.dumps(paths, sort_keys=True).encode()).hexdigest()[:12]
+    manifest = {'version': version, 'paths': dict(sorted(paths.items()))}
+    (Path(output_dir) / ASSET_MANIFEST_NAME).write_text(json.dumps(manifest, indent=2) + '\n')
+    return version
@@ -0,0 +1,213 @@
+"""
+Liveness and readiness probes answered in front of Django.
+
+``/health/`` says the process is up and nothing more, so it shouldn't cost
+a trip through the middleware stack: ``HealthCheckWSGIMiddleware`` and
+``HealthCheckASGIMiddleware`` wrap the applications in ``wsgi.py`` and
+``asgi.py`` and answer it themselves.
+
+``/health/ready`` says whether this worker can serve pages properly: the
+database answers, the template cache has been warmed (``core.warmup``) and
+the email backlog is under ``HEALTH_EMAIL_BACKLOG_MAX``. The checks in
+``HEALTH_READY_CHECKS`` run at most once every ``HEALTH_READY_TTL`` seconds
+per process; probes in between get the stored answer. It is answered in
+front of Django too, and also routed as an ordinary view for servers that
+run Django without the wrappers.
+"""
+import json
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from django.template import engines
+from django.template.loaders.cached import Loader as CachedLoader
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+LIVENESS_PATHS = ('/health', '/health/')
+READINESS_PATHS = ('/health/ready', '/health/ready/')
+LIVENESS_BODY = b'OK'
+
+
+class Check:
+    """The outcome of one readiness check."""
+
+    def __init__(self, ok, detail=''):
+        self.ok = ok
+        self.detail = detail
+
+    def as_dict(self):
+        return {'ok': self.ok, 'detail': self.detail}
+
+
+def check_database():
+    """The default database accepts a connection and a query."""
+    connection = connections['default']
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        return Check(True, connection.vendor)
+    except Exception as e:
+        return Check(False, str(e))
+    finally:
+        # Probes run outside Django's request cycle, which would close it
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+def cached_template_count():
+    """How many compiled templates the cached template loaders hold."""
+    count = 0
+    for engine in engines.all():
+        for loader in getattr(getattr(engine, 'engine', None), 'template_loaders', ()):
+            if isinstance(loader, CachedLoader):
+                count += sum(1 for template in loader.get_template_cache.values() if not isinstance(template, type))
+    return count
+
+
+def check_templates():
+    """``core.warmup`` has compiled the templates and they are still cached."""
+    from .warmup import state
+
+    if state.get('compiled') is None:
+        return Check(False, "not warmed up")
+    cached = cached_template_count()
+    return Check(cached >= state['compiled'], f"{cached} of {state['compiled']} template(s) cached")
+
+
+def email_backlog():
+    """Messages waiting in the outbox (``core.outbox``)."""
+    from .outbox import backlog
+
+    return backlog()
+
+
+def check_email():
+    """The email backlog is short enough that notifications go out promptly."""
+    backlog = email_backlog()
+    return Check(backlog <= settings.HEALTH_EMAIL_BACKLOG_MAX, f"{backlog} message(s) waiting")
+
+
+def run_checks():
+    """Run every check in ``HEALTH_READY_CHECKS``; returns ``{name: Check}``."""
+    results = {}
+    for path in settings.HEALTH_READY_CHECKS:
+        name = path.rsplit('.', 1)[-1].removeprefix('check_')
+        try:
+            results[name] = import_string(path)()
+        except Exception as e:
+            logger.exception("Readiness check %s failed", path)
+            results[name] = Check(False, str(e))
+    return results
+
+
+class Readiness:
+    """The latest readiness answer, recomputed once it is ``HEALTH_READY_TTL`` seconds old."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.answer = None  # (status, body)
+        self.expires = 0.0
+
+    def fresh(self):
+        return self.answer is not None and time.monotonic() < self.expires
+
+    def get(self):
+        """``(status, body)`` for the readiness probe."""
+        if self.fresh():
+            return self.answer
+        with self.lock:
+            if not self.fresh():
+                checks = run_checks()
+                ready = all(check.ok for check in checks.values())
+                body = json.dumps({
+                    'status': 'ready' if ready else 'not ready',
+                    'checks': {name: check.as_dict() for name, check in checks.items()},
+                }).encode()
+                self.answer = (200 if ready else 503, body)
+                self.expires = time.monotonic() + settings.HEALTH_READY_TTL
+        return self.answer
+
+    async def aget(self):
+        if self.fresh():
+            return self.answer
+        return await sync_to_async(self.get)()
+
+    def clear(self):
+        self.answer = None
+
+
+readiness = Readiness()
+
+STATUS_LINES = {200: '200 OK', 503: '503 Service Unavailable'}
+TEXT_HEADERS = [('Content-Type', 'text/plain'), ('Cache-Control', 'no-store')]
+JSON_HEADERS = [('Content-Type', 'application/json'), ('Cache-Control', 'no-store')]
+
+
+def health_check(request):
+    return HttpResponse(LIVENESS_BODY, content_type='text/plain')
+
+
+async def health_check_async(request):
+    return HttpResponse(LIVENESS_BODY, content_type='text/plain')
+
+
+def health_ready(request):
+    status, body = readiness.get()
+    return HttpResponse(body, status=status, content_type='application/json')
+
+
+async def health_ready_async(request):
+    status, body = await readiness.aget()
+    return HttpResponse(body, status=status, content_type='application/json')
+
+
+class HealthCheckWSGIMiddleware:
+    """Answer the health probes before a WSGI request reaches Django."""
+
+    def __init__(self, application):
+        self.application = application
+
+    def respond(self, start_response, status, headers, body):
+        start_response(STATUS_LINES[status], headers + [('Content-Length', str(len(body)))])
+        return [body]
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if environ.get('REQUEST_METHOD') in ('GET', 'HEAD'):
+            if path in LIVENESS_PATHS:
+                return self.respond(start_response, 200, TEXT_HEADERS, LIVENESS_BODY)
+            if path in READINESS_PATHS:
+                status, body = readiness.get()
+                return self.respond(start_response, status, JSON_HEADERS, body)
+        return self.application(environ, start_response)
+
+
+class HealthCheckASGIMiddleware:
+    """Answer the health probes before an ASGI request reaches Django."""
+
+    def __init__(self, application):
+        self.application = application
+
+    async def respond(self, send, status, headers, body):
+        headers = [(name.lower().encode(), value.encode()) for name, value in headers]
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': headers + [(b'content-length', str(len(body)).encode())],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+            if scope['path'] in LIVENESS_PATHS:
+                return await self.respond(send, 200, TEXT_HEADERS, LIVENESS_BODY)
+            if scope['path'] in READINESS_PATHS:
+                status, body = await readiness.aget()
+                return await self.respond(send, status, JSON_HEADERS, body)
+        return await self.application(scope, receive, send)
@@ -0,0 +1,152 @@
+"""
+SVG icons without an HTTP request each.
+
+Every file under ``svg/`` becomes a ``<symbol id="icon-<name>">`` in one
+sprite. Small icons are written straight into the page as ``<svg>`` markup;
+larger ones are drawn with ``<use href="sprite.svg#icon-<name>">`` so all of
+them together cost a single, cacheable request.
+
+Templates use ``{% icon 'sun' %}``, with the sprite written by ``build_icons``
+(until it has run, every icon is inlined). In the plain HTML site, ``<img>``
+tags pointing into ``svg/`` are converted by the ``inline_icons`` page
+processor, which emits the sprite with the build.
+"""
+import posixpath
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join, mark_safe
+
+from .assets import tag_attributes
+
+ICON_DIR = 'svg'
+SPRITE_NAME = 'sprite.svg'
+SYMBOL_PREFIX = 'icon-'
+# Where the static files' sprite is served from (settings.ICON_SPRITE_ROOT)
+ICON_SPRITE_PREFIX = 'icons'
+
+# Attributes of an icon's root <svg> that carry over to its symbol or inline copy
+PRESENTATION_ATTRIBUTES = (
+    'viewBox', 'fill', 'stroke', 'stroke-width', 'stroke-linecap', 'stroke-linejoin',
+)
+
+SVG_ROOT_RE = re.compile(r'<svg\b(?P<attrs>[^>]*)>(?P<body>.*)</svg>', re.IGNORECASE | re.S)
+IMG_RE = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+
+
+class Icon:
+    """One SVG file: its root element's presentation attributes and its contents."""
+
+    def __init__(self, name, svg):
+        match = SVG_ROOT_RE.search(svg)
+        if match is None:
+            raise ValueError(f"{name} is not an SVG document")
+        # tag_attributes lowercases names, and SVG's viewBox is case-sensitive
+        attrs = tag_attributes(f"<svg{match.group('attrs')}>")
+        self.name = name
+        self.attrs = {key: attrs[key.lower()] for key in PRESENTATION_ATTRIBUTES if attrs.get(key.lower()) is not None}
+        self.width = attrs.get('width')
+        self.height = attrs.get('height')
+        self.body = re.sub(r'>\s+<', '><', match.group('body').strip())
+
+    @property
+    def symbol_id(self):
+        return SYMBOL_PREFIX + self.name
+
+    @property
+    def inline(self):
+        """Small enough to write into the page instead of referring to the sprite."""
+        return len(self.body) <= settings.ICON_INLINE_MAX_SIZE
+
+    def symbol(self):
+        attrs = format_html_join('', ' {}="{}"', self.attrs.items())
+        return format_html('<symbol id="{}"{}>{}</symbol>', self.symbol_id, attrs, mark_safe(self.body))
+
+    def html(self, sprite_url=None, alt='', **attrs):
+        """
+        The icon as an ``<svg>`` element: its own markup, or a ``<use>`` of
+        the symbol in the sprite at ``sprite_url`` for icons too big to inline.
+
+        ``alt`` becomes the accessible name; without one the icon is hidden
+        from assistive technology, as decoration.
+        """
+        element = dict(self.attrs) if self.inline or sprite_url is None else {'viewBox': self.attrs.get('viewBox')}
+        if self.width and self.height:
+            element.update(width=self.width, height=self.height)
+        element.update((key.replace('_', '-'), value) for key, value in attrs.items())
+        if alt:
+            element.update(role='img', **{'aria-label': alt})
+        else:
+            element['aria-hidden'] = 'true'
+        element = format_html_join('', ' {}="{}"', ((k, v) for k, v in element.items() if v is not None))
+        if self.inline or sprite_url is None:
+            return format_html('<svg{}>{}</svg>', element, mark_safe(self.body))
+        return format_html('<svg{}><use href="{}#{}"></use></svg>', element, sprite_url, self.symbol_id)
+
+
+@lru_cache(maxsize=8)
+def _icons(fingerprint):
+    return {
+        Path(path).stem: Icon(Path(path).stem, Path(path).read_text(encoding='utf-8'))
+        for path, _mtime in fingerprint
+    }
+
+
+def load_icons(directory):
+    """``{name: Icon}`` for the SVG files in ``directory``, cached until one changes."""
+    directory = Path(directory)
+    paths = sorted(path for path in directory.glob('*.svg') if path.name != SPRITE_NAME) if directory.is_dir() else []
+    return _icons(tuple((str(path), path.stat().st_mtime) for path in paths))
+
+
+def static_icons():
+    """The icons in the Django static files' ``svg/`` directory."""
+    directory = finders.find(ICON_DIR)
+    return load_icons(directory) if directory else {}
+
+
+def static_sprite_url():
+    """URL of the sprite ``build_icons`` wrote for the static files, or None before it has run."""
+    if not (Path(settings.ICON_SPRITE_ROOT) / SPRITE_NAME).exists():
+        return None
+    return static(posixpath.join(ICON_SPRITE_PREFIX, SPRITE_NAME))
+
+
+def build_sprite(icons):
+    """One SVG document defining a ``<symbol>`` for each of ``icons``."""
+    symbols = ''.join(icon.symbol() for _name, icon in sorted(icons.items()))
+    return f'<svg xmlns="http://www.w3.org/2000/svg">{symbols}</svg>\n'
+
+
+def inline_icons(html, context):
+    """
+    Page processor: replace ``<img>`` tags showing an icon from ``svg/`` with
+    the icon itself, or a ``<use>`` of it in the sprite (which is emitted
+    with the page's other generated files).
+    """
+    sprite_url = None
+
+    def replace(match):
+        nonlocal sprite_url
+        attrs = tag_attributes(match.group(0))
+        src = attrs.pop('src', None)
+        name = src and context.resolver.static_path(src, context.url)
+        if not name or posixpath.dirname(name) != ICON_DIR or not name.endswith('.svg'):
+            return match.group(0)
+        source = context.resolve(src)
+        if source is None:
+            return match.group(0)
+        icons = load_icons(source.parent)
+        icon = icons.get(source.stem)
+        if icon is None:
+            return match.group(0)
+        if not icon.inline and sprite_url is None:
+            sprite_url = context.emit(posixpath.join(ICON_DIR, SPRITE_NAME), build_sprite(icons))
+        alt = attrs.pop('alt', '') or ''
+        return icon.html(sprite_url, alt=alt, **{key: value or '' for key, value in attrs.items()})
+
+    return IMG_RE.sub(replace, html)
@@ -0,0 +1,374 @@
+"""
+Responsive image variants.
+
+``build_images`` resizes every source image into a few widths and encodes each
+width as AVIF, WebP and the source format. Results are recorded in an index
+keyed by the source's content hash, so unchanged images are never re-encoded
+and templates can look up what exists without touching the files.
+
+The index also records each image's intrinsic size and a tiny blurred copy as
+a ``data:`` URI, so pages can reserve the image's space and show the
+placeholder while it loads.
+"""
+import base64
+import json
+import logging
+import posixpath
+import re
+from html.parser import HTMLParser
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.utils.html import format_html, format_html_join
+
+from .assets import CSS_URL_RE, file_hash, tag_attributes
+from .critical_css import above_the_fold
+from .lazy import lazy_import
+
+# Only build_images encodes anything; templates just read the index
+Image = lazy_import('PIL.Image')
+ImageFilter = lazy_import('PIL.ImageFilter')
+features = lazy_import('PIL.features')
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = 'index.json'
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+# Where build_images --site writes variants, inside the site directory
+SITE_VARIANTS_DIR = 'responsive'
+PLACEHOLDER_WIDTH = 16
+
+# Encoder settings per output format
+ENCODERS = {
+    'avif': {'format': 'AVIF', 'mime': 'image/avif', 'options': {'quality': 50}},
+    'webp': {'format': 'WEBP', 'mime': 'image/webp', 'options': {'quality': 75, 'method': 6}},
+    'jpeg': {'format': 'JPEG', 'mime': 'image/jpeg', 'options': {'quality': 80, 'optimize': True, 'progressive': True}},
+    'png': {'format': 'PNG', 'mime': 'image/png', 'options': {'optimize': True}},
+}
+EXTENSIONS = {'avif': 'avif', 'webp': 'webp', 'jpeg': 'jpg', 'png': 'png'}
+
+
+def variant_widths(width, widths):
+    """The target widths for an image ``width`` pixels wide, never upscaling."""
+    targets = [w for w in widths if w < width]
+    targets.append(min(width, max(widths)))
+    return sorted(set(targets))
+
+
+def fallback_format(path):
+    return 'png' if Path(path).suffix.lower() == '.png' else 'jpeg'
+
+
+def placeholder_data_uri(image):
+    """A ``PLACEHOLDER_WIDTH`` pixel wide, blurred WebP of ``image`` as a data: URI."""
+    height = max(1, round(image.height * PLACEHOLDER_WIDTH / image.width))
+    small = image.convert('RGBA' if 'A' in image.getbands() else 'RGB').resize((PLACEHOLDER_WIDTH, height))
+    small = small.filter(ImageFilter.GaussianBlur(1))
+    buffer = BytesIO()
+    small.save(buffer, 'WEBP', quality=40)
+    return 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode()
+
+
+def load_index(root):
+    """Read the variant index written by ImageVariantBuilder, or an empty one."""
+    path = Path(root) / INDEX_NAME
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+_index_cache = {}
+
+
+def cached_index(root):
+    """load_index() memoised per process, reloaded when the index file changes."""
+    path = Path(root) / INDEX_NAME
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return {}
+    cached = _index_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = _index_cache[path] = (mtime, load_index(root))
+    return cached[1]
+
+
+class ImageVariantBuilder:
+    """
+    Generate resized, re-encoded copies of source images under ``output_root``.
+
+    Variants are written as ``<prefix>/<source dir>/<stem>-<hash>-<width>w.<ext>``
+    so their names change whenever the source does.
+    """
+
+    def __init__(self, output_root, prefix='responsive', widths=None, formats=None):
+        self.output_root = Path(output_root)
+        self.prefix = prefix
+        self.widths = widths or settings.RESPONSIVE_IMAGE_WIDTHS
+        self.formats = list(formats or settings.RESPONSIVE_IMAGE_FORMATS)
+        if 'avif' in self.formats and not features.check('avif'):
+            logger.warning("Pillow was built without AVIF support; skipping AVIF variants")
+            self.formats.remove('avif')
+        self.index = load_index(self.output_root)
+        self.generated = []
+        self.skipped = []
+
+    def is_fresh(self, name, digest, entry):
+        if not entry or entry['hash'] != digest:
+            return False
+        if entry['widths'] != variant_widths(entry['width'], self.widths):
+            return False
+        if set(entry['sources']) != set(self.formats) | {entry['fallback']}:
+            return False
+        return all(
+            (self.output_root / v['path'][len(self.prefix) + 1:]).exists()
+            for variants in entry['sources'].values() for v in variants
+        )
+
+    def build_one(self, name, source, digest):
+        stem, _ext = posixpath.splitext(name)
+        fallback = fallback_format(source)
+        with Image.open(source) as image:
+            image.load()
+            width, height = image.size
+            widths = variant_widths(width, self.widths)
+            entry = {
+                'hash': digest,
+                'width': width,
+                'height': height,
+                'widths': widths,
+                'fallback': fallback,
+                'placeholder': placeholder_data_uri(image),
+                'sources': {},
+            }
+            for fmt in self.formats + [fallback]:
+                if fmt in entry['sources']:
+                    continue
+                encoder = ENCODERS[fmt]
+                variants = []
+                for target in widths:
+                    resized = image if target == width else image.resize(
+                        (target, round(height * target / width)), Image.LANCZOS)
+                    if encoder['format'] == 'JPEG' and resized.mode not in ('RGB', 'L'):
+                        resized = resized.convert('RGB')
+                    path = f'{stem}-{digest[:12]}-{target}w.{EXTENSIONS[fmt]}'
+                    out = self.output_root / path
+                    out.parent.mkdir(parents=True, exist_ok=True)
+                    resized.save(out, encoder['format'], **encoder['options'])
+                    variants.append({
+                        'path': f'{self.prefix}/{path}',
+                        'width': resized.width,
+                        'height': resized.height,
+                        'bytes': out.stat().st_size,
+                    })
+                entry['sources'][fmt] = variants
+        return entry
+
+    def build(self, sources):
+        """Build variants for ``{name: path}`` sources and write the index."""
+        for name, source in sorted(sources.items()):
+            digest = file_hash(source)
+            entry = self.index.get(name)
+            if self.is_fresh(name, digest, entry):
+                if 'placeholder' not in entry:
+                    with Image.open(source) as image:
+                        entry['placeholder'] = placeholder_data_uri(image)
+                self.skipped.append(name)
+                continue
+            self.index[name] = self.build_one(name, source, digest)
+            self.generated.append(name)
+        for name in set(self.index) - set(sources):
+            del self.index[name]
+        self.prune()
+        self.output_root.mkdir(parents=True, exist_ok=True)
+        (self.output_root / INDEX_NAME).write_text(json.dumps(self.index, indent=2, sort_keys=True))
+        return self
+
+    def prune(self):
+        """Delete variant files no longer referenced by the index."""
+        keep = {
+            v['path'][len(self.prefix) + 1:]
+            for entry in self.index.values()
+            for variants in entry['sources'].values() for v in variants
+        }
+        if not self.output_root.exists():
+            return
+        for path in self.output_root.rglob('*'):
+            rel = path.relative_to(self.output_root).as_posix()
+            if path.is_file() and rel != INDEX_NAME and rel not in keep:
+                path.unlink()
+
+
+def static_image_sources():
+    """``{name: path}`` for every image the staticfiles finders know about."""
+    generated = Path(settings.RESPONSIVE_IMAGES_ROOT).resolve()
+    sources = {}
+    for finder in finders.get_finders():
+        for path, storage in finder.list(['CVS', '.*', '*~']):
+            if Path(storage.location).resolve() == generated:
+                continue
+            if path.lower().endswith(IMAGE_EXTENSIONS):
+                prefix = getattr(storage, 'prefix', None)
+                name = posixpath.join(prefix, path) if prefix else path
+                sources.setdefault(name.replace('\\', '/'), Path(storage.path(path)))
+    return sources
+
+
+def site_image_sources(root, output_root):
+    """``{name: path}`` for every image under a plain HTML site directory."""
+    root = Path(root)
+    output_root = Path(output_root).resolve()
+    return {
+        path.relative_to(root).as_posix(): path
+        for path in sorted(root.rglob('*'))
+        if path.suffix.lower() in IMAGE_EXTENSIONS and output_root not in path.resolve().parents
+    }
+
+
+def placeholder_style(entry, style=''):
+    """
+    ``style`` with the entry's blurred placeholder added as a background, for
+    opaque images only (it would show through transparent ones).
+    """
+    if entry.get('fallback') != 'jpeg' or not entry.get('placeholder'):
+        return style
+    placeholder = f"background:center/cover no-repeat url({entry['placeholder']})"
+    return f"{style.rstrip().rstrip(';')};{placeholder}" if style.strip() else placeholder
+
+
+def picture_html(entry, url, alt='', sizes='100vw', **attrs):
+    """
+    Build a ``<picture>`` element for an index entry.
+
+    ``url`` turns a variant path into the URL it is served from. The ``<img>``
+    carries the image's intrinsic size, its placeholder, and
+    ``loading="lazy" decoding="async"`` unless ``attrs`` say otherwise.
+    """
+    fallback = entry['sources'][entry['fallback']]
+    largest = fallback[-1]
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (ENCODERS[fmt]['mime'], srcset(variants, url), sizes)
+            for fmt, variants in entry['sources'].items() if fmt != entry['fallback']
+        ),
+    )
+    attrs = {k.replace('_', '-'): v for k, v in attrs.items()}
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+    style = placeholder_style(entry, attrs.pop('style', ''))
+    if style:
+        attrs['style'] = style
+    img_attrs = format_html_join('', ' {}="{}"', attrs.items())
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}"{}></picture>',
+        sources, url(largest['path']), srcset(fallback, url), sizes,
+        largest['width'], largest['height'], alt, img_attrs,
+    )
+
+
+def srcset(variants, url):
+    return ', '.join(f"{url(v['path'])} {v['width']}w" for v in variants)
+
+
+class _ImgAttrs(HTMLParser):
+    def handle_starttag(self, tag, attrs):
+        self.attrs = dict(attrs)
+
+
+IMG_RE = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+PICTURE_RE = re.compile(r'<(/?)picture\b', re.IGNORECASE)
+
+
+def _inside_picture(html, position):
+    opens = [m.group(1) for m in PICTURE_RE.finditer(html, 0, position)]
+    return bool(opens) and opens[-1] == ''
+
+
+def rewrite_img_tags(html, index, url):
+    """
+    Replace ``<img>`` tags whose ``src`` is in ``index`` with ``<picture>`` markup.
+
+    ``index`` is keyed by the ``src`` as written in the page; images already
+    inside a ``<picture>`` are left alone.
+    """
+    def replace(match):
+        if _inside_picture(html, match.start()):
+            return match.group(0)
+        parser = _ImgAttrs()
+        parser.feed(match.group(0))
+        attrs = getattr(parser, 'attrs', {})
+        entry = index.get(attrs.pop('src', None))
+        if entry is None:
+            return match.group(0)
+        for generated in ('srcset', 'width', 'height'):
+            attrs.pop(generated, None)
+        return picture_html(
+            entry, url, alt=attrs.pop('alt', ''), sizes=attrs.pop('sizes', '100vw'),
+            **{k: v or '' for k, v in attrs.items()},
+        )
+
+    return IMG_RE.sub(replace, html)
+
+
+def resolver_index(resolver):
+    """The variant index for the files ``resolver`` maps references to."""
+    root = getattr(resolver, 'root', None)
+    return cached_index(root / SITE_VARIANTS_DIR if root is not None else settings.RESPONSIVE_IMAGES_ROOT)
+
+
+STYLE_ATTRIBUTE_RE = re.compile(r'(\bstyle\s*=\s*)(["\'])(.*?)\2', re.S)
+
+
+def image_hints(html, context):
+    """
+    Page processor: give ``<img>`` tags that lack them their intrinsic
+    ``width``/``height``, ``decoding="async"`` and, below the fold,
+    ``loading="lazy"``; give inline ``background-image`` styles the image's
+    blurred placeholder as a second layer to show until it loads.
+
+    Only images in the variant index (see ``build_images``) are touched.
+    """
+    index = resolver_index(context.resolver)
+    if not index:
+        return html
+    fold = len(above_the_fold(html))
+
+    def entry_for(url):
+        return index.get(context.resolver.static_path(url, context.url))
+
+    def img(match):
+        if _inside_picture(html, match.start()):
+            return match.group(0)
+        tag = match.group(0)
+        attrs = tag_attributes(tag)
+        entry = entry_for(attrs.get('src'))
+        if entry is None:
+            return tag
+        extra = {}
+        if 'width' not in attrs and 'height' not in attrs:
+            extra.update(width=entry['width'], height=entry['height'])
+        if 'loading' not in attrs and match.start() >= fold:
+            extra['loading'] = 'lazy'
+        if 'decoding' not in attrs:
+            extra['decoding'] = 'async'
+        if not extra:
+            return tag
+        end = len(tag) - (2 if tag.endswith('/>') else 1)
+        return tag[:end].rstrip() + ''.join(f' {k}="{v}"' for k, v in extra.items()) + tag[end:]
+
+    def style(match):
+        value = match.group(3)
+        if 'background' not in value or 'data:' in value:
+            return match.group(0)
+        urls = list(CSS_URL_RE.finditer(value))
+        entry = entry_for(urls[-1].group('url')) if urls else None
+        if entry is None or entry.get('fallback') != 'jpeg' or not entry.get('placeholder'):
+            return match.group(0)
+        last = urls[-1]
+        value = f"{value[:last.end()]}, url({entry['placeholder']}){value[last.end():]}"
+        return f'{match.group(1)}{match.group(2)}{value}{match.group(2)}'
+
+    return STYLE_ATTRIBUTE_RE.sub(style, IMG_RE.sub(img, html))
@@ -0,0 +1,52 @@
+"""
+Deferred imports for heavy optional dependencies.
+
+``sendgrid`` (and ``cryptography`` with it), Pillow and Stripe take tens of
+milliseconds each to import, and every worker and management command used to
+pay for them at startup although most never send an email or touch an
+image. A module that needs one binds it with ``lazy_import`` instead of
+``import``; the real import happens on first attribute access::
+
+    Image = lazy_import('PIL.Image')
+    ...
+    with Image.open(path) as image:  # PIL is imported here
+
+``python manage.py profile_startup`` shows what is still imported eagerly.
+"""
+import threading
+from importlib import import_module
+
+
+class LazyModule:
+    """Stand-in for a module that imports it the first time one of its attributes is used."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = import_module(self._name)
+        return self._module
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f'<lazy module {self._name!r} ({state})>'
+
+
+def lazy_import(name):
+    """Module ``name``, imported the first time one of its attributes is used."""
+    return LazyModule(name)
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark import available, benchmark, server_profiles
+
+
+class Command(BaseCommand):
+    help = (
+        "Start gunicorn with each server profile in gunicorn.conf.py (sync, gevent, asgi) and compare "
+        "throughput and latency under concurrent requests for the public pages, with and without slow clients"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('profiles', nargs='*', help="Profiles to run (default: every installed one)")
+        parser.add_argument('--concurrency', type=int, default=20, help="Concurrent clients (default: 20)")
+        parser.add_argument('--requests', type=int, default=2000, help="Requests per profile (default: 2000)")
+        parser.add_argument('--workers', type=int, default=1, help="gunicorn workers (default: 1, as in production)")
+        parser.add_argument(
+            '--slow-clients', type=int, default=50,
+            help="Slow clients trickling requests in during the second run (default: 50; 0 skips that run)",
+        )
+        parser.add_argument(
+            '--trickle', type=float, default=1.0,
+            help="Seconds each slow client takes to send its request (default: 1)",
+        )
+
+    def handle(self, *args, **options):
+        profiles = server_profiles()
+        unknown = set(options['profiles']) - set(profiles)
+        if unknown:
+            raise CommandError(f"Unknown profile(s) {', '.join(sorted(unknown))}; choose from {', '.join(profiles)}")
+
+        results = []
+        for profile in options['profiles'] or profiles:
+            if not available(profile):
+                self.stdout.write(self.style.WARNING(f"{profile}: skipped, {profiles[profile]['requires']} isn't installed"))
+                continue
+            self.stdout.write(f"{profile}: {options['requests']} requests from {options['concurrency']} clients...")
+            try:
+                runs = benchmark(
+                    profile, options['concurrency'], options['requests'], options['workers'],
+                    slow_clients=options['slow_clients'], trickle_seconds=options['trickle'],
+                )
+            except RuntimeError as e:
+                raise CommandError(str(e))
+            results += runs
+            for result in runs:
+                for error in result.errors[:5]:
+                    self.stdout.write(self.style.ERROR(f"  {error}"))
+
+        if not results:
+            raise CommandError("No profile could be run")
+        self.stdout.write(
+            f"\n{'profile':<8} {'slow':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result.profile:<8} {result.slow_clients:>5} {result.requests_per_second:>8.1f} "
+                f"{result.percentile(50):>8.1f} "
+                f"{result.percentile(95):>8.1f} {result.percentile(99):>8.1f} {len(result.errors):>7}"
+            )
+        if any(result.errors for result in results):
+            raise CommandError("Some requests failed")
+        self.stdout.write(self.style.SUCCESS(f"Benchmarked {len(results)} profile(s)"))
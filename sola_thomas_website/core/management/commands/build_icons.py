@@ -0,0 +1,23 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.icons import SPRITE_NAME, build_sprite, static_icons
+
+
+class Command(BaseCommand):
+    help = "Combine the icons in static/svg/ into one SVG sprite for the {% icon %} tag"
+
+    def handle(self, *args, **options):
+        icons = static_icons()
+        if not icons:
+            raise CommandError("No icons found in the static files' svg/ directory")
+        output_root = Path(settings.ICON_SPRITE_ROOT)
+        output_root.mkdir(parents=True, exist_ok=True)
+        (output_root / SPRITE_NAME).write_text(build_sprite(icons), encoding='utf-8')
+        inlined = sum(icon.inline for icon in icons.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {len(icons)} icon(s) to {output_root / SPRITE_NAME} "
+            f"({inlined} small enough to be inlined instead)"
+        ))
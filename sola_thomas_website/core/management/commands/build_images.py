@@ -0,0 +1,45 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.images import SITE_VARIANTS_DIR, ImageVariantBuilder, rewrite_img_tags, site_image_sources, static_image_sources
+
+
+class Command(BaseCommand):
+    help = "Generate resized AVIF/WebP/JPEG variants of images for responsive <picture> markup"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--site',
+            help="Process a plain HTML site directory (e.g. ../static_site) instead of the Django static files",
+        )
+        parser.add_argument(
+            '--rewrite-html', action='store_true',
+            help="With --site, replace <img> tags in the site's HTML files with <picture> markup",
+        )
+
+    def handle(self, *args, **options):
+        if options['site']:
+            site = Path(options['site'])
+            output_root = site / SITE_VARIANTS_DIR
+            sources = site_image_sources(site, output_root)
+        else:
+            output_root = Path(settings.RESPONSIVE_IMAGES_ROOT)
+            sources = static_image_sources()
+
+        builder = ImageVariantBuilder(output_root).build(sources)
+        for name in builder.generated:
+            self.stdout.write(f"  encoded {name}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated variants for {len(builder.generated)} image(s), "
+            f"{len(builder.skipped)} unchanged, in {output_root}"
+        ))
+
+        if options['site'] and options['rewrite_html']:
+            for page in sorted(site.glob('*.html')):
+                html = page.read_text(encoding='utf-8')
+                rewritten = rewrite_img_tags(html, builder.index, lambda path: path)
+                if rewritten != html:
+                    page.write_text(rewritten, encoding='utf-8')
+                    self.stdout.write(f"  rewrote {page.name}")
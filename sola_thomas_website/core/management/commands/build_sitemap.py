@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.sitemap import build_django_sitemap, site_url
+
+
+class Command(BaseCommand):
+    help = (
+        "Render every public page and write sitemap.xml (lastmod from each page's content hash) "
+        "and robots.txt into settings.SITEMAP_ROOT, where the /sitemap.xml and /robots.txt views serve them from"
+    )
+
+    def handle(self, *args, **options):
+        names = build_django_sitemap()
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {', '.join(names)} for {site_url()} into {settings.SITEMAP_ROOT}"
+        ))
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.routes import public_urls
+from core.static_build import StaticSiteBuilder
+
+
+class Command(BaseCommand):
+    help = "Pre-render every public page into a static, deployable tree"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=settings.STATIC_BUILD_ROOT,
+            help="Directory to write the site into (default: settings.STATIC_BUILD_ROOT)",
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help="Re-render every page even if none of its inputs changed",
+        )
+        parser.add_argument(
+            '--list', action='store_true',
+            help="Only list the URLs that would be built",
+        )
+
+    def handle(self, *args, **options):
+        if options['list']:
+            for url, name in public_urls():
+                self.stdout.write(f"{url}  ({name})")
+            return
+
+        builder = StaticSiteBuilder(options['output'], force=options['force']).build()
+
+        for url in builder.rendered:
+            self.stdout.write(f"  rendered {url}")
+        for url in builder.failed:
+            self.stdout.write(self.style.WARNING(f"  failed   {url}"))
+        for url in builder.removed:
+            self.stdout.write(f"  removed  {url}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Built {len(builder.rendered)} page(s), {len(builder.skipped)} unchanged, "
+            f"{len(builder.failed)} failed into {options['output']}"
+        ))
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.static_build import SiteDirectoryBuilder
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the hand-written static_site/ into a deployable tree, running the page processors "
+        "and fingerprinting and pre-compressing its assets"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source', default=settings.STATIC_SITE_ROOT,
+            help="Site directory to read (default: settings.STATIC_SITE_ROOT)",
+        )
+        parser.add_argument(
+            '--output', default=settings.STATIC_SITE_BUILD_ROOT,
+            help="Directory to write into (default: settings.STATIC_SITE_BUILD_ROOT)",
+        )
+        parser.add_argument(
+            '--no-fingerprint', action='store_true',
+            help="Keep asset names as they are and skip writing .br/.gz files, asset-manifest.json and sw.js",
+        )
+        parser.add_argument(
+            '--no-service-worker', action='store_true',
+            help="Don't generate sw.js or register it in the pages",
+        )
+        parser.add_argument(
+            '--base-url', default=settings.STATIC_SITE_URL,
+            help="URL the site is served from, for sitemap.xml and robots.txt (default: settings.STATIC_SITE_URL)",
+        )
+        parser.add_argument(
+            '--no-sitemap', action='store_true',
+            help="Don't write sitemap.xml and robots.txt",
+        )
+
+    def handle(self, *args, **options):
+        builder = SiteDirectoryBuilder(
+            options['source'], options['output'],
+            fingerprint=not options['no_fingerprint'], service_worker=not options['no_service_worker'],
+            base_url=None if options['no_sitemap'] else options['base_url'],
+        ).build()
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {len(builder.pages)} page(s) and copied {len(builder.copied)} changed file(s) "
+            f"into {options['output']}"
+            + (f" (asset version {builder.version}, {len(builder.removed)} stale file(s) removed)" if builder.version else "")
+        ))
+        if builder.worker_version:
+            self.stdout.write(f"Service worker version {builder.worker_version}")
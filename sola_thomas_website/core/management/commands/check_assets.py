@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.asset_check import check_django_pages, check_site
+
+
+class Command(BaseCommand):
+    help = (
+        "Check, without a server or network, that every asset the pages reference exists, "
+        "and report each page's request count and transfer weight"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--site', nargs='?', const=settings.STATIC_SITE_ROOT,
+            help="Check a plain HTML site directory instead of the Django pages "
+                 "(default: settings.STATIC_SITE_ROOT)",
+        )
+        parser.add_argument('--workers', type=int, help="Pages to check at once")
+
+    def handle(self, *args, **options):
+        if options['site']:
+            reports = check_site(options['site'], options['workers'])
+        else:
+            reports = check_django_pages(options['workers'])
+
+        problems = 0
+        for report in reports:
+            if report.error:
+                problems += 1
+                self.stdout.write(self.style.ERROR(f"{report.page}: could not render ({report.error})"))
+                continue
+            self.stdout.write(
+                f"{report.page}: {report.requests} request(s), {report.weight / 1024:.1f} KiB local"
+                + (f", {len(report.external)} external" if report.external else "")
+            )
+            for size, name in report.largest():
+                self.stdout.write(f"    {size / 1024:8.1f} KiB  {name}")
+            for url, referrer in report.missing:
+                problems += 1
+                self.stdout.write(self.style.ERROR(f"    missing {url} (referenced from {referrer})"))
+
+        if problems:
+            raise CommandError(f"{problems} broken reference(s) or page(s) found")
+        self.stdout.write(self.style.SUCCESS(f"All references in {len(reports)} page(s) resolve"))
@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.asset_check import check_django_pages, check_site
+from core.budgets import budget_for, load_budgets, measure, over_budget, record_budgets, save_budgets
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure each page's compressed weight, request count, render-blocking resources and largest image, "
+        "and fail if any exceeds its budget in settings.PERFORMANCE_BUDGETS or references a missing asset"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--site', nargs='?', const=settings.STATIC_SITE_ROOT,
+            help="Measure a plain HTML site directory (budgets under \"static_site\") instead of the Django pages",
+        )
+        parser.add_argument(
+            '--update', action='store_true',
+            help="Record current measurements (plus 10%% on sizes) as the budgets of pages over the defaults",
+        )
+
+    def handle(self, *args, **options):
+        if options['site']:
+            target, reports = 'static_site', check_site(options['site'])
+        else:
+            target, reports = 'django', check_django_pages()
+
+        # A missing asset isn't weighed, so the page would look lighter than it is
+        missing = [
+            f"{report.page}: {url} (referenced from {referrer}) is missing"
+            for report in reports for url, referrer in report.missing
+        ]
+        budgets = load_budgets(settings.PERFORMANCE_BUDGETS)
+        if options['update']:
+            if missing:
+                for failure in missing:
+                    self.stdout.write(self.style.ERROR(f"  {failure}"))
+                raise CommandError(f"Not recording budgets while {len(missing)} asset(s) are missing")
+            save_budgets(settings.PERFORMANCE_BUDGETS, record_budgets(budgets, target, reports))
+            self.stdout.write(self.style.SUCCESS(f"Updated {target} budgets in {settings.PERFORMANCE_BUDGETS}"))
+            return
+
+        failures = list(missing)
+        for report in reports:
+            if report.error:
+                failures.append(f"{report.page}: could not render ({report.error})")
+                continue
+            measurements = measure(report)
+            self.stdout.write(
+                f"{report.page}: {measurements['weight_kib']:.1f} KiB, {measurements['requests']} request(s), "
+                f"{measurements['render_blocking']} render-blocking, "
+                f"largest image {measurements['largest_image_kib']:.1f} KiB"
+            )
+            for metric, value, limit in over_budget(measurements, budget_for(budgets, target, report.page)):
+                failures.append(f"{report.page}: {metric} is {value:.1f}, budget {limit}")
+
+        for failure in failures:
+            self.stdout.write(self.style.ERROR(f"  {failure}"))
+        if failures:
+            raise CommandError(f"{len(failures)} budget check(s) failed")
+        self.stdout.write(self.style.SUCCESS(f"All {len(reports)} {target} page(s) are within budget"))
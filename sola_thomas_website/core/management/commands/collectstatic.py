@@ -0,0 +1,65 @@
+from django.contrib.staticfiles.management.commands import collectstatic
+
+from core.assets import file_hash
+from core.storage import ContentIndex
+
+
+class Command(collectstatic.Command):
+    """
+    ``collectstatic`` that decides what to copy by content hash.
+
+    The stock command compares modification times, which a fresh checkout or
+    image build resets, so without ``--clear`` it still recopies files whose
+    content is unchanged (and with it, deletes and recopies everything). Here
+    the hash of every collected file is kept in ``staticfiles.collected.json``
+    in ``STATIC_ROOT`` and only files whose hash changed are copied.
+    """
+
+    index_name = 'staticfiles.collected.json'
+
+    def set_options(self, **options):
+        super().set_options(**options)
+        self.index = None
+        if self.is_local_storage() and not self.symlink:
+            self.index = ContentIndex(self.storage.path(self.index_name))
+        self.digests = {}
+
+    def clear_dir(self, path):
+        super().clear_dir(path)
+        if self.index is not None and not path:
+            self.index.clear()
+
+    def delete_file(self, path, prefixed_path, source_storage):
+        if self.index is None:
+            return super().delete_file(path, prefixed_path, source_storage)
+        try:
+            digest = file_hash(source_storage.path(path))
+        except NotImplementedError:
+            return super().delete_file(path, prefixed_path, source_storage)
+        if self.storage.exists(prefixed_path):
+            if self.index.get(prefixed_path) == digest:
+                if prefixed_path not in self.unmodified_files:
+                    self.unmodified_files.append(prefixed_path)
+                self.log("Skipping '%s' (not modified)" % path)
+                return False
+            if self.dry_run:
+                self.log("Pretending to delete '%s'" % path)
+            else:
+                self.log("Deleting '%s'" % path)
+                self.storage.delete(prefixed_path)
+        self.digests[prefixed_path] = digest
+        return True
+
+    def copy_file(self, path, prefixed_path, source_storage):
+        super().copy_file(path, prefixed_path, source_storage)
+        if self.index is not None and not self.dry_run and prefixed_path in self.digests:
+            self.index[prefixed_path] = self.digests.pop(prefixed_path)
+
+    def collect(self):
+        collected = super().collect()
+        if self.index is not None and not self.dry_run:
+            found = set(self.copied_files) | set(self.unmodified_files)
+            for name in set(self.index) - found:
+                del self.index[name]
+            self.index.save()
+        return collected
@@ -0,0 +1,26 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from core.outbox import Dispatcher
+
+
+class Command(BaseCommand):
+    help = (
+        "Send the emails views have queued in the outbox, retrying failed sends with backoff; "
+        "runs until stopped (SIGTERM/SIGINT finish the current batch first)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Send what is due now and exit")
+        parser.add_argument('--concurrency', type=int, help="Sends in flight at once (default: EMAIL_OUTBOX_CONCURRENCY)")
+        parser.add_argument('--interval', type=float, help="Seconds between polls when idle (default: EMAIL_OUTBOX_POLL_INTERVAL)")
+
+    def handle(self, *args, **options):
+        dispatcher = Dispatcher(concurrency=options['concurrency'], poll_interval=options['interval'])
+        if not options['once']:
+            signal.signal(signal.SIGTERM, dispatcher.stop)
+            signal.signal(signal.SIGINT, dispatcher.stop)
+            self.stdout.write(f"Dispatching email, {dispatcher.concurrency} at a time")
+        dispatcher.run(once=options['once'])
+        self.stdout.write(self.style.SUCCESS("Email dispatcher stopped"))
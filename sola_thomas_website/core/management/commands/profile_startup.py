@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.startup import PHASES, flatten, profile_startup
+
+PHASE_LABELS = {'setup': 'django.setup()', 'urlconf': 'URLconf import'}
+
+
+class Command(BaseCommand):
+    help = (
+        "Start Django in a fresh interpreter and report how long django.setup() and the URLconf import "
+        "take, and which modules each spends it on"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--depth', type=int, default=2, help="Nesting depth of imports to list (default: 2)")
+        parser.add_argument('--min-ms', type=float, default=2.0, help="Leave out imports faster than this (default: 2 ms)")
+        parser.add_argument('--runs', type=int, default=1, help="Start this many times and report the fastest (default: 1)")
+
+    def handle(self, *args, **options):
+        best = None
+        for _run in range(max(options['runs'], 1)):
+            try:
+                timings, imports = profile_startup()
+            except RuntimeError as e:
+                raise CommandError(str(e))
+            if best is None or sum(timings.values()) < sum(best[0].values()):
+                best = timings, imports
+        timings, imports = best
+
+        for phase in PHASES:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{PHASE_LABELS[phase]}: {timings[phase] * 1000:.1f} ms"))
+            for entry in flatten(imports[phase], options['depth'], options['min_ms']):
+                indent = '  ' * (entry.depth + 1)
+                self.stdout.write(f"{indent}{entry.module:<{50 - len(indent)}} {entry.cumulative_ms:>8.1f} ms")
+        self.stdout.write(self.style.SUCCESS(f"Django started in {sum(timings.values()) * 1000:.1f} ms"))
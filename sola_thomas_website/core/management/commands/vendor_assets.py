@@ -0,0 +1,56 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.assets import SiteResolver
+from core.bundler import template_sources, used_names
+from core.vendor import download, install, rewrite_references
+
+
+class Command(BaseCommand):
+    help = "Self-host Bootstrap and Font Awesome: download, subset the icons in use, and rewrite CDN references"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--refresh', action='store_true',
+            help="Download again even if the files are already in the cache",
+        )
+        parser.add_argument(
+            '--no-rewrite', action='store_true',
+            help="Only install the files; leave the templates as they are",
+        )
+
+    def handle(self, *args, **options):
+        cache = Path(settings.VENDOR_DOWNLOAD_CACHE)
+        try:
+            names = download(cache, refresh=options['refresh'])
+        except OSError as e:
+            raise CommandError(f"Could not download vendor assets: {e}")
+
+        site_root = Path(settings.STATIC_SITE_ROOT)
+        targets = [Path(settings.BASE_DIR) / 'static' / 'vendor', site_root / 'vendor']
+        inventory, _prefixes = used_names()
+        codepoints = install(cache, names, targets, inventory)
+        self.stdout.write(self.style.SUCCESS(
+            f"Installed {len(names)} file(s) into {', '.join(map(str, targets))}; "
+            f"icon fonts subsetted to {len(codepoints)} glyph(s)"
+        ))
+        if options['no_rewrite']:
+            return
+
+        site = SiteResolver(site_root)
+        for path in template_sources():
+            if path.suffix != '.html':
+                continue
+            html = path.read_text(encoding='utf-8')
+            if site_root in path.parents:
+                page = path.relative_to(site_root).as_posix()
+                rewritten = rewrite_references(html, lambda name: site.url_for(f'vendor/{name}', page))
+            else:
+                rewritten = rewrite_references(html, lambda name: f"{{% static 'vendor/{name}' %}}")
+            if rewritten != html:
+                if '{% static' in rewritten and '{% load static' not in rewritten:
+                    raise CommandError(f"{path} needs {{% load static %}} before it can use vendored files")
+                path.write_text(rewritten, encoding='utf-8')
+                self.stdout.write(f"  rewrote {path}")
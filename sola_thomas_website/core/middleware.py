@@ -0,0 +1,239 @@
+import hashlib
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import cc_delim_re
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .assets import StaticResolver
+from .deploy import deploy_version
+from .preload import Preload, critical_assets
+from .routes import public_urls
+
+
+@lru_cache(maxsize=1)
+def public_paths():
+    """The paths of the site's public pages (see ``core.routes.public_urls``)."""
+    return frozenset(url for url, _name in public_urls())
+
+
+def on_streamed(response, callback):
+    """
+    Have a streaming ``response`` call ``callback(content)`` with its whole
+    body once all of it has been sent; not if the client goes away first, nor
+    if the page failed to render part-way (``core.streaming.RenderStream``).
+    """
+    original, chunks = response.streaming_content, []
+    stream = getattr(response, 'render_stream', None)
+
+    def complete():
+        return stream is None or not stream.failed
+
+    if response.is_async:
+        async def content():
+            async for chunk in original:
+                chunks.append(chunk)
+                yield chunk
+            if complete():
+                await sync_to_async(callback)(b''.join(chunks))
+    else:
+        def content():
+            for chunk in original:
+                chunks.append(chunk)
+                yield chunk
+            if complete():
+                callback(b''.join(chunks))
+    response.streaming_content = content()
+
+
+class AsyncMiddleware:
+    """
+    Base for middleware that works in both sync and async stacks.
+
+    Django runs a sync-only middleware under ASGI by moving it, and everything
+    beneath it, onto a single worker thread, which serialises every request.
+    Subclasses implement ``__call__`` for WSGI and ``__acall__`` for ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+
+class AsyncWhiteNoiseMiddleware(AsyncMiddleware, WhiteNoiseMiddleware):
+    """
+    ``whitenoise.middleware.WhiteNoiseMiddleware`` that can also call the rest
+    of the stack asynchronously (WhiteNoise 6.6's can't, see ``AsyncMiddleware``).
+    Static files are served the same way in both.
+    """
+
+    def __init__(self, get_response=None, settings=settings):
+        WhiteNoiseMiddleware.__init__(self, get_response, settings)
+        AsyncMiddleware.__init__(self, get_response)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return WhiteNoiseMiddleware.__call__(self, request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+
+class PageCacheMiddleware(AsyncMiddleware):
+    """
+    Answer anonymous GETs of public pages from the ``PAGE_CACHE_ALIAS`` cache.
+
+    A page is stored the first time it is rendered and served from then on
+    without running its view; a streaming page (``core.streaming``) is
+    stored once all of it has been sent. Keys include the deploy version
+    (``core.deploy``) and the year, so each deploy, and each new year for
+    the footer's copyright, starts with an empty cache. Requests
+    with a session cookie or a query string, and responses that set
+    cookies, vary on them, or are marked private or uncacheable, always go
+    through to the view.
+    """
+
+    @property
+    def cache(self):
+        return caches[settings.PAGE_CACHE_ALIAS]
+
+    def cacheable_request(self, request):
+        return (
+            request.method == 'GET'
+            and not request.META.get('QUERY_STRING')
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+            and request.path in public_paths()
+        )
+
+    def cacheable_response(self, response):
+        if response.status_code != 200 or response.cookies:
+            return False
+        cache_control = set(cc_delim_re.split(response.get('Cache-Control', '').lower()))
+        vary = {value.lower() for value in cc_delim_re.split(response.get('Vary', ''))}
+        return not cache_control & {'private', 'no-cache', 'no-store'} and 'cookie' not in vary
+
+    def key(self, request):
+        # The scheme matters: pages render absolute URLs (og:url) with build_absolute_uri
+        location = hashlib.sha256(f'{request.scheme}://{request.get_host()}{request.path}'.encode()).hexdigest()
+        # The footer's copyright year is the one thing on a page that changes without a deploy
+        return f'page:{deploy_version()}:{timezone.localdate().year}:{location}'
+
+    def cached_response(self, cached):
+        status, headers, content = cached
+        response = HttpResponse(content, status=status)
+        for header, value in headers:
+            response[header] = value
+        response['X-Page-Cache'] = 'hit'
+        return response
+
+    def store(self, key, response):
+        """Cache ``response``, or a streaming one once it has all been sent."""
+        status, headers = response.status_code, list(response.items())
+        if response.streaming:
+            on_streamed(response, lambda content: self.cache.set(key, (status, headers, content)))
+        else:
+            self.cache.set(key, (status, headers, response.content))
+
+    async def astore(self, key, response):
+        if response.streaming:
+            self.store(key, response)
+        else:
+            await self.cache.aset(key, (response.status_code, list(response.items()), response.content))
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.cacheable_request(request):
+            return self.get_response(request)
+        key = self.key(request)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return self.cached_response(cached)
+        response = self.get_response(request)
+        if self.cacheable_response(response):
+            self.store(key, response)
+            response['X-Page-Cache'] = 'miss'
+        return response
+
+    async def __acall__(self, request):
+        if not self.cacheable_request(request):
+            return await self.get_response(request)
+        key = self.key(request)
+        cached = await self.cache.aget(key)
+        if cached is not None:
+            return self.cached_response(cached)
+        response = await self.get_response(request)
+        if self.cacheable_response(response):
+            await self.astore(key, response)
+            response['X-Page-Cache'] = 'miss'
+        return response
+
+
+class PreloadMiddleware(AsyncMiddleware):
+    """
+    Add ``Link: rel=preload`` headers for each public page's critical images
+    and fonts (see ``core.preload``).
+
+    The list for a route is worked out from the first page rendered for it
+    and reused from then on, so it costs nothing after the first request.
+    It sits outside ``PageCacheMiddleware`` so cached pages get it too. A
+    streaming page can't get headers once it has started, so the first one
+    is sent without and the list is worked out after it has been sent.
+    Proxies and CDNs that support Early Hints send these links as a
+    ``103`` response while the page is still being rendered.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.links = {}  # path -> Link header value ('' for pages with nothing to preload)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.add_links(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.add_links(request, await self.get_response(request))
+
+    def add_links(self, request, response):
+        if (
+            request.method not in ('GET', 'HEAD')
+            or response.status_code != 200
+            or not response.get('Content-Type', '').startswith('text/html')
+            or request.path not in public_paths()
+        ):
+            return response
+        links = self.links.get(request.path)
+        if links is None:
+            if response.streaming:
+                on_streamed(response, lambda content: self.find_links(request.path, content, response.charset))
+                return response
+            links = self.find_links(request.path, response.content, response.charset)
+        if links:
+            response['Link'] = f"{response['Link']}, {links}" if response.has_header('Link') else links
+        return response
+
+    def find_links(self, path, content, charset):
+        """Work out, and remember, the ``Link`` header value for ``path`` from its page."""
+        resolver = StaticResolver()
+        html = content.decode(charset, errors='replace')
+        preloads = critical_assets(html, lambda href: resolver.resolve(href, path))
+        links = self.links[path] = ', '.join(
+            Preload(resolver.served_url(preload.href, path), preload.as_).header() for preload in preloads
+        )
+        return links
@@ -13,3 +13,37 @@ class Contact(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+
+
+class OutboxMessage(models.Model):
+    """An email waiting for (or done with) the ``dispatch_email`` process; see ``core.outbox``."""
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    )
+
+    idempotency_key = models.CharField(max_length=255, unique=True)
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=998)
+    message = models.TextField()
+    html_message = models.TextField(blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.subject} to {self.to_email} ({self.get_status_display()})"
+
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
@@ -0,0 +1,177 @@
+"""
+A database-backed outbox for transactional email.
+
+Views don't talk to the email provider: ``enqueue`` stores the message in
+``OutboxMessage`` and returns, so a slow or failing provider never holds up
+a request. ``python manage.py dispatch_email`` (a process of its own, started by
+``scripts/start.sh``) sends what is due:
+
+- at most ``EMAIL_OUTBOX_CONCURRENCY`` messages at once;
+- a failed send is retried after ``EMAIL_OUTBOX_BACKOFF_BASE`` seconds,
+  doubling every attempt up to ``EMAIL_OUTBOX_BACKOFF_MAX``, and given up on
+  (``failed``) after ``EMAIL_OUTBOX_MAX_ATTEMPTS``;
+- each message has an idempotency key. Enqueueing a key twice (a resubmitted
+  form, a retried request) stores one message, and a dispatcher only sends
+  a message it has claimed with a conditional update, so two dispatchers
+  never send the same row. A dispatcher that dies mid-send leaves its rows
+  ``sending``; they are claimed again after ``EMAIL_OUTBOX_CLAIM_TIMEOUT``.
+"""
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .email_transport import transport
+from .models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(subject, message, to_email, html_message=None, idempotency_key=None):
+    """
+    Store an email for the dispatcher; returns its ``OutboxMessage``.
+
+    Messages with the same ``idempotency_key`` are stored once; without one
+    every call is a new message.
+    """
+    key = idempotency_key or uuid.uuid4().hex
+    try:
+        with transaction.atomic():
+            return OutboxMessage.objects.create(
+                idempotency_key=key,
+                to_email=to_email,
+                subject=subject,
+                message=message,
+                html_message=html_message,
+            )
+    except IntegrityError:
+        logger.info("Email %r is already in the outbox", key)
+        return OutboxMessage.objects.get(idempotency_key=key)
+
+
+def backlog():
+    """Messages waiting to be sent, including those being sent right now."""
+    return OutboxMessage.objects.filter(status__in=[OutboxMessage.PENDING, OutboxMessage.SENDING]).count()
+
+
+def backoff(attempts):
+    """Seconds to wait before retrying a message that has failed ``attempts`` times."""
+    return min(settings.EMAIL_OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1), settings.EMAIL_OUTBOX_BACKOFF_MAX)
+
+
+def deliver(outbox_message):
+    """Send one message through the email backend; raises on failure."""
+    email = EmailMultiAlternatives(
+        outbox_message.subject,
+        outbox_message.message,
+        settings.DEFAULT_FROM_EMAIL,
+        [outbox_message.to_email],
+    )
+    if outbox_message.html_message:
+        email.attach_alternative(outbox_message.html_message, 'text/html')
+    email.send(fail_silently=False)
+
+
+def _due(now):
+    stale = now - timedelta(seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT)
+    return (
+        Q(status=OutboxMessage.PENDING, next_attempt_at__lte=now)
+        | Q(status=OutboxMessage.SENDING, claimed_at__lt=stale)
+    )
+
+
+def claim(limit, now=None):
+    """
+    Claim up to ``limit`` due messages for this dispatcher; returns them.
+
+    Each row is taken with an update conditional on it still being due, so
+    when dispatchers race for a row exactly one of them gets it.
+    """
+    now = now or timezone.now()
+    claimed = []
+    for pk in OutboxMessage.objects.filter(_due(now)).values_list('pk', flat=True)[:limit]:
+        taken = OutboxMessage.objects.filter(_due(now), pk=pk).update(
+            status=OutboxMessage.SENDING, claimed_at=now, attempts=F('attempts') + 1,
+        )
+        if taken:
+            claimed.append(OutboxMessage.objects.get(pk=pk))
+    return claimed
+
+
+def record(outbox_message, error=None, now=None):
+    """Mark a claimed message sent, or schedule its retry (or give up) after ``error``."""
+    now = now or timezone.now()
+    if error is None:
+        outbox_message.status = OutboxMessage.SENT
+        outbox_message.sent_at = now
+        outbox_message.last_error = ''
+    elif outbox_message.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        outbox_message.status = OutboxMessage.FAILED
+        outbox_message.last_error = error
+        logger.error("Giving up on email %r after %d attempts: %s",
+                     outbox_message.idempotency_key, outbox_message.attempts, error)
+    else:
+        outbox_message.status = OutboxMessage.PENDING
+        outbox_message.next_attempt_at = now + timedelta(seconds=backoff(outbox_message.attempts))
+        outbox_message.last_error = error
+        logger.warning("Email %r failed (attempt %d), retrying at %s: %s", outbox_message.idempotency_key,
+                       outbox_message.attempts, outbox_message.next_attempt_at, error)
+    outbox_message.claimed_at = None
+    outbox_message.save(update_fields=['status', 'sent_at', 'last_error', 'next_attempt_at', 'claimed_at'])
+
+
+def _send(outbox_message):
+    try:
+        deliver(outbox_message)
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+class Dispatcher:
+    """Sends due outbox messages, ``concurrency`` at a time, until stopped."""
+
+    def __init__(self, concurrency=None, poll_interval=None):
+        self.concurrency = concurrency or settings.EMAIL_OUTBOX_CONCURRENCY
+        self.poll_interval = settings.EMAIL_OUTBOX_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.stopping = threading.Event()
+
+    def dispatch(self):
+        """Send one batch of due messages; returns ``(sent, failed)``."""
+        batch = claim(self.concurrency)
+        if not batch:
+            return 0, 0
+        # Only the sends run in the pool; the database is updated from this thread
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            errors = list(pool.map(_send, batch))
+        for outbox_message, error in zip(batch, errors):
+            record(outbox_message, error)
+        failed = sum(error is not None for error in errors)
+        return len(batch) - failed, failed
+
+    def run(self, once=False):
+        """Dispatch until ``stop()`` (or, with ``once``, until nothing is due)."""
+        while not self.stopping.is_set():
+            close_old_connections()
+            sent, failed = self.dispatch()
+            if sent or failed:
+                logger.info("Dispatched %d email(s), %d failed; transport %s", sent, failed, transport().summary())
+            elif once:
+                break
+            else:
+                self.stopping.wait(self.poll_interval)
+
+    def stop(self, *args):
+        self.stopping.set()
+
+
+def dispatch_pending():
+    """Send everything that is due now, in this process; for tests and one-off runs."""
+    Dispatcher().run(once=True)
@@ -0,0 +1,180 @@
+"""
+Preload hints for the assets a page needs for its first paint.
+
+A browser only finds a hero background or a web font after it has fetched
+and parsed the stylesheet that mentions it. ``critical_assets`` finds them
+up front from the rendered page: images in the part of the page visible
+before scrolling (inline ``background`` styles and eager ``<img>`` tags), the
+backgrounds the page's stylesheets give to elements there, and the fonts
+those elements use.
+
+``PreloadMiddleware`` sends them as ``Link: rel=preload`` headers, which a
+CDN or proxy that supports it also turns into ``103 Early Hints``;
+``preload_links`` writes them into the head of statically built pages.
+"""
+import re
+
+from django.conf import settings
+from django.utils.html import escape
+
+from .assets import CSS_URL_RE, is_local, rebase_url, tag_attributes
+from .critical_css import LINK_RE, _parsed, above_the_fold
+from .css import AtRule, filter_rules, html_inventory, selector_matches, split_top_level
+
+IMG_RE = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+PICTURE_RE = re.compile(r'<picture\b.*?</picture>', re.IGNORECASE | re.S)
+STYLE_ATTRIBUTE_RE = re.compile(r'''\bstyle\s*=\s*(["'])(.*?)\1''', re.S)
+FONT_TYPES = {'.woff2': 'font/woff2', '.woff': 'font/woff', '.ttf': 'font/ttf', '.otf': 'font/otf'}
+
+
+class Preload:
+    """One asset to preload: its URL as the page refers to it, and what it is."""
+
+    def __init__(self, href, as_):
+        self.href = href
+        self.as_ = as_
+
+    @property
+    def type(self):
+        if self.as_ == 'font':
+            return FONT_TYPES.get('.' + self.href.split('?')[0].rsplit('.', 1)[-1].lower())
+        return None
+
+    def __eq__(self, other):
+        return (self.href, self.as_) == (other.href, other.as_)
+
+    def __hash__(self):
+        return hash((self.href, self.as_))
+
+    def __repr__(self):
+        return f'Preload({self.href!r}, {self.as_!r})'
+
+    def header(self):
+        """The asset as one entry of a ``Link`` header."""
+        value = f'<{self.href}>; rel=preload; as={self.as_}'
+        if self.type:
+            value += f'; type="{self.type}"'
+        if self.as_ == 'font':
+            value += '; crossorigin'
+        return value
+
+    def tag(self):
+        """The asset as a ``<link rel="preload">`` element."""
+        attrs = f' type="{self.type}"' if self.type else ''
+        if self.as_ == 'font':
+            attrs += ' crossorigin'
+        return f'<link rel="preload" href="{escape(self.href)}" as="{self.as_}"{attrs}>'
+
+
+def _declarations(body):
+    for declaration in split_top_level(body, ';'):
+        name, _, value = declaration.partition(':')
+        if value:
+            yield name.strip().lower(), value.strip()
+
+
+def _style_rules(rules):
+    for rule in rules:
+        if isinstance(rule, AtRule) and rule.rules is not None:
+            yield from _style_rules(rule.rules)
+        else:
+            yield rule
+
+
+def _font_families(value):
+    return {family.strip().strip('"\'').lower() for family in split_top_level(value, ',')}
+
+
+def stylesheet_assets(css_path, href, inventory):
+    """
+    Background images that rules in ``css_path`` give to elements in
+    ``inventory``, followed by the fonts those rules use, as Preloads with
+    URLs rebased onto the page that links the stylesheet as ``href``.
+    """
+    rules = filter_rules(
+        _parsed(str(css_path), css_path.stat().st_mtime),
+        lambda selector: selector_matches(selector, inventory),
+        lambda rule: rule.name == '@font-face',
+    )
+    images, families, faces = [], set(), []
+    for rule in _style_rules(rules):
+        if isinstance(rule, AtRule):
+            faces.append(dict(_declarations(rule.body or '')))
+            continue
+        for name, value in _declarations(rule.body):
+            if name.startswith('background'):
+                images.extend(m.group('url') for m in CSS_URL_RE.finditer(value))
+            elif name == 'font-family':
+                families |= _font_families(value)
+    fonts = []
+    for face in faces:
+        if _font_families(face.get('font-family', '')) & families:
+            urls = [m.group('url') for m in CSS_URL_RE.finditer(face.get('src', ''))]
+            preferred = [url for url in urls if url.split('?')[0].endswith('.woff2')] or urls
+            fonts.extend(preferred[:1])
+    return (
+        [Preload(rebase_url(url, href), 'image') for url in images if is_local(url)]
+        + [Preload(rebase_url(url, href), 'font') for url in fonts if is_local(url)]
+    )
+
+
+def critical_assets(html, resolve, limit=None):
+    """
+    The images and fonts ``html`` needs for its first paint, most important
+    first, as a list of Preloads.
+
+    ``resolve(href)`` returns the file a reference on the page points at, or
+    None; stylesheets that can't be read and assets that don't exist are
+    skipped.
+    """
+    limit = settings.PRELOAD_MAX_ASSETS if limit is None else limit
+    head_end = max(html.find('</head>'), 0)
+    fold = above_the_fold(html)
+    preloads = []
+
+    # Images in <picture> pick their own source, so they can't be preloaded by URL
+    visible = PICTURE_RE.sub('', fold[head_end:])
+    for match in STYLE_ATTRIBUTE_RE.finditer(visible):
+        preloads.extend(Preload(m.group('url'), 'image') for m in CSS_URL_RE.finditer(match.group(2)))
+    for match in IMG_RE.finditer(visible):
+        attrs = tag_attributes(match.group(0))
+        if attrs.get('src') and attrs.get('loading') != 'lazy' and not attrs.get('srcset'):
+            preloads.append(Preload(attrs['src'], 'image'))
+
+    inventory = html_inventory(fold)
+    for match in LINK_RE.finditer(html[:head_end]):
+        attrs = tag_attributes(match.group(0))
+        rel = (attrs.get('rel') or '').lower().split()
+        is_stylesheet = 'stylesheet' in rel or ('preload' in rel and attrs.get('as') == 'style')
+        if not is_stylesheet or attrs.get('media', 'all') not in ('all', 'screen') or not attrs.get('href'):
+            continue
+        source = resolve(attrs['href'])
+        if source is not None and source.suffix == '.css':
+            preloads.extend(stylesheet_assets(source, attrs['href'], inventory))
+
+    unique = []
+    for preload in preloads:
+        if is_local(preload.href) and preload not in unique and resolve(preload.href) is not None:
+            unique.append(preload)
+    return unique[:limit]
+
+
+def preload_links(html, context):
+    """
+    Page processor: add ``<link rel="preload">`` tags for the page's critical
+    assets to the start of its ``<head>``, skipping any it already preloads.
+    """
+    head_end = html.find('</head>')
+    if head_end == -1:
+        return html
+    existing = {tag_attributes(m.group(0)).get('href') for m in LINK_RE.finditer(html[:head_end])}
+    tags = ''.join(
+        preload.tag() for preload in critical_assets(html, context.resolve)
+        if preload.href not in existing
+    )
+    if not tags:
+        return html
+    # After <meta charset>, which must stay within the first 1024 bytes
+    charset = re.search(r'<meta\s+charset[^>]*>', html[:head_end], re.IGNORECASE)
+    position = charset.end() if charset else head_end
+    return html[:position] + tags + html[position:]
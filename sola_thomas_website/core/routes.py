@@ -0,0 +1,32 @@
+"""
+The site's public pages, as listed by the URLconf.
+
+The page cache, preload links and warm-up use this on the request path, so
+it is kept apart from ``core.static_build`` and the test utilities that
+module renders pages with.
+"""
+from django.conf import settings
+from django.urls import URLPattern, URLResolver, get_resolver
+
+
+def public_urls(patterns=None, prefix='', namespace=None):
+    """
+    Yield ``(url, name)`` for every URL pattern that takes no arguments.
+
+    Patterns listed by name in ``settings.STATIC_BUILD_EXCLUDE`` are skipped.
+    """
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    exclude = set(getattr(settings, 'STATIC_BUILD_EXCLUDE', ()))
+    for pattern in patterns:
+        if pattern.pattern.regex.groups:
+            continue
+        route = str(pattern.pattern).lstrip('^').rstrip('$')
+        if isinstance(pattern, URLResolver):
+            child_namespace = ':'.join(filter(None, [namespace, pattern.namespace])) or None
+            yield from public_urls(pattern.url_patterns, prefix + route, child_namespace)
+        elif isinstance(pattern, URLPattern):
+            name = f'{namespace}:{pattern.name}' if namespace and pattern.name else pattern.name
+            if name in exclude or pattern.name in exclude:
+                continue
+            yield '/' + prefix + route, name
@@ -0,0 +1,133 @@
+"""
+Service worker for the plain HTML site build.
+
+``build_static_site`` writes ``sw.js`` next to the pages. On install it
+precaches the pages and the shell they share (stylesheets, scripts and
+fonts); images, most of the site's bytes, are only cached once a page has
+used them, so a first visit doesn't download every page's photos. The cache
+is named after a hash of everything precached, so each deploy that changes
+anything installs a fresh copy and drops the old one. At runtime pages and
+images are served stale-while-revalidate (instantly from the cache,
+refreshed in the background) and other content-hashed assets cache-first,
+since their content never changes under a given name.
+"""
+import hashlib
+import json
+from string import Template
+
+from .assets import file_hash
+
+SERVICE_WORKER_NAME = 'sw.js'
+
+# Asset kinds (as ``check_page`` reports them) every page needs to render
+SHELL_KINDS = {'stylesheet', 'script', 'font'}
+
+SERVICE_WORKER_JS = Template("""\
+// Generated by build_static_site; do not edit.
+const VERSION = $version;
+const PRECACHE = $precache;
+const CACHE = 'site-' + VERSION;
+const HASHED = /(^|[.\\/])[0-9a-f]{12}\\.[A-Za-z0-9]+$$/;
+
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(CACHE).then(cache => cache.addAll(PRECACHE)).then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(
+                keys.filter(key => key.startsWith('site-') && key !== CACHE).map(key => caches.delete(key))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+function store(request, response) {
+    if (response.ok) {
+        const copy = response.clone();
+        caches.open(CACHE).then(cache => cache.put(request, copy));
+    }
+    return response;
+}
+
+function cacheFirst(request) {
+    return caches.match(request).then(cached => cached || fetch(request).then(response => store(request, response)));
+}
+
+function staleWhileRevalidate(event, options) {
+    const request = event.request;
+    const network = fetch(request).then(response => store(request, response));
+    event.waitUntil(network.catch(() => undefined));
+    return caches.match(request, options).then(cached => cached || network);
+}
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    const url = new URL(request.url);
+    if (request.method !== 'GET' || url.origin !== self.location.origin) {
+        return;
+    }
+    if (request.mode === 'navigate' || request.destination === 'document') {
+        event.respondWith(staleWhileRevalidate(event, {ignoreSearch: true}));
+    } else if (request.destination === 'image') {
+        event.respondWith(staleWhileRevalidate(event));
+    } else if (HASHED.test(url.pathname)) {
+        event.respondWith(cacheFirst(request));
+    }
+});
+""")
+
+REGISTRATION = (
+    "<script>if ('serviceWorker' in navigator) {{ addEventListener('load', function () {{ "
+    "navigator.serviceWorker.register('{url}'); }}); }}</script>"
+)
+
+
+def register_service_worker(html, url):
+    """Add the script registering the service worker at ``url`` to the end of a page's body."""
+    script = REGISTRATION.format(url=url)
+    position = html.rfind('</body>')
+    if position == -1:
+        return html + script
+    return html[:position] + script + '\n' + html[position:]
+
+
+def precache_list(pages, resolver):
+    """
+    The pages (``{name: html}``) and the stylesheets, scripts and fonts they
+    load, directly or through their stylesheets, as site-relative names.
+    Images are left out; the worker caches those as pages use them.
+    """
+    from .asset_check import check_page
+
+    names = set(pages)
+    for name, html in pages.items():
+        assets = check_page(name, html, resolver).assets
+        names.update(asset for asset, (kind, _size) in assets.items() if kind in SHELL_KINDS)
+    if 'index.html' in names:
+        names.add('./')
+    return sorted(names)
+
+
+def service_worker(pages, resolver, output_dir):
+    """
+    Return ``(script, version)`` for a service worker precaching ``pages``
+    and their shell. The version is a hash of every precached file, so
+    it changes whenever any of them does.
+    """
+    precache = precache_list(pages, resolver)
+    digest = hashlib.sha256()
+    for name in precache:
+        if name in pages:
+            content = hashlib.sha256(pages[name].encode()).hexdigest()
+        elif name == './':
+            continue
+        else:
+            content = file_hash(output_dir / name)
+        digest.update(f'{name}\0{content}\n'.encode())
+    version = digest.hexdigest()[:12]
+    script = SERVICE_WORKER_JS.substitute(version=json.dumps(version), precache=json.dumps(precache, indent=4))
+    return script, version
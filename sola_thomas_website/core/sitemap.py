@@ -0,0 +1,161 @@
+"""
+``sitemap.xml`` and ``robots.txt``, generated at deploy.
+
+``build_sitemap`` renders every public Django page and lists it with a
+``lastmod`` that only moves when the page's content hash does: the index in
+``SITEMAP_ROOT`` remembers each page's hash and the date it was first seen,
+so crawlers only come back for pages a deploy actually changed.
+``build_static_site`` does the same for the plain HTML site (``gilbarco.html``
+and the rest) and writes the two files into its output.
+
+The Django views serve the generated files from memory, read once per
+process, with an ``ETag``; a deploy restarts the workers.
+"""
+import hashlib
+import json
+import logging
+from functools import lru_cache
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .routes import public_urls
+
+logger = logging.getLogger(__name__)
+
+SITEMAP_NAME = 'sitemap.xml'
+ROBOTS_NAME = 'robots.txt'
+LASTMOD_INDEX_NAME = 'lastmod.json'
+CONTENT_TYPES = {SITEMAP_NAME: 'application/xml', ROBOTS_NAME: 'text/plain'}
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode() if isinstance(content, str) else content).hexdigest()
+
+
+def load_index(path):
+    path = Path(path)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_index(path, index):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(index, indent=2, sort_keys=True) + '\n')
+
+
+def lastmods(hashes, index, today=None):
+    """
+    ``{location: lastmod}`` for pages with content hashes ``{location: hash}``.
+
+    ``index`` is the same site's previous ``{location: {'hash', 'lastmod'}}``;
+    a page keeps its lastmod while its hash is unchanged and gets ``today``
+    otherwise. ``index`` is updated in place, dropping pages that are gone.
+    """
+    today = (today or timezone.now().date()).isoformat()
+    for location in set(index) - set(hashes):
+        del index[location]
+    for location, digest in hashes.items():
+        entry = index.get(location)
+        if entry is None or entry['hash'] != digest:
+            index[location] = {'hash': digest, 'lastmod': today}
+    return {location: index[location]['lastmod'] for location in hashes}
+
+
+def sitemap_xml(entries):
+    """A sitemap for ``[(absolute URL, lastmod or None)]``."""
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for location, lastmod in entries:
+        lastmod = f'<lastmod>{lastmod}</lastmod>' if lastmod else ''
+        lines.append(f'  <url><loc>{escape(location)}</loc>{lastmod}</url>')
+    lines.append('</urlset>')
+    return '\n'.join(lines) + '\n'
+
+
+def robots_txt(sitemap_url, disallow=()):
+    lines = ['User-agent: *']
+    lines += [f'Disallow: {path}' for path in disallow] or ['Disallow:']
+    lines += ['', f'Sitemap: {sitemap_url}']
+    return '\n'.join(lines) + '\n'
+
+
+def write_sitemap(output_dir, base_url, hashes, site, disallow=()):
+    """
+    Write ``sitemap.xml`` and ``robots.txt`` for pages ``{path: hash}`` of a
+    site served at ``base_url`` into ``output_dir``, keeping their lastmods
+    under ``site`` in the index. Returns the names written.
+    """
+    output_dir = Path(output_dir)
+    base_url = base_url.rstrip('/')
+    index_path = Path(settings.SITEMAP_ROOT) / LASTMOD_INDEX_NAME
+    index = load_index(index_path)
+    dates = lastmods(hashes, index.setdefault(site, {}))
+    save_index(index_path, index)
+    entries = [(base_url + '/' + path.lstrip('/'), dates[path]) for path in sorted(hashes)]
+    output_dir.mkdir(parents=True, exist_ok=True)
+    (output_dir / SITEMAP_NAME).write_text(sitemap_xml(entries), encoding='utf-8')
+    (output_dir / ROBOTS_NAME).write_text(robots_txt(f'{base_url}/{SITEMAP_NAME}', disallow), encoding='utf-8')
+    return [SITEMAP_NAME, ROBOTS_NAME]
+
+
+def site_url():
+    return f'https://{settings.SITE_DOMAIN}'
+
+
+def build_django_sitemap(output_dir=None):
+    """Render every public page and write the Django site's sitemap and robots.txt."""
+    from .static_build import render_url
+
+    hashes = {}
+    for url, _name in public_urls():
+        html, _templates, _view = render_url(url)
+        hashes[url] = content_hash(html)
+    return write_sitemap(output_dir or settings.SITEMAP_ROOT, site_url(), hashes, 'django', settings.ROBOTS_DISALLOW)
+
+
+def site_page_hashes(pages):
+    """``{path: hash}`` for a plain HTML site's pages ``{name: html}``; ``index.html`` pages by their directory."""
+    hashes = {}
+    for name, html in pages.items():
+        path = name[:-len('index.html')] if name == 'index.html' or name.endswith('/index.html') else name
+        hashes[path] = content_hash(html)
+    return hashes
+
+
+@lru_cache(maxsize=None)
+def generated_file(name):
+    """
+    ``(content, etag)`` of a generated file, read once per process. Without
+    a build, a sitemap without lastmods is made up from the URLconf.
+    """
+    path = Path(settings.SITEMAP_ROOT) / name
+    if path.exists():
+        content = path.read_bytes()
+    else:
+        logger.warning("%s hasn't been built (python manage.py build_sitemap); serving it without lastmod", name)
+        if name == SITEMAP_NAME:
+            content = sitemap_xml([(site_url() + url, None) for url, _name in public_urls()]).encode()
+        else:
+            content = robots_txt(f'{site_url()}/{SITEMAP_NAME}', settings.ROBOTS_DISALLOW).encode()
+    return content, content_hash(content)[:32]
+
+
+def generated_view(name):
+    @condition(etag_func=lambda request: generated_file(name)[1])
+    def view(request):
+        response = HttpResponse(generated_file(name)[0], content_type=CONTENT_TYPES[name])
+        patch_cache_control(response, public=True, max_age=settings.SITEMAP_MAX_AGE)
+        return response
+    view.__name__ = name.replace('.', '_')
+    return view
+
+
+sitemap = generated_view(SITEMAP_NAME)
+robots = generated_view(ROBOTS_NAME)
@@ -0,0 +1,124 @@
+"""
+Measure what a fresh process spends starting Django.
+
+``profile_startup`` runs ``django.setup()`` and then the URLconf import (the
+project's and every ``include()``) in a new interpreter with
+``-X importtime``, and returns each phase's wall time and the modules it
+imported, nested the way Python imported them. Every worker gunicorn
+recycles, and every management command, pays for this again.
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+
+PHASE_MARKER = 'startup-phase:'
+RESULT_MARKER = 'startup-result:'
+IMPORTTIME_RE = re.compile(r'^import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \|(?P<indent>\s+)(?P<module>\S+)$')
+
+PROBE = f"""\
+import json, sys, time
+
+def phase(name):
+    sys.stderr.write({PHASE_MARKER!r} + name + '\\n')
+    sys.stderr.flush()
+
+timings = {{}}
+phase('setup')
+start = time.perf_counter()
+import django
+django.setup()
+timings['setup'] = time.perf_counter() - start
+
+phase('urlconf')
+start = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+timings['urlconf'] = time.perf_counter() - start
+phase('done')
+print({RESULT_MARKER!r} + json.dumps(timings))
+"""
+
+PHASES = ('setup', 'urlconf')
+
+
+class Import:
+    """One module import: its own time, including what it imported, and those imports."""
+
+    def __init__(self, module, self_us, cumulative_us, depth):
+        self.module = module
+        self.self_ms = self_us / 1000
+        self.cumulative_ms = cumulative_us / 1000
+        self.depth = depth
+        self.children = []
+
+    def __repr__(self):
+        return f'Import({self.module!r}, {self.cumulative_ms:.1f} ms)'
+
+
+def parse_importtime(lines):
+    """
+    Turn ``-X importtime`` output into ``{phase: [Import]}``, the top-level
+    imports of each phase with their nested imports as ``children``.
+    """
+    phases, phase = {}, None
+    pending = []  # imports not yet attached to a parent, deepest last
+    for line in lines:
+        if line.startswith(PHASE_MARKER):
+            phase = line[len(PHASE_MARKER):].strip()
+            phases.setdefault(phase, [])
+            pending = []
+            continue
+        match = IMPORTTIME_RE.match(line.rstrip('\n'))
+        if match is None or phase is None:
+            continue
+        depth = (len(match.group('indent')) - 1) // 2
+        entry = Import(match.group('module'), int(match.group('self')), int(match.group('cumulative')), depth)
+        # Python reports a module after everything it imported, so the
+        # pending entries one level deeper are its children
+        while pending and pending[-1].depth > depth:
+            entry.children.insert(0, pending.pop())
+        if depth == 0:
+            phases[phase].append(entry)
+        else:
+            pending.append(entry)
+    return phases
+
+
+def profile_startup(settings_module=None):
+    """
+    Start Django in a fresh interpreter; returns ``(timings, imports)``:
+    seconds per phase, and ``{phase: [Import]}``.
+    """
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE=settings_module or os.environ.get('DJANGO_SETTINGS_MODULE', 'sola_thomas_website.settings'),
+        # settings.py prints its banner only once per environment
+        DJANGO_SETTINGS_MESSAGE_DISPLAYED='True',
+        PYTHONPATH=os.pathsep.join(filter(None, [str(settings.BASE_DIR), os.environ.get('PYTHONPATH')])),
+    )
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    timings = None
+    for line in result.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            timings = json.loads(line[len(RESULT_MARKER):])
+    if result.returncode != 0 or timings is None:
+        raise RuntimeError(f"Django failed to start: {result.stderr.strip()[-2000:]}")
+    imports = parse_importtime(result.stderr.splitlines())
+    return timings, {phase: imports.get(phase, []) for phase in PHASES}
+
+
+def flatten(imports, max_depth, min_ms):
+    """The imports (and their children down to ``max_depth``) taking at least ``min_ms``, in import order."""
+    for entry in imports:
+        if entry.cumulative_ms < min_ms:
+            continue
+        yield entry
+        if entry.depth < max_depth:
+            yield from flatten(entry.children, max_depth, min_ms)
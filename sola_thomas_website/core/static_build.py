@@ -0,0 +1,424 @@
+"""
+Pre-render the public Django pages into a static, deployable tree.
+
+Every page is rendered in-process through its view. While it renders we record
+which template files were used and which static files the output references,
+so a later build can skip pages whose inputs are unchanged.
+"""
+import importlib
+import inspect
+import json
+import logging
+import os
+import shutil
+from contextlib import contextmanager
+from itertools import repeat
+from pathlib import Path
+
+from django.conf import settings
+from django.template.base import Template
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.urls import resolve
+from django.utils.module_loading import import_string
+from whitenoise.compress import Compressor
+
+from .assets import SiteResolver, StaticResolver, css_references, file_hash, html_references
+from .fingerprint import Fingerprinter, load_asset_manifest, save_asset_manifest
+from .routes import public_urls
+from .service_worker import SERVICE_WORKER_NAME, register_service_worker, service_worker
+from .sitemap import site_page_hashes, write_sitemap
+from .storage import compress_file, parallel_map
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = '.build-manifest.json'
+
+# Files kept next to the site's sources that aren't part of the site
+SOURCE_ONLY_SUFFIXES = ('.md',)
+
+
+def page_processors():
+    """The callables listed in ``settings.STATIC_BUILD_PROCESSORS``."""
+    return [import_string(path) for path in getattr(settings, 'STATIC_BUILD_PROCESSORS', ())]
+
+
+class PageContext:
+    """
+    What a page processor knows about the page it is rewriting.
+
+    ``url`` is the page's URL (its path, for a plain HTML site) and
+    ``resolver`` maps the page's references to source files. Processors that
+    generate files of their own write them into the build with ``emit()``.
+    """
+
+    def __init__(self, url, resolver, output_dir, static_dir=''):
+        self.url = url
+        self.resolver = resolver
+        self.output_dir = Path(output_dir)
+        self.static_dir = static_dir
+        self.emitted = {}
+        self.sources = set()
+
+    def resolve(self, href, base=None):
+        """
+        Return the file behind a reference (relative to ``base``, or to the
+        page), including files emitted earlier in this build.
+        """
+        base = base or self.url
+        name = self.resolver.static_path(href, base)
+        if name is None:
+            return None
+        if name in self.emitted:
+            return self.emitted[name]
+        source = self.resolver.resolve(href, base)
+        if source is not None:
+            self.sources.add(source)
+        return source
+
+    def emit(self, name, content):
+        """Write a generated static file and return the URL the page should use for it."""
+        target = self.output_dir / self.static_dir / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content, encoding='utf-8')
+        self.emitted[name] = target
+        return self.resolver.url_for(name, self.url)
+
+
+def process_page(html, context):
+    """
+    Run a rendered page through every page processor in turn.
+
+    A processor is called as ``processor(html, context)`` with a PageContext
+    and returns the new HTML.
+    """
+    for processor in page_processors():
+        html = processor(html, context)
+    return html
+
+
+def output_path(url):
+    """Map a URL path to the file it is written to inside the build tree."""
+    path = url.lstrip('/')
+    if not path or path.endswith('/'):
+        return path + 'index.html'
+    if '.' not in path.rsplit('/', 1)[-1]:
+        return path + '.html'
+    return path
+
+
+@contextmanager
+def track_templates():
+    """Record the source file of every template rendered inside the block."""
+    used = []
+    original = Template._render
+
+    def _render(self, context):
+        if self.origin and self.origin.loader is not None:
+            used.append(self.origin.name)
+        return original(self, context)
+
+    Template._render = _render
+    try:
+        yield used
+    finally:
+        Template._render = original
+
+
+class Page:
+    """A rendered page plus the input files it was built from."""
+
+    def __init__(self, url, name, content, templates, assets, view_source, sources=(), generated=()):
+        self.url = url
+        self.name = name
+        self.content = content
+        self.templates = templates
+        self.assets = assets
+        self.view_source = view_source
+        # Files the page processors read and the files they wrote
+        self.sources = sources
+        self.generated = generated
+
+    @property
+    def inputs(self):
+        """
+        Every file whose change should trigger a rebuild of this page, relative
+        to ``BASE_DIR`` so the manifest stays valid on another checkout.
+        """
+        files = set(self.templates) | set(self.assets.values()) | set(self.sources)
+        if self.view_source:
+            files.add(self.view_source)
+        files.add(importlib.import_module(settings.SETTINGS_MODULE).__file__)
+        return sorted(Path(os.path.relpath(f, settings.BASE_DIR)).as_posix() for f in files)
+
+
+def page_assets(content, context):
+    """
+    Return ``{static_path: source_file}`` for the local static files a page uses.
+
+    Stylesheets are followed so that images and fonts they reference are
+    included. Files emitted by the page processors are left out, since they
+    are already in the build.
+    """
+    resolver = context.resolver
+    found = {}
+    pending = [(url, None) for _kind, url in html_references(content)]
+    while pending:
+        url, base = pending.pop()
+        name = resolver.static_path(url, base or context.url)
+        if name is None or name in found:
+            continue
+        source = context.resolve(url, base)
+        if source is None:
+            logger.warning("Static reference %s does not match any file", url)
+            continue
+        found[name] = source
+        if source.suffix == '.css':
+            css = source.read_text(encoding='utf-8', errors='replace')
+            pending.extend((ref, resolver.url_for(name)) for ref in css_references(css))
+    return {name: source for name, source in found.items() if name not in context.emitted}
+
+
+def render_url(url):
+    """
+    Render ``url`` through its view as an anonymous GET.
+
+    Returns the HTML, the template files used and the view function.
+    """
+    match = resolve(url)
+    factory = RequestFactory(HTTP_HOST=settings.SITE_DOMAIN)
+    request = factory.get(url, secure=True)
+    request.resolver_match = match
+    with track_templates() as templates, override_settings(ALLOWED_HOSTS=[settings.SITE_DOMAIN], STREAMING_RENDER=False):
+        response = match.func(request, *match.args, **match.kwargs)
+        if hasattr(response, 'render') and not response.is_rendered:
+            response.render()
+    if response.status_code != 200:
+        raise ValueError(f"{url} returned status {response.status_code}")
+    return response.content.decode(response.charset), list(dict.fromkeys(templates)), match.func
+
+
+def render_page(url, name, output_dir):
+    """
+    Render ``url`` and run it through the page processors, returning a Page.
+
+    Files generated by the page processors are written under ``output_dir``.
+    """
+    html, templates, view = render_url(url)
+    context = PageContext(url, StaticResolver(), output_dir, settings.STATIC_URL.strip('/'))
+    content = process_page(html, context)
+    try:
+        view_source = inspect.getsourcefile(inspect.unwrap(view))
+    except TypeError:
+        view_source = None
+    return Page(
+        url, name, content, templates, page_assets(content, context), view_source,
+        sources=sorted(context.sources), generated=sorted(context.emitted),
+    )
+
+
+class BuildManifest:
+    """The record of what was built last time, stored alongside the output."""
+
+    def __init__(self, root):
+        self.path = Path(root) / MANIFEST_NAME
+        self.pages = {}
+        self.assets = {}
+        if self.path.exists():
+            data = json.loads(self.path.read_text())
+            self.pages = data.get('pages', {})
+            self.assets = data.get('assets', {})
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps({'pages': self.pages, 'assets': self.assets}, indent=2, sort_keys=True))
+
+
+class StaticSiteBuilder:
+    """
+    Render public pages into ``output_dir`` and copy the static files they use.
+
+    Pages whose recorded inputs all hash the same as last time are left alone.
+    """
+
+    def __init__(self, output_dir, force=False):
+        self.output_dir = Path(output_dir)
+        self.force = force
+        self.manifest = BuildManifest(self.output_dir)
+        self._hashes = {}
+        self.rendered = []
+        self.skipped = []
+        self.failed = []
+        self.removed = []
+
+    def hash(self, path):
+        """Hash a file, caching the result for the rest of the build."""
+        path = Path(settings.BASE_DIR, path)
+        if path not in self._hashes:
+            self._hashes[path] = file_hash(path) if path.exists() else None
+        return self._hashes[path]
+
+    def is_fresh(self, url):
+        """True if the page was built before and none of its inputs changed."""
+        entry = self.manifest.pages.get(url)
+        if self.force or not entry or not (self.output_dir / entry['output']).exists():
+            return False
+        if not all((self.output_dir / name).exists() for name in entry.get('generated', ())):
+            return False
+        return all(self.hash(path) == digest for path, digest in entry['inputs'].items())
+
+    def write_page(self, page):
+        target = self.output_dir / output_path(page.url)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(page.content, encoding='utf-8')
+        static_root = settings.STATIC_URL.strip('/')
+        for name, source in page.assets.items():
+            self.copy_asset(f'{static_root}/{name}', source)
+        self.manifest.pages[page.url] = {
+            'name': page.name,
+            'output': output_path(page.url),
+            'inputs': {path: self.hash(path) for path in page.inputs},
+            'assets': sorted(f'{static_root}/{name}' for name in page.assets),
+            'generated': [f'{static_root}/{name}' for name in page.generated],
+        }
+
+    def copy_asset(self, name, source):
+        digest = self.hash(source)
+        target = self.output_dir / name
+        if self.manifest.assets.get(name) == digest and target.exists():
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source, target)
+        self.manifest.assets[name] = digest
+
+    def remove_stale(self, urls):
+        """Delete pages that were built before but are no longer routed or no longer render."""
+        for url in set(self.manifest.pages) - set(urls):
+            entry = self.manifest.pages.pop(url)
+            (self.output_dir / entry['output']).unlink(missing_ok=True)
+            self.removed.append(url)
+
+    def build(self, urls=None):
+        urls = list(urls if urls is not None else public_urls())
+        for url, name in urls:
+            if self.is_fresh(url):
+                self.skipped.append(url)
+                continue
+            try:
+                page = render_page(url, name, self.output_dir)
+            except Exception as e:
+                logger.warning("Skipping %s: %s", url, e)
+                self.failed.append(url)
+                continue
+            self.write_page(page)
+            self.rendered.append(url)
+        self.remove_stale(self.rendered + self.skipped)
+        self.manifest.save()
+        return self
+
+
+class SiteDirectoryBuilder:
+    """
+    Copy a hand-written HTML site (``static_site/``) into ``output_dir``,
+    running each page through the page processors on the way.
+
+    With ``fingerprint``, every asset also gets a content-hashed copy that the
+    pages and stylesheets are rewritten to use (see ``core.fingerprint``), and
+    text files get ``.br``/``.gz`` siblings. Fingerprinted builds can also get
+    a service worker that precaches the site (see ``core.service_worker``).
+    With ``base_url``, the site's ``sitemap.xml`` and ``robots.txt`` are
+    written too (see ``core.sitemap``).
+    """
+
+    def __init__(self, source_dir, output_dir, fingerprint=False, service_worker=False, base_url=None):
+        self.source_dir = Path(source_dir)
+        self.output_dir = Path(output_dir)
+        self.fingerprint = fingerprint
+        self.service_worker = fingerprint and service_worker
+        self.base_url = base_url
+        self.pages = []
+        self.copied = []
+        self.removed = []
+        self.version = None
+        self.worker_version = None
+
+    def files(self):
+        """The site's source files as ``(name, path)``; dotfiles and notes like README.md are left out."""
+        output = self.output_dir.resolve()
+        for path in sorted(self.source_dir.rglob('*')):
+            rel = path.relative_to(self.source_dir)
+            if not path.is_file() or any(part.startswith('.') for part in rel.parts):
+                continue
+            if path.suffix.lower() in SOURCE_ONLY_SUFFIXES:
+                continue
+            if output == path.resolve() or output in path.resolve().parents:
+                continue
+            yield rel.as_posix(), path
+
+    def build(self):
+        resolver = SiteResolver(self.source_dir)
+        pages = {}
+        assets = set()
+        for name, path in self.files():
+            target = self.output_dir / name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if path.suffix == '.html':
+                context = PageContext(name, resolver, self.output_dir)
+                pages[name] = process_page(path.read_text(encoding='utf-8'), context)
+                assets.update(context.emitted)
+                self.pages.append(name)
+            else:
+                assets.add(name)
+                if not target.exists() or file_hash(target) != file_hash(path):
+                    shutil.copyfile(path, target)
+                    self.copied.append(name)
+
+        if self.fingerprint:
+            fingerprinter = Fingerprinter(self.output_dir, resolver)
+            paths = fingerprinter.add(assets)
+            pages = {name: fingerprinter.rewrite_html(html, name) for name, html in pages.items()}
+            self.remove_stale(set(load_asset_manifest(self.output_dir).values()) - set(paths.values()))
+            self.version = save_asset_manifest(self.output_dir, paths)
+
+        generated = []
+        if self.service_worker:
+            pages = {
+                name: register_service_worker(html, resolver.url_for(SERVICE_WORKER_NAME, name))
+                for name, html in pages.items()
+            }
+            script, self.worker_version = service_worker(pages, SiteResolver(self.output_dir), self.output_dir)
+            (self.output_dir / SERVICE_WORKER_NAME).write_text(script, encoding='utf-8')
+            generated.append(SERVICE_WORKER_NAME)
+
+        for name, html in pages.items():
+            (self.output_dir / name).write_text(html, encoding='utf-8')
+        if self.base_url:
+            generated += write_sitemap(self.output_dir, self.base_url, site_page_hashes(pages), 'static_site')
+        if self.fingerprint:
+            self.compress(list(pages) + generated + sorted(paths.values()), hashed=set(paths.values()))
+        return self
+
+    def remove_stale(self, names):
+        """Delete hashed files (and their compressed siblings) from earlier builds."""
+        for name in sorted(names):
+            for suffix in ('', '.br', '.gz'):
+                (self.output_dir / (name + suffix)).unlink(missing_ok=True)
+            self.removed.append(name)
+
+    def compress(self, names, hashed=()):
+        """
+        Write ``.br``/``.gz`` siblings. Names in ``hashed`` that already have
+        them are skipped, since their content can't have changed; everything
+        else (pages, ``sw.js``, ``sitemap.xml``...) is compressed again.
+        """
+        extensions = getattr(settings, 'WHITENOISE_SKIP_COMPRESS_EXTENSIONS', None)
+        compressor = Compressor(extensions=extensions, quiet=True)
+        paths = []
+        for name in names:
+            path = self.output_dir / name
+            if not compressor.should_compress(name):
+                continue
+            if name in hashed and any(path.with_name(path.name + s).exists() for s in ('.br', '.gz')):
+                continue
+            paths.append(str(path))
+        parallel_map(compress_file, paths, repeat(extensions), workers=getattr(settings, 'COLLECTSTATIC_WORKERS', None))
@@ -0,0 +1,113 @@
+"""
+Static files storage used in production.
+
+Files are fingerprinted with a content hash and written with gzip and brotli
+siblings, so WhiteNoise can serve them with ``Cache-Control: immutable`` and
+pick the best encoding per request.
+"""
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+from django.conf import settings
+from whitenoise.compress import Compressor
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from .assets import file_hash
+
+logger = logging.getLogger(__name__)
+
+
+class ContentIndex(dict):
+    """
+    A ``{name: value}`` record kept as JSON in ``STATIC_ROOT`` between runs,
+    so work on files whose content hash hasn't changed can be skipped.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        try:
+            super().__init__(json.loads(self.path.read_text()))
+        except (OSError, ValueError):
+            super().__init__()
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self, indent=1, sort_keys=True))
+
+
+def compress_file(path, extensions=None):
+    """Write the compressed siblings of ``path``; returns their paths."""
+    return list(Compressor(extensions=extensions, quiet=True).compress(path))
+
+
+def parallel_map(func, *iterables, workers=None):
+    """``map()`` across a process pool, or in-process when a pool isn't worth it."""
+    args = list(zip(*iterables))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(args) < 2:
+        return [func(*a) for a in args]
+    with ProcessPoolExecutor(max_workers=min(workers, len(args))) as pool:
+        return list(pool.map(func, *zip(*args)))
+
+
+class CompressedManifestStorage(CompressedManifestStaticFilesStorage):
+    """
+    WhiteNoise's manifest storage, tolerant of references to missing files.
+
+    Django's manifest storage aborts ``collectstatic`` when a stylesheet has a
+    ``url()`` to a file that doesn't exist (``css/animations.css`` and
+    ``css/pages/*.css`` point at a few images that were never committed), and
+    raises while rendering when a template asks for a file that isn't in the
+    manifest. Here both cases log a warning and fall back to the unhashed
+    name, which is what the old non-manifest storage served anyway.
+
+    Compression is incremental: the content hash of every file compressed is
+    recorded in ``staticfiles.compressed.json``, and files whose hash and
+    compressed siblings are unchanged since the last ``collectstatic`` are
+    skipped. The rest are compressed across ``COLLECTSTATIC_WORKERS``
+    processes.
+    """
+
+    manifest_strict = False
+    compress_index_name = 'staticfiles.compressed.json'
+
+    def hashed_name(self, name, content=None, filename=None):
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            if content is not None:
+                raise
+            logger.warning("%s was not found in STATIC_ROOT, serving it unhashed", filename or name)
+            return name
+
+    def compress_files(self, names):
+        extensions = getattr(settings, 'WHITENOISE_SKIP_COMPRESS_EXTENSIONS', None)
+        compressor = self.create_compressor(extensions=extensions, quiet=True)
+        index = ContentIndex(self.path(self.compress_index_name))
+        previous = dict(index)
+        index.clear()
+        pending = {}
+        for name in sorted(names):
+            if not compressor.should_compress(name):
+                continue
+            path = self.path(name)
+            digest = file_hash(path)
+            entry = previous.get(name)
+            if entry and entry['hash'] == digest and all(os.path.exists(path + s) for s in entry['suffixes']):
+                index[name] = entry
+            else:
+                pending[name] = digest
+
+        paths = [self.path(name) for name in pending]
+        results = parallel_map(
+            compress_file, paths, repeat(extensions), workers=getattr(settings, 'COLLECTSTATIC_WORKERS', None),
+        )
+        for (name, digest), path, compressed in zip(pending.items(), paths, results):
+            index[name] = {'hash': digest, 'suffixes': [c[len(path):] for c in compressed]}
+            for compressed_path in compressed:
+                yield name, name + compressed_path[len(path):]
+        index.save()
@@ -0,0 +1,133 @@
+"""
+Streaming render for pages built on ``base.html``.
+
+``render()`` builds the whole page before sending a byte, so the browser
+can't start on the stylesheets and fonts in the ``<head>`` until the body is
+done. ``stream_render`` renders a template one top-level node of its
+outermost parent at a time and sends it in chunks through a
+``StreamingHttpResponse``: first everything up to and including
+``</head>``, then the markup before each top-level ``{% block %}``, each
+block, and the rest of the page.
+
+The first chunk is rendered before the response is returned, so an error in
+the head still becomes an ordinary error response; an error further down can
+only cut the page short. It is logged, and the response's ``render_stream``
+is marked ``failed`` so the cut-short page is never cached.
+
+``STREAMING_RENDER = False`` makes both functions fall back to ``render()``,
+which the static builds use to get the whole page at once.
+"""
+import logging
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.shortcuts import render
+from django.template import loader
+from django.template.base import TextNode
+from django.template.context import make_context
+from django.template.loader_tags import BLOCK_CONTEXT_KEY, BlockContext, BlockNode, ExtendsNode
+
+logger = logging.getLogger(__name__)
+
+
+def _extends_node(template):
+    for node in template.nodelist:
+        if isinstance(node, ExtendsNode):
+            return node
+        if not isinstance(node, TextNode):
+            return None
+    return None
+
+
+def _render_nodes(template, context):
+    """
+    Yield ``(node, output)`` for the top-level nodes of the outermost
+    template ``template`` extends, with its blocks overridden the way
+    ``ExtendsNode.render`` does it.
+    """
+    extends = _extends_node(template)
+    if extends is None:
+        for node in template.nodelist:
+            yield node, node.render_annotated(context)
+        return
+    parent = extends.get_parent(context)
+    if BLOCK_CONTEXT_KEY not in context.render_context:
+        context.render_context[BLOCK_CONTEXT_KEY] = BlockContext()
+    block_context = context.render_context[BLOCK_CONTEXT_KEY]
+    block_context.add_blocks(extends.blocks)
+    if _extends_node(parent) is None:
+        block_context.add_blocks({node.name: node for node in parent.nodelist.get_nodes_by_type(BlockNode)})
+    with context.render_context.push_state(parent, isolated_context=False):
+        yield from _render_nodes(parent, context)
+
+
+def render_chunks(template_name, context=None, request=None):
+    """
+    Render ``template_name`` as a series of strings: the ``<head>``, then the
+    markup around and inside each top-level block.
+    """
+    template = loader.get_template(template_name)
+    context = make_context(context, request, autoescape=template.backend.engine.autoescape)
+    template = template.template
+    buffer, head_sent = [], False
+    with context.render_context.push_state(template), context.bind_template(template):
+        context.template_name = template.name
+        for node, output in _render_nodes(template, context):
+            is_block = head_sent and isinstance(node, BlockNode)
+            if is_block and buffer:
+                yield ''.join(buffer)
+                buffer = []
+            buffer.append(output)
+            if is_block or (not head_sent and '</head>' in output):
+                head_sent = True
+                yield ''.join(buffer)
+                buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+class RenderStream:
+    """
+    The page's chunks, with the first one already rendered. ``failed`` is set
+    if rendering raises part-way through, so whatever consumes the whole
+    body (the page cache, preload links) can tell it is incomplete.
+    """
+
+    def __init__(self, request, template_name, context):
+        self.template_name = template_name
+        self.failed = False
+        self._chunks = render_chunks(template_name, context, request)
+        self._first = next(self._chunks, '')
+
+    def __iter__(self):
+        yield self._first
+        try:
+            yield from self._chunks
+        except Exception:
+            self.failed = True
+            logger.exception("Rendering %s failed part-way through the response", self.template_name)
+
+
+async def _async_chunks(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def stream_render(request, template_name, context=None, content_type=None, status=None):
+    """Like ``django.shortcuts.render``, but sends the page as it renders."""
+    if not settings.STREAMING_RENDER:
+        return render(request, template_name, context, content_type, status)
+    stream = RenderStream(request, template_name, context)
+    response = StreamingHttpResponse(stream, content_type=content_type, status=status)
+    response.render_stream = stream
+    return response
+
+
+async def astream_render(request, template_name, context=None, content_type=None, status=None):
+    """``stream_render`` for async views: the page renders on the event loop as the server sends it."""
+    if not settings.STREAMING_RENDER:
+        return render(request, template_name, context, content_type, status)
+    stream = RenderStream(request, template_name, context)
+    response = StreamingHttpResponse(_async_chunks(stream), content_type=content_type, status=status)
+    response.render_stream = stream
+    return response
@@ -0,0 +1,25 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from core.icons import ICON_DIR, static_icons, static_sprite_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def icon(name, alt='', **attrs):
+    """
+    Render an icon from ``static/svg/`` as inline SVG.
+
+    Usage: {% icon 'sun' alt="Light theme" class="theme-icon sun-icon" %}
+
+    Small icons are written out in full; larger ones ``<use>`` their symbol
+    in the sprite from ``build_icons``. Falls back to an ``<img>`` for a name
+    that isn't in ``static/svg/``.
+    """
+    entry = static_icons().get(name)
+    if entry is None:
+        extra = format_html_join('', ' {}="{}"', attrs.items())
+        return format_html('<img src="{}" alt="{}"{}>', static(f'{ICON_DIR}/{name}.svg'), alt, extra)
+    return entry.html(static_sprite_url(), alt=alt, **attrs)
@@ -0,0 +1,42 @@
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from core.images import cached_index, picture_html
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(path, alt='', sizes='100vw', **attrs):
+    """
+    Render a static image as a ``<picture>`` with AVIF/WebP ``srcset`` variants.
+
+    Usage: {% responsive_image 'images/photo.jpg' alt="..." sizes="(min-width: 992px) 50vw, 100vw" class="img-fluid" %}
+
+    Falls back to a plain ``<img>`` when ``build_images`` hasn't produced
+    variants for ``path``. Either way the image loads lazily unless given
+    ``loading="eager"``.
+    """
+    entry = cached_index(settings.RESPONSIVE_IMAGES_ROOT).get(path)
+    if entry is None:
+        attrs = {'loading': 'lazy', 'decoding': 'async', **attrs}
+        extra = format_html_join('', ' {}="{}"', attrs.items())
+        return format_html('<img src="{}" alt="{}"{}>', static(path), alt, extra)
+    return picture_html(entry, static, alt=alt, sizes=sizes, **attrs)
+
+
+@register.simple_tag
+def background_image(path):
+    """
+    A ``background-image`` declaration for a static image, layered over its
+    blurred placeholder so something shows while the image loads.
+
+    Usage: <div style="{% background_image 'images/hero.jpg' %}"></div>
+    """
+    entry = cached_index(settings.RESPONSIVE_IMAGES_ROOT).get(path)
+    placeholder = entry and entry.get('fallback') == 'jpeg' and entry.get('placeholder')
+    if placeholder:
+        return format_html('background-image: url({}), url({});', static(path), placeholder)
+    return format_html('background-image: url({});', static(path))
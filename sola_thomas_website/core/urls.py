@@ -1,11 +1,12 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'core'
 
 urlpatterns = [
-    path('', views.home, name='home'),
-    path('about/', views.about, name='about'),
-    path('contact/', views.contact, name='contact'),
-    path('dashboard/', views.dashboard, name='dashboard'),
+    path('', views.home_async if settings.ASYNC_VIEWS else views.home, name='home'),
+    path('about/', views.about_async if settings.ASYNC_VIEWS else views.about, name='about'),
+    path('contact/', views.contact_async if settings.ASYNC_VIEWS else views.contact, name='contact'),
+    # path('dashboard/', views.dashboard, name='dashboard'),  # DISABLED FOR STATIC SITE
 ]
@@ -0,0 +1,147 @@
+"""
+Self-hosted copies of the third-party CSS and JavaScript the pages use.
+
+``vendor_assets`` downloads Bootstrap and Font Awesome once into a local
+cache, installs them under ``vendor/`` in the Django static files and in
+``static_site/``, and points the templates at those copies instead of the
+CDNs. Font Awesome is cut down on the way: only the icon rules our templates
+use are kept, and its fonts are subsetted to the glyphs those rules show.
+"""
+import posixpath
+import re
+import shutil
+from pathlib import Path
+from urllib.parse import urljoin
+from urllib.request import urlopen
+
+from .assets import css_references, is_local
+from .css import filter_rules, parse_css, selector_matches, serialize
+
+BOOTSTRAP_CDN = 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/'
+FONT_AWESOME_CDN = 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/'
+
+# CDN URL -> path under vendor/. Files these stylesheets reference (the
+# Font Awesome webfonts) are downloaded alongside them.
+VENDOR_FILES = {
+    BOOTSTRAP_CDN + 'css/bootstrap.min.css': 'bootstrap/css/bootstrap.min.css',
+    BOOTSTRAP_CDN + 'js/bootstrap.bundle.min.js': 'bootstrap/js/bootstrap.bundle.min.js',
+    FONT_AWESOME_CDN + 'css/all.min.css': 'fontawesome/css/all.min.css',
+}
+
+# Icon stylesheets cut down to the icons in use, along with their fonts
+ICON_STYLESHEETS = ('fontawesome/css/all.min.css',)
+
+ICON_CONTENT_RE = re.compile(r'content:\s*"\\([0-9a-fA-F]{4,6})"')
+CDN_TAG_RE = re.compile(r'<(?:link|script)\b[^>]*>', re.IGNORECASE)
+SRI_ATTRIBUTE_RE = re.compile(r'\s+(?:integrity|crossorigin|referrerpolicy)(?:=(["\']).*?\1)?', re.IGNORECASE)
+
+
+def fetch(url):
+    with urlopen(url, timeout=30) as response:
+        return response.read()
+
+
+def referenced_files(css, name):
+    """Paths, relative to the vendor root, of the files a stylesheet ``name`` refers to."""
+    for ref in css_references(css):
+        if is_local(ref) and not ref.startswith('/'):
+            ref = ref.split('?')[0].split('#')[0]
+            yield ref, posixpath.normpath(posixpath.join(posixpath.dirname(name), ref))
+
+
+def download(cache_dir, fetch=fetch, refresh=False):
+    """
+    Download VENDOR_FILES, and every relative url() in the stylesheets among
+    them, into ``cache_dir``. Files already there are only fetched again with
+    ``refresh``. Returns the paths written relative to ``cache_dir``.
+    """
+    cache_dir = Path(cache_dir)
+    pending = list(VENDOR_FILES.items())
+    names = []
+    while pending:
+        url, name = pending.pop(0)
+        if name in names:
+            continue
+        path = cache_dir / name
+        if refresh or not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(fetch(url))
+        names.append(name)
+        if name.endswith('.css'):
+            for ref, ref_name in referenced_files(path.read_text(encoding='utf-8'), name):
+                pending.append((urljoin(url, ref), ref_name))
+    return names
+
+
+def subset_icon_css(css, inventory):
+    """
+    Drop the rules of an icon stylesheet that nothing in ``inventory`` uses.
+
+    Returns the minified stylesheet and the set of code points the remaining
+    icon rules display.
+    """
+    rules = filter_rules(parse_css(css), lambda selector: selector_matches(selector, inventory))
+    css = serialize(rules, minify=True)
+    return css, {int(code, 16) for code in ICON_CONTENT_RE.findall(css)}
+
+
+def subset_font(source, target, codepoints):
+    """Write ``source`` to ``target`` keeping only the glyphs for ``codepoints``."""
+    from fontTools import subset
+
+    options = subset.Options()
+    options.flavor = {'.woff2': 'woff2', '.woff': 'woff'}.get(Path(target).suffix)
+    options.layout_features = ['*']
+    font = subset.load_font(str(source), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    subset.save_font(font, str(target), options)
+
+
+def install(cache_dir, names, target_dirs, inventory):
+    """
+    Copy downloaded files from ``cache_dir`` into each of ``target_dirs``,
+    subsetting the icon stylesheets and their fonts to what ``inventory`` uses.
+
+    Returns the code points kept in the icon fonts.
+    """
+    cache_dir = Path(cache_dir)
+    outputs = {}
+    codepoints = set()
+    icon_fonts = set()
+    for name in names:
+        if name in ICON_STYLESHEETS:
+            css, used = subset_icon_css((cache_dir / name).read_text(encoding='utf-8'), inventory)
+            outputs[name] = css.encode()
+            codepoints |= used
+            icon_fonts.update(ref_name for _ref, ref_name in referenced_files(css, name))
+    for target_dir in map(Path, target_dirs):
+        for name in names:
+            target = target_dir / name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if name in outputs:
+                target.write_bytes(outputs[name])
+            elif name in icon_fonts:
+                subset_font(cache_dir / name, target, codepoints)
+            else:
+                shutil.copyfile(cache_dir / name, target)
+    return codepoints
+
+
+def rewrite_references(html, url_for):
+    """
+    Point ``<link>`` and ``<script>`` tags loading a vendored file from its
+    CDN at ``url_for(vendor_path)`` instead.
+
+    Subresource integrity attributes are removed with the CDN URL: they only
+    matter for third-party origins and wouldn't match the subsetted files.
+    """
+    def replace(match):
+        tag = match.group(0)
+        for url, name in VENDOR_FILES.items():
+            if url in tag:
+                return SRI_ATTRIBUTE_RE.sub('', tag.replace(url, url_for(name)))
+        return tag
+
+    return CDN_TAG_RE.sub(replace, html)
@@ -1,4 +1,4 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import redirect
 from django.conf import settings
 from django.contrib import messages
 from django.template.loader import render_to_string
@@ -9,18 +9,25 @@ import logging
 import json
 
 # Import the custom forms and email utilities
+from .conditional import conditional_page
+from .streaming import astream_render, stream_render
 from .forms import ContactForm
 from .email import send_email, send_contact_notification
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
+@conditional_page('core/home.html')
 def home(request):
-    return render(request, 'core/home.html')
+    return stream_render(request, 'core/home.html')
 
+@conditional_page('core/about.html')
 def about(request):
-    return render(request, 'core/about.html')
+    return stream_render(request, 'core/about.html')
 
+# STATIC SITE MODE: remove the decorator when re-enabling the form below,
+# as POSTs and validation errors must always be rendered
+@conditional_page('core/contact.html')
 def contact(request):
     # ============================================================================
     # STATIC SITE MODE: Server-side form processing disabled
@@ -28,7 +35,7 @@ def contact(request):
     # ============================================================================
 
     # Static site version - just render the template
-    return render(request, 'core/contact.html')
+    return stream_render(request, 'core/contact.html')
 
     # ============================================================================
     # ORIGINAL DYNAMIC CODE (DISABLED FOR STATIC SITE)
@@ -91,6 +98,27 @@ def contact(request):
     #
     # return render(request, 'core/contact.html', context)
 
+# ============================================================================
+# ASGI: async versions of the public views, routed instead of the ones above
+# when ASYNC_VIEWS is set (sola_thomas_website/asgi.py sets it). The pages
+# don't touch the database, so they render (and stream) on the event loop
+# without a thread hop. Views that need the ORM or send mail must await it
+# (sync_to_async, send_email_async).
+# ============================================================================
+@conditional_page('core/home.html')
+async def home_async(request):
+    return await astream_render(request, 'core/home.html')
+
+@conditional_page('core/about.html')
+async def about_async(request):
+    return await astream_render(request, 'core/about.html')
+
+# STATIC SITE MODE: when re-enabling the form, port contact() above and send
+# with core.email.send_contact_notification_async
+@conditional_page('core/contact.html')
+async def contact_async(request):
+    return await astream_render(request, 'core/contact.html')
+
 # ============================================================================
 # STATIC SITE MODE: Dashboard disabled (requires authentication)
 # To re-enable: Uncomment the code below
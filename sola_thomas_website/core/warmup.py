@@ -0,0 +1,110 @@
+"""
+Warm a freshly started process up before it serves traffic.
+
+A new worker otherwise pays on its first requests for importing the
+URLconf and every view module, compiling templates, and filling the image, icon and page caches. ``warm_up`` does
+all of that up front; ``gunicorn.conf.py`` runs it in each worker after it
+forks, or once in the master when gunicorn runs with ``--preload``.
+"""
+import logging
+import time
+from importlib import import_module
+from importlib.util import find_spec
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.template import engines
+from django.test import Client, override_settings
+from django.urls import get_resolver
+
+from .routes import public_urls
+
+logger = logging.getLogger(__name__)
+
+# Modules of an app that are imported on first use rather than at startup
+APP_MODULES = ('views', 'urls', 'forms')
+
+# What the last warm_up() in this process did; read by the readiness probe
+state = {}
+
+
+def import_apps():
+    """Import the lazily loaded modules of every installed app and build the URL resolver."""
+    modules = 0
+    for app_config in apps.get_app_configs():
+        for module in APP_MODULES:
+            name = f'{app_config.name}.{module}'
+            if find_spec(name) is not None:
+                import_module(name)
+                modules += 1
+    resolver = get_resolver()
+    resolver.reverse_dict  # populates the resolver's lookup tables
+    return modules
+
+
+def compile_templates():
+    """
+    Load every template in the template directories (``DIRS`` and the app
+    directories) through each engine, so the cached loader holds them compiled.
+
+    Returns ``(compiled, failed)`` counts; templates that don't compile are
+    logged and skipped.
+    """
+    compiled = failed = 0
+    for engine in engines.all():
+        for directory in map(Path, getattr(engine, 'template_dirs', ())):
+            if not directory.is_dir():
+                continue
+            for path in sorted(path for path in directory.rglob('*') if path.is_file()):
+                name = path.relative_to(directory).as_posix()
+                try:
+                    engine.get_template(name)
+                    compiled += 1
+                except Exception as e:
+                    logger.warning("Template %s did not compile: %s", name, e)
+                    failed += 1
+    return compiled, failed
+
+
+def render_public_pages():
+    """
+    Request every public page once through the full middleware stack, which
+    also fills the page cache. The page cache is keyed on scheme and host, so
+    the requests are for ``https://SITE_DOMAIN`` like the site's real
+    traffic. Returns the URLs that didn't answer 200.
+    """
+    client = Client(HTTP_HOST=settings.SITE_DOMAIN)
+    failed = []
+    for url, _name in public_urls():
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, settings.SITE_DOMAIN]):
+                response = client.get(url, secure=True)
+                if response.streaming:
+                    # Streamed pages are only cached once they've been sent in full
+                    b''.join(response.streaming_content)
+            status = response.status_code
+        except Exception as e:
+            logger.warning("Warm-up request for %s failed: %s", url, e)
+            status = None
+        if status != 200:
+            failed.append(url)
+    return failed
+
+
+def warm_up():
+    """Run every warm-up step and log how long it took."""
+    start = time.perf_counter()
+    modules = import_apps()
+    compiled, failed_templates = compile_templates()
+    state['compiled'] = compiled
+    failed_pages = render_public_pages()
+    # Connections opened here mustn't be shared with forked workers
+    connections.close_all()
+    logger.info(
+        "Warmed up in %.0f ms: %d module(s), %d template(s) compiled (%d failed), "
+        "%d page(s) rendered (%d failed)",
+        (time.perf_counter() - start) * 1000, modules, compiled, failed_templates,
+        len(list(public_urls())), len(failed_pages),
+    )
@@ -0,0 +1,71 @@
+"""
+Gunicorn settings and hooks; the remaining server options are passed in
+scripts/start.sh.
+
+SERVER_PROFILE picks how requests are served:
+
+- ``sync`` (the default): the WSGI application on sync workers, one request
+  at a time per worker.
+- ``gevent``: the WSGI application on gevent workers, which interleave
+  requests while one waits on the network or database.
+- ``asgi``: the ASGI application on uvicorn's workers, with the public pages
+  and health check served by async views (needs the uvicorn package). The
+  same application runs without gunicorn as
+  ``uvicorn sola_thomas_website.asgi:application``.
+
+``python manage.py benchmark_servers`` compares them.
+
+Every new worker (including the ones --max-requests recycles) is warmed up
+by core.warmup once it has loaded the application and before it takes a
+request. With --preload the application is loaded, and warmed up, once in
+the master instead, and the workers inherit it.
+"""
+import os
+
+SERVER_PROFILES = {
+    'sync': {
+        'worker_class': 'sync',
+        'wsgi_app': 'sola_thomas_website.wsgi:application',
+        'requires': 'gunicorn',
+    },
+    'gevent': {
+        'worker_class': 'gevent',
+        'worker_connections': 1000,
+        'wsgi_app': 'sola_thomas_website.wsgi:application',
+        'requires': 'gevent',
+    },
+    'asgi': {
+        'worker_class': 'uvicorn.workers.UvicornWorker',
+        'wsgi_app': 'sola_thomas_website.asgi:application',
+        'requires': 'uvicorn',
+    },
+}
+
+SERVER_PROFILE = os.environ.get('SERVER_PROFILE', 'sync')
+if SERVER_PROFILE not in SERVER_PROFILES:
+    raise ValueError(f"SERVER_PROFILE must be one of {', '.join(SERVER_PROFILES)}")
+
+worker_class = SERVER_PROFILES[SERVER_PROFILE]['worker_class']
+wsgi_app = SERVER_PROFILES[SERVER_PROFILE]['wsgi_app']
+if 'worker_connections' in SERVER_PROFILES[SERVER_PROFILE]:
+    worker_connections = SERVER_PROFILES[SERVER_PROFILE]['worker_connections']
+
+
+def _warm_up(log):
+    try:
+        from core.warmup import warm_up
+        warm_up()
+    except Exception:
+        # A cold worker is still better than no worker
+        log.exception("Warm-up failed")
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        _warm_up(server.log)
+
+
+def post_worker_init(worker):
+    # Not post_fork: the worker only loads the application after that hook
+    if not worker.cfg.preload_app:
+        _warm_up(worker.log)
@@ -1,11 +1,12 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'services'
 
 urlpatterns = [
-    path('home-services/', views.home_services, name='home_services'),
-    path('business-services/', views.business_services, name='business_services'),
+    path('home-services/', views.home_services_async if settings.ASYNC_VIEWS else views.home_services, name='home_services'),
+    path('business-services/', views.business_services_async if settings.ASYNC_VIEWS else views.business_services, name='business_services'),
     path('book/<int:service_id>/', views.book_service, name='book_service'),
     path('payment/<int:booking_id>/', views.payment, name='payment'),
 ]
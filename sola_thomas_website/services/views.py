@@ -1,13 +1,28 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 
+from core.conditional import conditional_page
+from core.streaming import astream_render, stream_render
+
+@conditional_page('services/home_services.html')
 def home_services(request):
     """View function for the home services page."""
-    return render(request, 'services/home_services.html')
+    return stream_render(request, 'services/home_services.html')
 
+@conditional_page('services/business_services.html')
 def business_services(request):
     """View function for the business services page."""
-    return render(request, 'services/business_services.html')
+    return stream_render(request, 'services/business_services.html')
+
+@conditional_page('services/home_services.html')
+async def home_services_async(request):
+    """Async version of home_services, routed when ASYNC_VIEWS is set."""
+    return await astream_render(request, 'services/home_services.html')
+
+@conditional_page('services/business_services.html')
+async def business_services_async(request):
+    """Async version of business_services, routed when ASYNC_VIEWS is set."""
+    return await astream_render(request, 'services/business_services.html')
 
 @login_required
 def book_service(request, service_id):
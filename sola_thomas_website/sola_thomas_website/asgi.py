@@ -2,6 +2,9 @@
 ASGI config for sola_thomas_website project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Served this way, the public pages and the health check use their async views
+(ASYNC_VIEWS), and health probes are answered in front of Django
+(core.health); see SERVER_PROFILES in gunicorn.conf.py for running it.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -12,5 +15,10 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sola_thomas_website.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
+
+from core.health import HealthCheckASGIMiddleware  # noqa: E402 (needs the app registry)
+
+application = HealthCheckASGIMiddleware(application)
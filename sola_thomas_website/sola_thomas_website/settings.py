@@ -82,9 +82,10 @@ INSTALLED_APPS = [
     # 'django.contrib.contenttypes',  # DISABLED FOR STATIC SITE
     # 'django.contrib.sessions',  # DISABLED FOR STATIC SITE
     # 'django.contrib.messages',  # DISABLED FOR STATIC SITE
+    # Listed before staticfiles so its incremental collectstatic replaces the stock one
+    'core.apps.CoreConfig',
     'django.contrib.staticfiles',
     # 'django.contrib.sites',  # DISABLED FOR STATIC SITE
-    'core.apps.CoreConfig',
     # 'clientportal',  # DISABLED FOR STATIC SITE
     'services',
 ]
@@ -93,13 +94,20 @@ SITE_ID = 1
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # WhiteNoise, able to pass requests on asynchronously under ASGI
+    'core.middleware.AsyncWhiteNoiseMiddleware',
     # ============================================================================
     # STATIC SITE MODE: Session and auth middleware disabled
     # To re-enable: Uncomment the lines below
     # ============================================================================
     # 'django.contrib.sessions.middleware.SessionMiddleware',  # DISABLED FOR STATIC SITE
     'django.middleware.common.CommonMiddleware',
+    # Answers If-None-Match for pages served from the page cache below
+    'django.middleware.http.ConditionalGetMiddleware',
+    # Adds Link headers to rendered and cached pages alike
+    'core.middleware.PreloadMiddleware',
+    # Cached pages are stored with the headers added below it
+    'core.middleware.PageCacheMiddleware',
     # 'django.middleware.csrf.CsrfViewMiddleware',  # DISABLED FOR STATIC SITE
     # 'django.contrib.auth.middleware.AuthenticationMiddleware',  # DISABLED FOR STATIC SITE
     # 'django.contrib.messages.middleware.MessageMiddleware',  # DISABLED FOR STATIC SITE
@@ -117,8 +125,9 @@ TEMPLATES = [
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
-                'django.contrib.auth.context_processors.auth',
-                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.page_chrome',
+                # 'django.contrib.auth.context_processors.auth',  # DISABLED FOR STATIC SITE
+                # 'django.contrib.messages.context_processors.messages',  # DISABLED FOR STATIC SITE
             ],
         },
     },
@@ -126,6 +135,16 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'sola_thomas_website.wsgi.application'
 
+# Route the public pages and the health check to their async views. asgi.py
+# turns this on: under ASGI a sync view runs in a thread, and under WSGI an
+# async one gets an event loop of its own, so each server gets its own kind.
+ASYNC_VIEWS = get_env_variable('ASYNC_VIEWS', 'False').lower() in ('true', '1', 't')
+
+# Views using core.streaming.stream_render send the <head> as soon as it has
+# rendered and the rest of the page as it goes. When False they render whole
+# pages, as the static builds always do.
+STREAMING_RENDER = get_env_variable('STREAMING_RENDER', 'True').lower() in ('true', '1', 't')
+
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
@@ -152,6 +171,43 @@ else:
         }
     }
 
+# Cache
+# Rendered public pages for anonymous visitors (core.middleware.PageCacheMiddleware)
+# go in the 'pages' cache. PAGE_CACHE_BACKEND picks where: locmem (in each
+# worker process, the default), filesystem (a directory shared by workers) or
+# redis (any Redis-protocol server; needs the redis package). Keys carry the
+# deploy version, so entries never need to expire.
+PAGE_CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'pages'),
+    'filesystem': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / 'generated' / 'page_cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+}
+PAGE_CACHE_BACKEND = get_env_variable('PAGE_CACHE_BACKEND', 'locmem')
+if PAGE_CACHE_BACKEND not in PAGE_CACHE_BACKENDS:
+    raise ImproperlyConfigured(f"PAGE_CACHE_BACKEND must be one of {', '.join(PAGE_CACHE_BACKENDS)}")
+PAGE_CACHE_ALIAS = 'pages'
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    PAGE_CACHE_ALIAS: {
+        'BACKEND': PAGE_CACHE_BACKENDS[PAGE_CACHE_BACKEND][0],
+        'LOCATION': get_env_variable('PAGE_CACHE_LOCATION', PAGE_CACHE_BACKENDS[PAGE_CACHE_BACKEND][1]),
+        'TIMEOUT': None,
+    },
+}
+
+# Health probes (core.health): /health/ready runs these checks at most once
+# every HEALTH_READY_TTL seconds per worker and reports 503 if any fails
+HEALTH_READY_CHECKS = [
+    'core.health.check_database',
+    'core.health.check_templates',
+    'core.health.check_email',
+]
+HEALTH_READY_TTL = float(get_env_variable('HEALTH_READY_TTL', '5'))
+# Most unsent emails a ready worker may have waiting
+HEALTH_EMAIL_BACKLOG_MAX = 100
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -187,15 +243,76 @@ USE_TZ = True
 STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
+
+# Responsive image variants (python manage.py build_images), served under
+# /static/responsive/ once they have been generated
+RESPONSIVE_IMAGES_ROOT = BASE_DIR / 'generated' / 'responsive'
+RESPONSIVE_IMAGE_WIDTHS = [480, 960, 1440, 1920]
+RESPONSIVE_IMAGE_FORMATS = ['avif', 'webp']
+if RESPONSIVE_IMAGES_ROOT.exists():
+    STATICFILES_DIRS.append(('responsive', RESPONSIVE_IMAGES_ROOT))
+
+# SVG sprite of static/svg/ (python manage.py build_icons), served under
+# /static/icons/; icons whose markup is at most ICON_INLINE_MAX_SIZE
+# characters are written into the page instead
+ICON_SPRITE_ROOT = BASE_DIR / 'generated' / 'icons'
+ICON_INLINE_MAX_SIZE = 1024
+if ICON_SPRITE_ROOT.exists():
+    STATICFILES_DIRS.append(('icons', ICON_SPRITE_ROOT))
+
+# Where vendor_assets keeps the untouched Bootstrap and Font Awesome downloads;
+# the subsetted copies go into static/vendor/ and static_site/vendor/
+VENDOR_DOWNLOAD_CACHE = BASE_DIR / 'generated' / 'vendor'
+
 # Ensure STATIC_URL has a trailing slash but also starts with a slash
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
 # WhiteNoise configuration
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'  # Changed from CompressedManifestStaticFilesStorage
+# Static files are fingerprinted and pre-compressed (gzip + brotli) by
+# core.storage.CompressedManifestStorage, so WhiteNoise serves every hashed
+# file with "Cache-Control: immutable". The max age below only applies to
+# unhashed URLs, which must be able to pick up a new deploy.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'core.storage.CompressedManifestStorage',
+    },
+}
 WHITENOISE_ROOT = None
-WHITENOISE_MAX_AGE = 31536000  # 1 year in seconds
+WHITENOISE_MAX_AGE = 3600  # 1 hour in seconds, hashed files are cached forever
 WHITENOISE_ALLOW_ALL_ORIGINS = True
+# Processes compressing static files during collectstatic (None: one per CPU)
+COLLECTSTATIC_WORKERS = None
+
+# Static site build (python manage.py build_static / build_static_site)
+STATIC_BUILD_ROOT = BASE_DIR / 'build'
+STATIC_BUILD_EXCLUDE = ['health_check', 'health_ready', 'sitemap', 'robots']
+STATIC_SITE_ROOT = BASE_DIR.parent / 'static_site'
+STATIC_SITE_BUILD_ROOT = BASE_DIR.parent / 'dist'
+# Applied in order to every page either build writes
+STATIC_BUILD_PROCESSORS = [
+    'core.icons.inline_icons',
+    'core.images.image_hints',
+    'core.preload.preload_links',
+    'core.bundler.bundle_assets',
+    'core.critical_css.inline_critical_css',
+]
+# Per-page weight, request and render-blocking limits (python manage.py check_budgets)
+PERFORMANCE_BUDGETS = BASE_DIR / 'performance_budgets.json'
+# How much of the <body> counts as above the fold when extracting critical CSS
+CRITICAL_CSS_FOLD_SIZE = 12000
+# Most images and fonts a page preloads (Link headers and <link rel=preload>)
+PRELOAD_MAX_ASSETS = 4
+# Classes added at runtime by Bootstrap's JavaScript, which the bundler can't
+# find in our templates or scripts
+ASSET_BUNDLE_SAFELIST = [
+    'active', 'show', 'showing', 'hiding', 'fade', 'collapse', 'collapsing', 'collapsed',
+    'modal-open', 'modal-backdrop', 'modal-static', 'offcanvas-backdrop',
+    'dropdown-menu-end', 'was-validated', 'is-valid', 'is-invalid',
+]
 
 # Site Settings
 SITE_NAME = 'Sola-Thomas Solutions'
@@ -209,11 +326,38 @@ EMAIL_SUBJECT_PREFIX = '[Sola-Thomas] '
 # Email Settings - Use direct email without tracking links
 # SENDGRID_API_KEY moved to environment variables for security
 SENDGRID_API_KEY = get_env_variable('SENDGRID_API_KEY', '')
-EMAIL_BACKEND = "sendgrid_backend.SendgridBackend"
+EMAIL_BACKEND = "core.email_backend.SendgridBackend"
 DEFAULT_FROM_EMAIL = f'noreply@services.{SITE_DOMAIN}' 
 SENDGRID_SANDBOX_MODE_IN_DEBUG = False
 CONTACT_EMAIL = f'info@{SITE_DOMAIN}'
 
+# Email outbox (core.outbox): views enqueue, python manage.py dispatch_email
+# sends. Failed sends are retried after BACKOFF_BASE seconds, doubling up to
+# BACKOFF_MAX, until MAX_ATTEMPTS; rows a dead dispatcher left "sending" are
+# picked up again after CLAIM_TIMEOUT seconds
+EMAIL_OUTBOX_CONCURRENCY = int(get_env_variable('EMAIL_OUTBOX_CONCURRENCY', '4'))
+EMAIL_OUTBOX_POLL_INTERVAL = float(get_env_variable('EMAIL_OUTBOX_POLL_INTERVAL', '2'))
+EMAIL_OUTBOX_MAX_ATTEMPTS = 8
+EMAIL_OUTBOX_BACKOFF_BASE = 30
+EMAIL_OUTBOX_BACKOFF_MAX = 3600
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 300
+
+# Every send in a process (core.email and the EMAIL_BACKEND above) shares one
+# pool of keep-alive connections to SendGrid (core.email_transport); size it
+# for the sends in flight at once, which is the dispatcher's concurrency
+SENDGRID_HOST_URL = get_env_variable('SENDGRID_HOST_URL', 'https://api.sendgrid.com')
+EMAIL_TRANSPORT_POOL_SIZE = EMAIL_OUTBOX_CONCURRENCY
+EMAIL_TRANSPORT_TIMEOUT = 10
+
+# sitemap.xml and robots.txt (core.sitemap): python manage.py build_sitemap
+# writes the Django site's into SITEMAP_ROOT at deploy, along with the
+# content hashes that decide each page's lastmod (kept for the static site's
+# build too). STATIC_SITE_URL is where build_static_site's output is served.
+SITEMAP_ROOT = BASE_DIR / 'generated' / 'sitemap'
+SITEMAP_MAX_AGE = 3600
+ROBOTS_DISALLOW = ['/health/']
+STATIC_SITE_URL = get_env_variable('STATIC_SITE_URL', f'https://{SITE_DOMAIN}')
+
 # Add this to prevent email click tracking which modifies URLs
 SENDGRID_TRACK_EMAIL_OPENS = False
 SENDGRID_TRACK_CLICKS_HTML = False
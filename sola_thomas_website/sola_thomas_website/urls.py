@@ -14,14 +14,12 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
+# from django.contrib import admin  # DISABLED FOR STATIC SITE (10 ms of every startup)
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.http import HttpResponse
 
-def health_check(request):
-    return HttpResponse("OK", status=200)
+from core import health, sitemap
 
 urlpatterns = [
     # ============================================================================
@@ -34,7 +32,11 @@ urlpatterns = [
 
     path('', include('core.urls')),
     path('services/', include('services.urls')),
-    path('health/', health_check, name='health_check'),
+    # Normally answered by core.health's WSGI/ASGI wrappers before reaching Django
+    path('health/', health.health_check_async if settings.ASYNC_VIEWS else health.health_check, name='health_check'),
+    path('health/ready', health.health_ready_async if settings.ASYNC_VIEWS else health.health_ready, name='health_ready'),
+    path('sitemap.xml', sitemap.sitemap, name='sitemap'),
+    path('robots.txt', sitemap.robots, name='robots'),
     ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
 if settings.DEBUG:
@@ -2,6 +2,7 @@
 WSGI config for sola_thomas_website project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
+Health probes are answered in front of Django (core.health).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/wsgi/
@@ -14,3 +15,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sola_thomas_website.settings')
 
 application = get_wsgi_application()
+
+from core.health import HealthCheckWSGIMiddleware  # noqa: E402 (needs the app registry)
+
+application = HealthCheckWSGIMiddleware(application)
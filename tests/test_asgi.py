@@ -0,0 +1,109 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib import reload
+from unittest import mock
+
+from django.core.cache import caches
+from django.core.handlers.asgi import ASGIHandler
+from django.test import SimpleTestCase, override_settings
+from django.urls import clear_url_caches, resolve
+
+import core.urls
+import services.urls
+import sola_thomas_website.urls
+from core import email
+from core.benchmark import Result, load, server_profiles, trickle
+
+async def content(response):
+    if not response.streaming:
+        return response.content
+    return b''.join([chunk async for chunk in response.streaming_content])
+
+
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'pages': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-asgi-pages'},
+}
+
+
+def reload_urlconfs():
+    for module in (core.urls, services.urls, sola_thomas_website.urls):
+        reload(module)
+    clear_url_caches()
+
+
+@override_settings(CACHES=CACHES, PAGE_CACHE_ALIAS='pages')
+class AsgiTests(SimpleTestCase):
+    def setUp(self):
+        caches['pages'].clear()
+        override = override_settings(ASYNC_VIEWS=True)
+        override.enable()
+        self.addCleanup(reload_urlconfs)
+        self.addCleanup(override.disable)
+        reload_urlconfs()
+
+    def test_routes_async_views(self):
+        for url in ('/', '/about/', '/contact/', '/services/home-services/', '/health/'):
+            self.assertTrue(resolve(url).func.__name__.endswith('_async'), url)
+
+    def test_middleware_stays_async(self):
+        # Django logs each sync-only middleware it has to adapt
+        with self.assertNoLogs('django.request', 'DEBUG'):
+            ASGIHandler().load_middleware(is_async=True)
+
+    async def test_public_pages(self):
+        for url in ('/', '/about/', '/contact/', '/services/home-services/', '/services/business-services/'):
+            response = await self.async_client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertTrue(response.has_header('ETag'), url)
+        self.assertEqual((await self.async_client.get('/health/')).content, b'OK')
+
+    async def test_page_cache_and_conditional_get(self):
+        first = await self.async_client.get('/about/')
+        self.assertTrue(first.streaming)
+        body = await content(first)
+        second = await self.async_client.get('/about/')
+        self.assertEqual((first['X-Page-Cache'], second['X-Page-Cache']), ('miss', 'hit'))
+        self.assertEqual(second.content, body)
+        revalidated = await self.async_client.get('/about/', headers={'If-None-Match': first['ETag']})
+        self.assertEqual(revalidated.status_code, 304)
+
+    async def test_send_email_async(self):
+        with mock.patch.object(email, 'transport') as transport:
+            transport.return_value.send.return_value.status = 202
+            self.assertEqual(await email.send_email_async('Hi', 'Body', 'a@example.com'), 202)
+        transport.return_value.send.assert_called_once()
+
+
+class BenchmarkTests(SimpleTestCase):
+    def test_server_profiles(self):
+        self.assertEqual(set(server_profiles()), {'sync', 'gevent', 'asgi'})
+        self.assertEqual(server_profiles()['asgi']['wsgi_app'], 'sola_thomas_website.asgi:application')
+
+    def test_result(self):
+        result = Result('sync', [0.004, 0.001, 0.002, 0.003], [], 2.0)
+        self.assertEqual(result.requests_per_second, 2.0)
+        self.assertEqual(result.percentile(50), 3.0)
+        self.assertEqual(result.percentile(100), 4.0)
+
+    def test_slow_clients(self):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'ok')
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        port = server.server_address[1]
+        self.assertEqual(trickle(port, '/', 'localhost', 0.05), 200)
+        latencies, errors, _seconds = load(port, ['/'], 2, 10, slow_clients=3, trickle_seconds=0.05)
+        self.assertEqual((len(latencies), errors), (10, []))
@@ -0,0 +1,64 @@
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from core.asset_check import check_django_pages, check_site
+
+PAGE = """<html><head>
+<link rel="stylesheet" href="https://cdn.example.com/bootstrap.css">
+<link rel="stylesheet" href="css/site.css">
+</head><body>
+<img src="images/logo.png" srcset="images/logo.png 1x, images/logo-2x.png 2x" alt="">
+<script src="js/missing.js"></script>
+</body></html>
+"""
+
+
+class CheckSiteTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        for directory in ('css', 'images', 'fonts'):
+            (self.root / directory).mkdir()
+        (self.root / 'css' / 'site.css').write_text(
+            '@font-face { src: url("../fonts/icons.woff2"); }\n.hero { background: url(../images/gone.jpg); }\n'
+        )
+        (self.root / 'fonts' / 'icons.woff2').write_bytes(b'\0' * 2048)
+        (self.root / 'images' / 'logo.png').write_bytes(b'\0' * 1000)
+        (self.root / 'images' / 'logo-2x.png').write_bytes(b'\0' * 4000)
+        (self.root / 'index.html').write_text(PAGE)
+
+    def test_reports_missing_references_and_weight(self):
+        (report,) = check_site(self.root)
+
+        self.assertEqual(report.page, 'index.html')
+        self.assertEqual(report.missing, [('js/missing.js', 'index.html'), ('../images/gone.jpg', 'css/site.css')])
+        self.assertEqual(report.external, ['https://cdn.example.com/bootstrap.css'])
+        self.assertEqual(set(report.assets), {'css/site.css', 'images/logo.png', 'fonts/icons.woff2'})
+        self.assertEqual(report.assets['fonts/icons.woff2'], ('font', 2048))
+        self.assertEqual(report.candidates, {'images/logo-2x.png'})
+        self.assertEqual(report.requests, 5)
+        self.assertEqual(report.largest(1), [(2048, 'fonts/icons.woff2')])
+
+    def test_command_fails_on_broken_references(self):
+        out = StringIO()
+        with self.assertRaisesMessage(CommandError, '2 broken reference(s)'):
+            call_command('check_assets', site=str(self.root), stdout=out)
+        self.assertIn('missing js/missing.js', out.getvalue())
+
+        (self.root / 'index.html').write_text('<html><img src="images/logo.png"></html>')
+        call_command('check_assets', site=str(self.root), stdout=out)
+        self.assertIn('All references in 1 page(s) resolve', out.getvalue())
+
+
+class CheckDjangoPagesTests(SimpleTestCase):
+    def test_renders_every_public_page(self):
+        reports = {report.page: report for report in check_django_pages()}
+
+        self.assertIn('/', reports)
+        self.assertIsNone(reports['/'].error)
+        self.assertIn('css/theme.css', reports['/'].assets)
@@ -0,0 +1,81 @@
+from io import StringIO
+from pathlib import Path
+from unittest import SkipTest, mock
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+
+from core.asset_check import PageReport, render_blocking
+from core.budgets import budget_for, measure, over_budget, record_budgets
+
+BUDGETS = {
+    'django': {
+        'default': {'weight_kib': 300, 'requests': 16},
+        'pages': {'/about/': {'weight_kib': 800}},
+    },
+}
+
+
+def report(page, weight, requests=1):
+    result = PageReport(page, '')
+    result.html_bytes = weight * 1024
+    result.external = ['https://cdn.example.com/x.js'] * (requests - 1)
+    return result
+
+
+class BudgetTests(SimpleTestCase):
+    def test_budget_for_merges_page_overrides(self):
+        self.assertEqual(budget_for(BUDGETS, 'django', '/about/'), {'weight_kib': 800, 'requests': 16})
+        self.assertEqual(budget_for(BUDGETS, 'django', '/'), {'weight_kib': 300, 'requests': 16})
+        self.assertEqual(budget_for(BUDGETS, 'static_site', 'index.html'), {})
+
+    def test_over_budget(self):
+        measurements = measure(report('/', 400, requests=3))
+        self.assertEqual(over_budget(measurements, {'weight_kib': 300, 'requests': 16}), [('weight_kib', 400, 300)])
+
+    def test_render_blocking(self):
+        html = (
+            '<html><head><link rel="stylesheet" href="a.css"><link rel="stylesheet" href="p.css" media="print">'
+            '<script src="sync.js"></script><script defer src="defer.js"></script>'
+            '<noscript><link rel="stylesheet" href="b.css"></noscript></head>'
+            '<body><script src="end.js"></script></body></html>'
+        )
+        self.assertEqual(render_blocking(html), ['a.css', 'sync.js'])
+
+    def test_record_budgets_only_lists_pages_over_the_defaults(self):
+        budgets = {'django': {'default': {'weight_kib': 300, 'requests': 16}, 'pages': {'/gone/': {}}}}
+        record_budgets(budgets, 'django', [report('/', 100), report('/about/', 500)])
+        self.assertEqual(budgets['django']['pages'], {'/about/': {'weight_kib': 550}, '/gone/': {}})
+
+    def test_missing_assets_fail_the_check(self):
+        page = report('index.html', 10)
+        page.missing = [('vendor/bootstrap/css/bootstrap.min.css', 'index.html')]
+        with mock.patch('core.management.commands.check_budgets.check_site', return_value=[page]):
+            with self.assertRaisesMessage(CommandError, '1 budget check(s) failed'):
+                call_command('check_budgets', '--site', stdout=StringIO())
+            with self.assertRaisesMessage(CommandError, 'Not recording budgets'):
+                call_command('check_budgets', '--site', '--update', stdout=StringIO())
+
+
+class PageBudgetSuite(SimpleTestCase):
+    """The checked-in budgets, measured against the real pages."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Every page loads the vendored Bootstrap, which only vendor_assets can fetch
+        if not (Path(settings.STATIC_SITE_ROOT) / 'vendor' / 'bootstrap' / 'css' / 'bootstrap.min.css').exists():
+            raise SkipTest("vendor/ is not installed; run python manage.py vendor_assets --no-rewrite")
+        # The budgets are for pages as deployed, with the image variants
+        # scripts/start.sh builds; unchanged images are skipped after the first run
+        call_command('build_images', stdout=StringIO())
+        responsive = ('responsive', settings.RESPONSIVE_IMAGES_ROOT)
+        if responsive not in settings.STATICFILES_DIRS:
+            cls.enterClassContext(override_settings(STATICFILES_DIRS=[*settings.STATICFILES_DIRS, responsive]))
+
+    def test_django_pages_within_budget(self):
+        call_command('check_budgets', stdout=StringIO())
+
+    def test_static_site_within_budget(self):
+        call_command('check_budgets', '--site', stdout=StringIO())
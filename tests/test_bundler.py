@@ -0,0 +1,93 @@
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.assets import SiteResolver
+from core.bundler import bundle_assets, script_inventory, template_inventory
+from core.css import Inventory
+from core.static_build import PageContext
+
+PAGE = """<html>
+<head>
+    <link rel="stylesheet" href="https://cdn.example.com/bootstrap.css">
+    <link rel="stylesheet" href="css/theme.css">
+    <link rel="stylesheet" href="css/pages/home.css">
+</head>
+<body class="home">
+    <nav class="navbar"><a class="nav-link" href="/">Home</a></nav>
+    <script src="https://cdn.example.com/bootstrap.js"></script>
+    <script src="js/theme.js"></script>
+    <script src="js/animations.js"></script>
+</body>
+</html>
+"""
+
+
+class InventoryTests(SimpleTestCase):
+    def test_template_inventory_ignores_template_syntax(self):
+        inventory = template_inventory(
+            '<a class="nav-link {% if active %}active{% endif %} {{ extra }}" id="nav">{# note #}</a>'
+        )
+        self.assertEqual(inventory.classes, {'nav-link', 'active', 'x'})
+        self.assertEqual(inventory.ids, {'nav'})
+
+    def test_template_inventory_includes_tag_class_arguments(self):
+        inventory = template_inventory('{% icon "sun" class="theme-icon sun-icon" %}')
+        self.assertEqual(inventory.classes, {'theme-icon', 'sun-icon'})
+
+    def test_script_inventory(self):
+        inventory, prefixes = script_inventory(
+            "navbar.classList.add('shrink'); el.className = `alert alert-${type} fade`;"
+        )
+        self.assertTrue({'shrink', 'alert', 'fade'} <= inventory.classes)
+        self.assertEqual(prefixes, {'alert-'})
+
+
+class BundleAssetsTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        (self.root / 'css' / 'pages').mkdir(parents=True)
+        (self.root / 'js').mkdir()
+        (self.root / 'css' / 'theme.css').write_text(
+            '.navbar { position: fixed; }\n.sidebar { width: 10rem; }\n'
+            '.hero { background: url("../images/hero.jpg"); }\n.alert-danger { color: red; }\n'
+        )
+        (self.root / 'css' / 'pages' / 'home.css').write_text('.home .nav-link { color: blue; }')
+        (self.root / 'js' / 'theme.js').write_text('const theme = 1;')
+        (self.root / 'js' / 'animations.js').write_text('const animations = 2;')
+        self.output = self.root / 'dist'
+        self.context = PageContext('index.html', SiteResolver(self.root), self.output)
+        used = Inventory({'nav', 'a'}, {'navbar', 'nav-link', 'home', 'hero'}, (), {'class', 'href'})
+        used_names = mock.patch('core.bundler.used_names', return_value=(used, frozenset({'alert-'})))
+        used_names.start()
+        self.addCleanup(used_names.stop)
+
+    def test_bundles_local_stylesheets_and_scripts(self):
+        html = bundle_assets(PAGE, self.context)
+
+        self.assertIn('<link rel="stylesheet" href="https://cdn.example.com/bootstrap.css">', html)
+        self.assertNotIn('css/theme.css', html)
+        self.assertNotIn('js/theme.js', html)
+        self.assertLess(html.index('bootstrap.js'), html.index('<script src="bundles/'))
+        self.assertEqual(html.count('<link rel="stylesheet" href="bundles/'), 1)
+
+        (css_name,) = [name for name in self.context.emitted if name.endswith('.css')]
+        css = (self.output / css_name).read_text()
+        self.assertEqual(
+            css,
+            '.navbar{position:fixed}.hero{background:url("../images/hero.jpg")}'
+            '.alert-danger{color:red}.home .nav-link{color:blue}',
+        )
+
+        (js_name,) = [name for name in self.context.emitted if name.endswith('.js')]
+        self.assertEqual((self.output / js_name).read_text(), 'const theme = 1;\n;\nconst animations = 2;\n')
+
+    def test_bundle_names_follow_content(self):
+        bundle_assets(PAGE, self.context)
+        other = PageContext('about.html', SiteResolver(self.root), self.output)
+        bundle_assets(PAGE, other)
+        self.assertEqual(sorted(self.context.emitted), sorted(other.emitted))
@@ -0,0 +1,68 @@
+import shutil
+import tempfile
+from datetime import date
+from pathlib import Path
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.conditional import conditional_page, page_etag, template_dependencies
+
+
+class ConditionalPageTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        (self.root / 'base.html').write_text('<html>{% block content %}{% endblock %}{% include "footer.html" %}</html>')
+        (self.root / 'footer.html').write_text('<footer></footer>')
+        (self.root / 'page.html').write_text('{% extends "base.html" %}{% block content %}Hi{% endblock %}')
+        (self.root / 'dynamic.html').write_text('{% include name %}')
+        templates = [{'BACKEND': 'django.template.backends.django.DjangoTemplates', 'DIRS': [self.root]}]
+        override = override_settings(TEMPLATES=templates)
+        override.enable()
+        self.addCleanup(override.disable)
+        template_dependencies.cache_clear()
+        self.addCleanup(template_dependencies.cache_clear)
+        self.renders = 0
+
+    def view(self, request):
+        self.renders += 1
+        return HttpResponse('page')
+
+    def test_template_dependencies(self):
+        self.assertEqual(
+            [path.name for path in template_dependencies('page.html')],
+            ['base.html', 'footer.html', 'page.html'],
+        )
+        self.assertIsNone(template_dependencies('dynamic.html'))
+
+    def test_etag_follows_templates_and_context(self):
+        etag = page_etag('page.html')
+        self.assertEqual(page_etag('page.html'), etag)
+        self.assertNotEqual(page_etag('page.html', {'user': 'a'}), etag)
+        (self.root / 'footer.html').write_text('<footer>changed</footer>')
+        self.assertNotEqual(page_etag('page.html'), etag)
+
+    def test_etag_follows_deploy_and_year(self):
+        etag = page_etag('page.html')
+        with mock.patch('core.conditional.deploy_version', return_value='next'):
+            self.assertNotEqual(page_etag('page.html'), etag)
+        with mock.patch('core.conditional.timezone.localdate', return_value=date(2999, 1, 1)):
+            self.assertNotEqual(page_etag('page.html'), etag)
+
+    def test_answers_revalidation_without_running_the_view(self):
+        view = conditional_page('page.html')(self.view)
+        factory = RequestFactory()
+        response = view(factory.get('/'))
+        self.assertEqual(response.status_code, 200)
+        # a modification time can't cover a new year or a changed setting
+        self.assertFalse(response.has_header('Last-Modified'))
+
+        revalidated = view(factory.get('/', HTTP_IF_NONE_MATCH=response['ETag']))
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(self.renders, 1)
+
+    def test_dynamic_templates_get_no_validators(self):
+        response = conditional_page('dynamic.html')(self.view)(RequestFactory().get('/'))
+        self.assertFalse(response.has_header('ETag'))
@@ -0,0 +1,94 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from core.assets import SiteResolver
+from core.critical_css import inline_critical_css
+from core.css import Inventory, minify_css, selector_matches
+from core.static_build import PageContext, SiteDirectoryBuilder
+
+PAGE = """<!DOCTYPE html>
+<html data-theme="dark">
+<head>
+    <link rel="stylesheet" href="https://cdn.example.com/bootstrap.css">
+    <link rel="stylesheet" href="css/theme.css">
+    <link rel="stylesheet" href="css/print.css" media="print">
+</head>
+<body>
+    <nav class="navbar"><a class="navbar-brand" href="/">Home</a></nav>
+    <section class="hero-section"><h1>Welcome</h1></section>
+    <section class="footer-cta"><p>Below the fold</p></section>
+</body>
+</html>
+"""
+
+THEME = """
+/* Theme */
+:root[data-theme="dark"] { --bg: #000; }
+.navbar, .sidebar { position: fixed; }
+.hero-section { background: url("../images/hero.jpg") center; }
+.footer-cta { padding: 2rem; }
+@media (max-width: 768px) {
+    .navbar-brand { font-size: 1rem; }
+    .footer-cta { padding: 1rem; }
+}
+@keyframes fade { from { opacity: 0; } to { opacity: 1; } }
+"""
+
+
+class CssTests(SimpleTestCase):
+    def test_minify_css(self):
+        self.assertEqual(
+            minify_css('a , b { color : red ;  margin: 0 auto; }\n@media print { a { display: none } }'),
+            'a,b{color:red;margin:0 auto}@media print{a{display:none}}',
+        )
+
+    def test_selector_matches(self):
+        inventory = Inventory(tags={'nav', 'a'}, classes={'navbar', 'active'}, attributes={'class', 'href'})
+        self.assertTrue(selector_matches('.navbar a.active:hover', inventory))
+        self.assertTrue(selector_matches(':root', inventory))
+        self.assertTrue(selector_matches('a:not([disabled])', inventory))
+        self.assertFalse(selector_matches('.navbar .dropdown-menu', inventory))
+        self.assertFalse(selector_matches('[data-theme="light"] a', inventory))
+
+
+class InlineCriticalCssTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        (self.root / 'css').mkdir()
+        (self.root / 'css' / 'theme.css').write_text(THEME)
+        (self.root / 'css' / 'print.css').write_text('body { color: black; }')
+        (self.root / 'index.html').write_text(PAGE)
+        self.context = PageContext('index.html', SiteResolver(self.root), self.root / 'dist')
+
+    def test_inlines_above_the_fold_rules(self):
+        html = inline_critical_css(PAGE, self.context)
+        style = html[html.index('<style data-critical>'):html.index('</style>')]
+
+        self.assertIn(':root[data-theme="dark"]{--bg:#000}', style)
+        self.assertIn('.navbar{position:fixed}', style)
+        self.assertIn('url("images/hero.jpg")', style)
+        self.assertIn('@media (max-width: 768px){.navbar-brand{font-size:1rem}}', style)
+        self.assertNotIn('footer-cta', style)
+        self.assertNotIn('keyframes', style)
+
+    def test_defers_local_stylesheets_only(self):
+        html = inline_critical_css(PAGE, self.context)
+
+        self.assertIn('<link rel="stylesheet" href="https://cdn.example.com/bootstrap.css">', html)
+        self.assertIn('<link rel="preload" href="css/theme.css" as="style"', html)
+        self.assertIn('<noscript><link rel="stylesheet" href="css/theme.css"></noscript>', html)
+        self.assertIn('<link rel="stylesheet" href="css/print.css" media="print">', html)
+        self.assertEqual(inline_critical_css(html, self.context), html)
+
+    def test_site_directory_build(self):
+        output = self.root / 'dist'
+        builder = SiteDirectoryBuilder(self.root, output).build()
+
+        self.assertEqual(builder.pages, ['index.html'])
+        self.assertIn('<style data-critical>', (output / 'index.html').read_text())
+        self.assertEqual((output / 'css' / 'theme.css').read_text(), THEME)
+        self.assertEqual(SiteDirectoryBuilder(self.root, output).build().copied, [])
@@ -0,0 +1,97 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.mail import get_connection, send_mail
+from django.test import SimpleTestCase, override_settings
+
+from core import email
+from core.email_transport import EmailTransport, EmailTransportError, reset_transport, transport
+
+
+class FakeSendGrid(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.received.append((self.path, self.headers['Authorization'], payload))
+        status, body = (400, b'{"errors": []}') if payload.get('subject') == 'bad' else (202, b'')
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Message-Id', 'abc123')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def payload(subject='Hi'):
+    return {'subject': subject, 'personalizations': [{'to': [{'email': 'a@example.com'}]}]}
+
+
+class EmailTransportTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeSendGrid)
+        self.server.connections, self.server.received = 0, []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.host = f'http://127.0.0.1:{self.server.server_address[1]}'
+        override = override_settings(
+            SENDGRID_API_KEY='key', SENDGRID_HOST_URL=self.host, EMAIL_TRANSPORT_POOL_SIZE=2,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        reset_transport()
+        self.addCleanup(reset_transport)
+
+    def test_connections_are_reused(self):
+        sender = EmailTransport('key', self.host, pool_size=2, timeout=5)
+        for _n in range(5):
+            self.assertEqual(sender.send(payload()).status, 202)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.server.received[0][:2], ('/v3/mail/send', 'Bearer key'))
+        summary = sender.summary()
+        self.assertEqual((summary['sends'], summary['errors'], summary['connections']), (5, 0, 1))
+        self.assertGreater(summary['p95_ms'], 0)
+
+    def test_errors_are_raised_and_counted(self):
+        sender = EmailTransport('key', self.host, pool_size=2, timeout=5)
+        with self.assertRaises(EmailTransportError) as raised:
+            sender.send(payload('bad'))
+        self.assertEqual((raised.exception.status, raised.exception.body), (400, '{"errors": []}'))
+        self.assertEqual(sender.metrics.errors, 1)
+        unreachable = EmailTransport('key', 'http://127.0.0.1:1', pool_size=1, timeout=1)
+        with self.assertRaises(EmailTransportError):
+            unreachable.send(payload())
+
+    def test_threads_share_the_pool(self):
+        sender = EmailTransport('key', self.host, pool_size=2, timeout=5)
+        threads = [threading.Thread(target=lambda: [sender.send(payload()) for _n in range(5)]) for _t in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sender.metrics.sends, 40)
+        self.assertLessEqual(self.server.connections, 2)
+
+    def test_send_email_and_send_mail_share_one_transport(self):
+        self.assertEqual(email.send_email('Hi', 'Body', 'a@example.com', '<p>Body</p>'), 202)
+        backend = get_connection('core.email_backend.SendgridBackend')
+        self.assertEqual(send_mail('Hello', 'Body', 'noreply@example.com', ['b@example.com'], connection=backend), 1)
+        self.assertEqual([received[2]['subject'] for received in self.server.received], ['Hi', 'Hello'])
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(transport().summary()['sends'], 2)
+
+    def test_backend_failure(self):
+        backend = get_connection('core.email_backend.SendgridBackend')
+        with self.assertLogs('core.email_backend', 'ERROR'), self.assertRaises(EmailTransportError):
+            send_mail('bad', 'Body', 'noreply@example.com', ['b@example.com'], connection=backend)
+        quiet = get_connection('core.email_backend.SendgridBackend', fail_silently=True)
+        with self.assertLogs('core.email_backend', 'ERROR'):
+            self.assertEqual(send_mail('bad', 'Body', 'noreply@example.com', ['b@example.com'], connection=quiet), 0)
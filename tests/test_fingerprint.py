@@ -0,0 +1,83 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase, override_settings
+
+from core.fingerprint import ASSET_MANIFEST_NAME, hashed_name
+from core.static_build import SiteDirectoryBuilder
+
+PAGE = """<html><head>
+<link rel="stylesheet" href="css/site.css">
+<meta property="og:image" content="images/logo.png">
+</head><body>
+<img src="images/logo.png" srcset="images/logo.png 1x, images/logo@2x.png 2x" alt="Logo">
+<a href="other.html#top">Other</a>
+<div style="background: url('images/logo.png')"></div>
+<script src="js/site.js"></script>
+</body></html>
+"""
+
+
+@override_settings(STATIC_BUILD_PROCESSORS=[])
+class FingerprintBuildTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        self.source = self.root / 'site'
+        self.output = self.root / 'dist'
+        for directory in ('css', 'images', 'js'):
+            (self.source / directory).mkdir(parents=True)
+        (self.source / 'css' / 'site.css').write_text('body { background: url("../images/logo.png"); }' * 20)
+        (self.source / 'images' / 'logo.png').write_bytes(b'png')
+        (self.source / 'images' / 'logo@2x.png').write_bytes(b'png2x')
+        (self.source / 'js' / 'site.js').write_text('console.log("hi");\n' * 20)
+        (self.source / 'index.html').write_text(PAGE)
+        (self.source / 'other.html').write_text('<html></html>')
+        (self.source / 'robots.txt').write_text('User-agent: *\n')
+        (self.source / 'README.md').write_text('# Notes\n')
+
+    def build(self):
+        return SiteDirectoryBuilder(self.source, self.output, fingerprint=True).build()
+
+    def test_hashed_name(self):
+        self.assertRegex(hashed_name('css/site.css', b'x'), r'^css/site\.[0-9a-f]{12}\.css$')
+        self.assertRegex(hashed_name('bundles/0123456789ab.css', b'x'), r'^bundles/[0-9a-f]{12}\.css$')
+        self.assertNotEqual(hashed_name('bundles/0123456789ab.css', b'x'), 'bundles/0123456789ab.css')
+
+    def test_rewrites_references_to_hashed_copies(self):
+        builder = self.build()
+        manifest = json.loads((self.output / ASSET_MANIFEST_NAME).read_text())
+        paths = manifest['paths']
+
+        self.assertEqual(manifest['version'], builder.version)
+        self.assertEqual(set(paths), {'css/site.css', 'images/logo.png', 'images/logo@2x.png', 'js/site.js'})
+        html = (self.output / 'index.html').read_text()
+        self.assertIn(f'href="{paths["css/site.css"]}"', html)
+        self.assertIn(f'content="{paths["images/logo.png"]}"', html)
+        self.assertIn(f'srcset="{paths["images/logo.png"]} 1x, {paths["images/logo@2x.png"]} 2x"', html)
+        self.assertIn(f"url('{paths['images/logo.png']}')", html)
+        self.assertIn('href="other.html#top"', html)
+
+        css = (self.output / paths['css/site.css']).read_text()
+        self.assertIn(f'url("../{paths["images/logo.png"]}")', css)
+        self.assertTrue((self.output / 'css' / 'site.css').exists())
+        for name in ('index.html', paths['css/site.css'], paths['js/site.js']):
+            self.assertTrue((self.output / (name + '.br')).exists(), name)
+            self.assertTrue((self.output / (name + '.gz')).exists(), name)
+        self.assertTrue((self.output / 'robots.txt').exists())
+        self.assertFalse((self.output / 'README.md').exists())
+
+    def test_changed_asset_gets_new_name_and_old_one_is_removed(self):
+        old = self.build().version
+        old_css = json.loads((self.output / ASSET_MANIFEST_NAME).read_text())['paths']['css/site.css']
+        (self.source / 'images' / 'logo.png').write_bytes(b'new png')
+
+        builder = self.build()
+        new_css = json.loads((self.output / ASSET_MANIFEST_NAME).read_text())['paths']['css/site.css']
+        self.assertNotEqual(builder.version, old)
+        self.assertNotEqual(new_css, old_css)
+        self.assertIn(old_css, builder.removed)
+        self.assertFalse((self.output / old_css).exists())
+        self.assertFalse((self.output / (old_css + '.br')).exists())
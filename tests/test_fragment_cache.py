@@ -0,0 +1,37 @@
+import re
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.template.loader import get_template
+from django.test import RequestFactory, SimpleTestCase
+
+from core.context_processors import page_chrome
+from core.deploy import deploy_version
+from core.views import about
+
+
+class PageChromeTests(SimpleTestCase):
+    def test_variants(self):
+        request = RequestFactory().get('/')
+        self.assertEqual(page_chrome(request)['chrome_variant'], 'anonymous')
+        request.user = SimpleNamespace(is_authenticated=True, is_staff=False)
+        self.assertEqual(page_chrome(request)['chrome_variant'], 'authenticated')
+        request.user = SimpleNamespace(is_authenticated=True, is_staff=True)
+        self.assertEqual(page_chrome(request)['chrome_variant'], 'staff')
+        self.assertEqual(page_chrome(request)['deploy_version'], deploy_version())
+
+    def test_base_chrome_is_cached_per_variant_and_deploy(self):
+        cache.clear()
+        response = about(RequestFactory(HTTP_HOST='localhost').get('/about/'))
+        b''.join(response.streaming_content)
+        nav = cache.get(make_template_fragment_key('base_nav', ['anonymous', deploy_version()]))
+        self.assertIn('<nav class="navbar', nav)
+        self.assertIsNone(cache.get(make_template_fragment_key('base_nav', ['staff', deploy_version()])))
+
+    def test_no_csrf_token_in_cached_fragments(self):
+        source = get_template('base.html').template.source
+        fragments = re.findall(r'{% cache .*?%}(.*?){% endcache %}', source, re.S)
+        self.assertGreater(len(fragments), 0)
+        for fragment in fragments:
+            self.assertNotIn('csrf_token', fragment)
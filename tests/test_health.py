@@ -0,0 +1,85 @@
+import asyncio
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from core import health, warmup
+from core.health import Check, HealthCheckASGIMiddleware, HealthCheckWSGIMiddleware, readiness
+
+CHECKS = ['tests.test_health.passing', 'tests.test_health.failing']
+calls = []
+
+
+def passing():
+    calls.append('passing')
+    return Check(True, 'fine')
+
+
+def failing():
+    return Check(False, 'broken')
+
+
+def django_app(*args):
+    raise AssertionError("the probe reached Django")
+
+
+class HealthTests(SimpleTestCase):
+    databases = {'default'}
+
+    def setUp(self):
+        readiness.clear()
+        self.addCleanup(readiness.clear)
+        calls.clear()
+
+    def wsgi(self, path):
+        started = []
+        body = HealthCheckWSGIMiddleware(django_app)(
+            {'REQUEST_METHOD': 'GET', 'PATH_INFO': path}, lambda status, headers: started.append(status),
+        )
+        return started[0], b''.join(body)
+
+    def test_liveness_bypasses_django(self):
+        self.assertEqual(self.wsgi('/health/'), ('200 OK', b'OK'))
+
+    @override_settings(HEALTH_READY_CHECKS=CHECKS[:1], HEALTH_READY_TTL=60)
+    def test_readiness_is_cached(self):
+        status, body = self.wsgi('/health/ready')
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(json.loads(body), {'status': 'ready', 'checks': {'passing': {'ok': True, 'detail': 'fine'}}})
+        self.wsgi('/health/ready')
+        self.assertEqual(calls, ['passing'])
+
+    @override_settings(HEALTH_READY_CHECKS=CHECKS, HEALTH_READY_TTL=0)
+    def test_failing_check_is_not_ready(self):
+        status, body = self.wsgi('/health/ready')
+        self.assertEqual(status, '503 Service Unavailable')
+        self.assertEqual(json.loads(body)['status'], 'not ready')
+        self.wsgi('/health/ready')
+        self.assertEqual(calls, ['passing', 'passing'])
+
+    @override_settings(HEALTH_READY_CHECKS=CHECKS[:1])
+    def test_asgi(self):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        application = HealthCheckASGIMiddleware(django_app)
+        for path in ('/health/', '/health/ready'):
+            asyncio.run(application({'type': 'http', 'method': 'GET', 'path': path}, None, send))
+        self.assertEqual([message.get('status') for message in sent[::2]], [200, 200])
+        self.assertEqual(sent[1]['body'], b'OK')
+
+    def test_routed_views(self):
+        self.assertEqual(self.client.get('/health/').content, b'OK')
+        with override_settings(HEALTH_READY_CHECKS=CHECKS[:1]):
+            self.assertEqual(self.client.get('/health/ready').status_code, 200)
+
+    def test_checks(self):
+        self.assertTrue(health.check_database().ok)
+        self.assertTrue(health.check_email().ok)
+        with mock.patch.dict(warmup.state, clear=True):
+            self.assertFalse(health.check_templates().ok)
+            warmup.state['compiled'] = 0
+            self.assertTrue(health.check_templates().ok)
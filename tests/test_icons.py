@@ -0,0 +1,77 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.template import Context, Template
+from django.test import SimpleTestCase
+
+from core.assets import SiteResolver
+from core.icons import Icon, build_sprite, inline_icons, load_icons
+from core.static_build import PageContext
+
+SUN = """<svg xmlns="http://www.w3.org/2000/svg" fill="none" viewBox="0 0 24 24" stroke="currentColor" class="size-6">
+  <path d="M12 3v2.25" />
+</svg>
+"""
+
+BOARD = """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 304 304" width="304" height="304">
+  <path fill="#000" d="%s"/>
+</svg>
+""" % ('M0 0h1v1z' * 200)
+
+
+class IconTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        (self.root / 'svg').mkdir()
+        (self.root / 'svg' / 'sun.svg').write_text(SUN)
+        (self.root / 'svg' / 'circuit-board.svg').write_text(BOARD)
+
+    def test_parses_presentation_attributes(self):
+        icon = Icon('sun', SUN)
+        self.assertEqual(icon.attrs, {'viewBox': '0 0 24 24', 'fill': 'none', 'stroke': 'currentColor'})
+        self.assertEqual(icon.body, '<path d="M12 3v2.25" />')
+        self.assertTrue(icon.inline)
+        self.assertFalse(Icon('circuit-board', BOARD).inline)
+
+    def test_sprite_has_a_symbol_per_icon(self):
+        sprite = build_sprite(load_icons(self.root / 'svg'))
+        self.assertIn('<symbol id="icon-circuit-board" viewBox="0 0 304 304">', sprite)
+        self.assertIn('<symbol id="icon-sun" viewBox="0 0 24 24" fill="none" stroke="currentColor"><path', sprite)
+
+    def test_html(self):
+        icons = load_icons(self.root / 'svg')
+        self.assertEqual(
+            icons['sun'].html('/sprite.svg', alt='Light theme', **{'class': 'theme-icon'}),
+            '<svg viewBox="0 0 24 24" fill="none" stroke="currentColor" class="theme-icon" role="img" '
+            'aria-label="Light theme"><path d="M12 3v2.25" /></svg>',
+        )
+        self.assertEqual(
+            icons['circuit-board'].html('/sprite.svg'),
+            '<svg viewBox="0 0 304 304" width="304" height="304" aria-hidden="true">'
+            '<use href="/sprite.svg#icon-circuit-board"></use></svg>',
+        )
+        self.assertTrue(icons['circuit-board'].html(None).endswith('z"/></svg>'))
+
+    def test_inline_icons_processor(self):
+        html = (
+            '<img src="svg/sun.svg" alt="Light theme" class="theme-icon">'
+            '<img src="svg/circuit-board.svg" alt="">'
+            '<img src="images/photo.png" alt="">'
+        )
+        output = self.root / 'out'
+        context = PageContext('index.html', SiteResolver(self.root), output)
+        processed = inline_icons(html, context)
+        self.assertIn('<svg viewBox="0 0 24 24" fill="none" stroke="currentColor" class="theme-icon" role="img"', processed)
+        self.assertIn('<use href="svg/sprite.svg#icon-circuit-board"></use>', processed)
+        self.assertIn('<img src="images/photo.png" alt="">', processed)
+        self.assertIn('icon-sun', (output / 'svg' / 'sprite.svg').read_text())
+
+    def test_icon_tag(self):
+        template = Template("{% load icons %}{% icon 'sun' alt='Light theme' %}{% icon 'missing' %}")
+        with self.settings(ICON_SPRITE_ROOT=self.root / 'none'):
+            html = template.render(Context())
+        self.assertTrue(html.startswith('<svg viewBox="0 0 24 24"'))
+        self.assertIn('aria-label="Light theme"', html)
+        self.assertTrue(html.endswith('<img src="/static/svg/missing.svg" alt="">'))
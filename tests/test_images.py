@@ -0,0 +1,108 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from core.assets import SiteResolver
+from core.images import ImageVariantBuilder, image_hints, rewrite_img_tags, variant_widths
+from core.static_build import PageContext
+
+
+class ImageVariantBuilderTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        self.source = self.root / 'photo.jpg'
+        Image.new('RGB', (1000, 500), 'navy').save(self.source)
+        self.output = self.root / 'responsive'
+
+    def build(self):
+        return ImageVariantBuilder(self.output, widths=[480, 960], formats=['webp']).build(
+            {'images/photo.jpg': self.source})
+
+    def test_variant_widths_never_upscale(self):
+        self.assertEqual(variant_widths(1000, [480, 960, 1920]), [480, 960, 1000])
+        self.assertEqual(variant_widths(300, [480, 960]), [300])
+
+    def test_builds_each_width_and_format(self):
+        entry = self.build().index['images/photo.jpg']
+        self.assertEqual(entry['width'], 1000)
+        self.assertEqual(set(entry['sources']), {'webp', 'jpeg'})
+        widths = [v['width'] for v in entry['sources']['webp']]
+        self.assertEqual(widths, [480, 960])
+        for variant in entry['sources']['jpeg']:
+            self.assertTrue((self.root / variant['path']).exists())
+
+    def test_unchanged_sources_are_not_re_encoded(self):
+        self.build()
+        self.assertEqual(self.build().skipped, ['images/photo.jpg'])
+
+        Image.new('RGB', (1000, 500), 'red').save(self.source)
+        builder = self.build()
+        self.assertEqual(builder.generated, ['images/photo.jpg'])
+        self.assertEqual(len(list((self.output / 'images').iterdir())), 4)
+
+    def test_rewrite_img_tags(self):
+        index = self.build().index
+        html = '<img src="images/photo.jpg" alt="A &amp; B" class="hero"><img src="other.png">'
+        rewritten = rewrite_img_tags(html, index, lambda path: path)
+        self.assertIn('<source type="image/webp"', rewritten)
+        self.assertIn('width="960" height="480" alt="A &amp; B" class="hero" loading="lazy" decoding="async" style="background:', rewritten)
+        self.assertIn('<img src="other.png">', rewritten)
+        self.assertEqual(rewrite_img_tags(rewritten, index, lambda path: path), rewritten)
+
+    def test_responsive_image_tag(self):
+        self.build()
+        template = Template("{% load images %}{% responsive_image 'images/photo.jpg' alt='Photo' %}")
+        with override_settings(RESPONSIVE_IMAGES_ROOT=self.output):
+            html = template.render(Context())
+        self.assertTrue(html.startswith('<picture>'))
+        self.assertIn('/static/responsive/images/photo-', html)
+
+        with override_settings(RESPONSIVE_IMAGES_ROOT=self.root / 'missing'):
+            html = template.render(Context())
+        self.assertEqual(html, '<img src="/static/images/photo.jpg" alt="Photo" loading="lazy" decoding="async">')
+
+    def test_placeholder_is_recorded(self):
+        entry = self.build().index['images/photo.jpg']
+        self.assertTrue(entry['placeholder'].startswith('data:image/webp;base64,'))
+
+        del entry['placeholder']
+        builder = self.build()
+        self.assertEqual(builder.skipped, ['images/photo.jpg'])
+        self.assertIn('placeholder', builder.index['images/photo.jpg'])
+
+    def test_background_image_tag(self):
+        self.build()
+        template = Template("{% load images %}{% background_image 'images/photo.jpg' %}")
+        with override_settings(RESPONSIVE_IMAGES_ROOT=self.output):
+            html = template.render(Context())
+        self.assertRegex(html, r'^background-image: url\(/static/images/photo.jpg\), url\(data:image/webp;base64,[^)]+\);$')
+
+        with override_settings(RESPONSIVE_IMAGES_ROOT=self.root / 'missing'):
+            html = template.render(Context())
+        self.assertEqual(html, 'background-image: url(/static/images/photo.jpg);')
+
+    def test_image_hints(self):
+        site = self.root / 'site'
+        (site / 'images').mkdir(parents=True)
+        shutil.copy(self.source, site / 'images' / 'photo.jpg')
+        ImageVariantBuilder(site / 'responsive', widths=[480], formats=['webp']).build(
+            {'images/photo.jpg': site / 'images' / 'photo.jpg'})
+        html = (
+            '<body><section style="background-image: url(\'images/photo.jpg\');">'
+            '<img src="images/photo.jpg" alt=""></section>'
+            '<img src="images/photo.jpg" alt=""><img src="images/photo.jpg" width="10" loading="eager"/>'
+            '<img src="images/other.png"></body>'
+        )
+        context = PageContext('index.html', SiteResolver(site), site)
+        hinted = image_hints(html, context)
+        self.assertIn("url('images/photo.jpg'), url(data:image/webp;base64,", hinted)
+        self.assertIn('<img src="images/photo.jpg" alt="" width="1000" height="500" decoding="async"></section>', hinted)
+        self.assertIn('</section><img src="images/photo.jpg" alt="" width="1000" height="500" loading="lazy" decoding="async">', hinted)
+        self.assertIn('<img src="images/photo.jpg" width="10" loading="eager" decoding="async"/>', hinted)
+        self.assertIn('<img src="images/other.png">', hinted)
+        self.assertEqual(image_hints(hinted, context), hinted)
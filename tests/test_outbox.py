@@ -0,0 +1,81 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import health, outbox
+from core.models import OutboxMessage
+from core.outbox import Dispatcher, claim, enqueue
+
+
+@override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=3, EMAIL_OUTBOX_BACKOFF_BASE=30, EMAIL_OUTBOX_BACKOFF_MAX=45)
+class OutboxTests(TestCase):
+    def test_enqueue_only_stores(self):
+        queued = enqueue('Hello', 'Plain', 'a@example.com', html_message='<p>Hi</p>', idempotency_key='k')
+        self.assertEqual(queued.status, OutboxMessage.PENDING)
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(health.email_backlog(), 1)
+
+    def test_idempotency_key_stores_once(self):
+        first = enqueue('Hello', 'Plain', 'a@example.com', idempotency_key='invoice:1')
+        with self.assertLogs('core.outbox', 'INFO'):
+            second = enqueue('Hello again', 'Plain', 'a@example.com', idempotency_key='invoice:1')
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+        enqueue('Hello', 'Plain', 'a@example.com')
+        enqueue('Hello', 'Plain', 'a@example.com')
+        self.assertEqual(OutboxMessage.objects.count(), 3)
+
+    def test_dispatch_sends_and_marks_sent(self):
+        enqueue('Hello', 'Plain', 'a@example.com', html_message='<p>Hi</p>', idempotency_key='k')
+        call_command('dispatch_email', '--once', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['a@example.com'])
+        self.assertEqual(mail.outbox[0].alternatives[0][0], '<p>Hi</p>')
+        sent = OutboxMessage.objects.get()
+        self.assertEqual((sent.status, sent.attempts), (OutboxMessage.SENT, 1))
+        self.assertIsNotNone(sent.sent_at)
+        self.assertEqual(health.email_backlog(), 0)
+
+    def test_failed_send_backs_off_then_gives_up(self):
+        enqueue('Hello', 'Plain', 'a@example.com', idempotency_key='k')
+        delays = []
+        with mock.patch.object(outbox, 'deliver', side_effect=ConnectionError('provider down')):
+            for _attempt in range(3):
+                OutboxMessage.objects.update(next_attempt_at=timezone.now())
+                with self.assertLogs('core.outbox', 'WARNING'):
+                    self.assertEqual(Dispatcher().dispatch(), (0, 1))
+                queued = OutboxMessage.objects.get()
+                delays.append(round((queued.next_attempt_at - timezone.now()).total_seconds() / 15) * 15)
+        self.assertEqual(delays[:2], [30, 45])
+        self.assertEqual(queued.status, OutboxMessage.FAILED)
+        self.assertEqual(queued.last_error, 'ConnectionError: provider down')
+        self.assertEqual(Dispatcher().dispatch(), (0, 0))
+
+    def test_retry_waits_for_its_time(self):
+        enqueue('Hello', 'Plain', 'a@example.com', idempotency_key='k')
+        OutboxMessage.objects.update(next_attempt_at=timezone.now() + timedelta(minutes=1))
+        self.assertEqual(claim(10), [])
+
+    def test_claims_are_exclusive_until_they_go_stale(self):
+        enqueue('Hello', 'Plain', 'a@example.com', idempotency_key='k')
+        now = timezone.now()
+        self.assertEqual(len(claim(10, now)), 1)
+        self.assertEqual(claim(10, now), [])
+        with override_settings(EMAIL_OUTBOX_CLAIM_TIMEOUT=60):
+            self.assertEqual(claim(10, now + timedelta(seconds=30)), [])
+            reclaimed = claim(10, now + timedelta(seconds=90))
+        self.assertEqual(reclaimed[0].attempts, 2)
+
+    def test_concurrency_limits_the_batch(self):
+        for n in range(5):
+            enqueue('Hello', 'Plain', f'{n}@example.com')
+        self.assertEqual(Dispatcher(concurrency=2).dispatch(), (2, 0))
+        self.assertEqual(len(mail.outbox), 2)
+        with self.assertLogs('core.outbox', 'INFO'):
+            Dispatcher(concurrency=2).run(once=True)
+        self.assertEqual(len(mail.outbox), 5)
@@ -0,0 +1,107 @@
+import shutil
+import tempfile
+from datetime import date
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.deploy import compute_deploy_version
+from core.middleware import PageCacheMiddleware
+
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'pages': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-pages'},
+}
+
+
+@override_settings(CACHES=CACHES, PAGE_CACHE_ALIAS='pages')
+class PageCacheMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        caches['pages'].clear()
+        self.renders = 0
+        self.factory = RequestFactory()
+
+    def view(self, request):
+        self.renders += 1
+        response = HttpResponse(f'<html>render {self.renders}</html>')
+        response['Link'] = '</static/a.css>; rel=preload; as=style'
+        return response
+
+    def test_serves_repeat_requests_from_the_cache(self):
+        middleware = PageCacheMiddleware(self.view)
+        first = middleware(self.factory.get('/about/'))
+        second = middleware(self.factory.get('/about/'))
+        self.assertEqual(self.renders, 1)
+        self.assertEqual((first['X-Page-Cache'], second['X-Page-Cache']), ('miss', 'hit'))
+        self.assertEqual(second.content, b'<html>render 1</html>')
+        self.assertEqual(second['Link'], first['Link'])
+
+    def test_new_deploy_version_starts_afresh(self):
+        middleware = PageCacheMiddleware(self.view)
+        middleware(self.factory.get('/about/'))
+        with mock.patch('core.middleware.deploy_version', return_value='next'):
+            response = middleware(self.factory.get('/about/'))
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertEqual(self.renders, 2)
+
+    def test_new_year_starts_afresh(self):
+        middleware = PageCacheMiddleware(self.view)
+        middleware(self.factory.get('/about/'))
+        with mock.patch('core.middleware.timezone.localdate', return_value=date(2099, 1, 1)):
+            response = middleware(self.factory.get('/about/'))
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+
+    def test_http_and_https_are_cached_apart(self):
+        middleware = PageCacheMiddleware(self.view)
+        middleware(self.factory.get('/about/'))
+        response = middleware(self.factory.get('/about/', secure=True))
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertEqual(middleware(self.factory.get('/about/', secure=True))['X-Page-Cache'], 'hit')
+
+    def test_bypassed_requests(self):
+        middleware = PageCacheMiddleware(self.view)
+        for request in (
+            self.factory.get('/about/?utm_source=x'),
+            self.factory.post('/about/'),
+            self.factory.get('/not-a-page/'),
+        ):
+            middleware(request)
+            middleware(request)
+        request = self.factory.get('/about/')
+        request.COOKIES['sessionid'] = 'abc'
+        middleware(request)
+        middleware(request)
+        self.assertEqual(self.renders, 8)
+
+    def test_private_responses_are_not_stored(self):
+        def view(request):
+            self.renders += 1
+            response = HttpResponse('personal')
+            response.set_cookie('seen', '1')
+            return response
+
+        middleware = PageCacheMiddleware(view)
+        middleware(self.factory.get('/about/'))
+        self.assertFalse(middleware(self.factory.get('/about/')).has_header('X-Page-Cache'))
+        self.assertEqual(self.renders, 2)
+
+
+class DeployVersionTests(SimpleTestCase):
+    def test_changes_with_templates(self):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        (directory / 'page.html').write_text('one')
+        templates = [{'BACKEND': 'django.template.backends.django.DjangoTemplates', 'DIRS': [directory]}]
+        with override_settings(TEMPLATES=templates):
+            first = compute_deploy_version()
+            self.assertEqual(compute_deploy_version(), first)
+            (directory / 'page.html').write_text('two')
+            self.assertNotEqual(compute_deploy_version(), first)
+
+    def test_changes_with_settings(self):
+        first = compute_deploy_version()
+        with override_settings(GA_TRACKING_ID='G-OTHER'):
+            self.assertNotEqual(compute_deploy_version(), first)
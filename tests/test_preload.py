@@ -0,0 +1,104 @@
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.assets import SiteResolver
+from core.middleware import PreloadMiddleware
+from core.preload import Preload, critical_assets, preload_links
+from core.static_build import PageContext
+
+PAGE = """<html><head><meta charset="utf-8">
+<link rel="stylesheet" href="css/site.css">
+</head><body>
+<nav class="navbar"><img src="images/logo.png" alt=""><img src="images/lazy.png" loading="lazy" alt=""></nav>
+<section class="hero" style="background-image: url('images/hero.jpg'), url(data:image/webp;base64,AAAA)"><h1>Hi</h1></section>
+<section class="below"><img src="images/below.png" alt=""></section>
+</body></html>
+"""
+
+CSS = """
+@font-face { font-family: "Brand"; src: url("../fonts/brand.woff2") format("woff2"), url("../fonts/brand.woff") format("woff"); }
+@font-face { font-family: "Unused"; src: url("../fonts/unused.woff2"); }
+.hero h1 { font-family: Brand, sans-serif; }
+.navbar { background: url("../images/nav.jpg"); }
+.below { background: url("../images/below.jpg"); }
+.missing { background: url("../images/missing.jpg"); }
+"""
+
+
+class PreloadTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        for name in ('images/logo.png', 'images/lazy.png', 'images/hero.jpg', 'images/below.png',
+                     'images/nav.jpg', 'images/below.jpg', 'fonts/brand.woff2', 'fonts/brand.woff'):
+            (self.root / name).parent.mkdir(parents=True, exist_ok=True)
+            (self.root / name).write_bytes(b'x')
+        (self.root / 'css').mkdir()
+        (self.root / 'css' / 'site.css').write_text(CSS)
+        self.resolver = SiteResolver(self.root)
+
+    def resolve(self, href):
+        return self.resolver.resolve(href, 'index.html')
+
+    def test_critical_assets(self):
+        self.assertEqual(critical_assets(PAGE, self.resolve, limit=10), [
+            Preload('images/hero.jpg', 'image'),
+            Preload('images/logo.png', 'image'),
+            Preload('images/nav.jpg', 'image'),
+            Preload('fonts/brand.woff2', 'font'),
+        ])
+        self.assertEqual(len(critical_assets(PAGE, self.resolve, limit=2)), 2)
+
+    def test_header_and_tag(self):
+        font = Preload('/static/fonts/brand.woff2', 'font')
+        self.assertEqual(font.header(), '</static/fonts/brand.woff2>; rel=preload; as=font; type="font/woff2"; crossorigin')
+        self.assertEqual(font.tag(), '<link rel="preload" href="/static/fonts/brand.woff2" as="font" type="font/woff2" crossorigin>')
+
+    def test_preload_links_processor(self):
+        html = preload_links(PAGE, PageContext('index.html', self.resolver, self.root / 'out'))
+        self.assertIn('<meta charset="utf-8"><link rel="preload" href="images/hero.jpg" as="image">', html)
+        self.assertEqual(preload_links(html, PageContext('index.html', self.resolver, self.root / 'out')), html)
+
+
+class PreloadMiddlewareTests(SimpleTestCase):
+    def test_adds_link_header_for_public_pages_and_caches_it(self):
+        def view(request):
+            return HttpResponse(
+                '<html><head></head><body><section style="background-image: '
+                'url(/static/images/hero_blue_waves_background.jpg)"></section></body></html>'
+            )
+
+        middleware = PreloadMiddleware(view)
+        factory = RequestFactory()
+        response = middleware(factory.get('/'))
+        self.assertEqual(response['Link'], '</static/images/hero_blue_waves_background.jpg>; rel=preload; as=image')
+        self.assertEqual(middleware.links, {'/': response['Link']})
+
+        self.assertFalse(middleware(factory.get('/not-a-page/')).has_header('Link'))
+        self.assertFalse(middleware(factory.post('/')).has_header('Link'))
+
+    def test_stylesheet_assets_point_at_hashed_names(self):
+        root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, root)
+        (root / 'css').mkdir()
+        (root / 'css' / 'site.css').write_text('.hero { background: url("../images/hero.jpg"); }')
+        (root / 'images').mkdir()
+        (root / 'images' / 'hero.jpg').write_bytes(b'x')
+        hashed_files = {'css/site.css': 'css/site.1a2b.css', 'images/hero.jpg': 'images/hero.3c4d.jpg'}
+
+        def view(request):
+            return HttpResponse(
+                '<html><head><link rel="stylesheet" href="/static/css/site.1a2b.css"></head>'
+                '<body><section class="hero"></section></body></html>'
+            )
+
+        with override_settings(STATICFILES_DIRS=[root]), \
+                mock.patch.object(staticfiles_storage, 'hashed_files', hashed_files):
+            response = PreloadMiddleware(view)(RequestFactory().get('/'))
+        self.assertEqual(response['Link'], '</static/images/hero.3c4d.jpg>; rel=preload; as=image')
@@ -0,0 +1,76 @@
+import gzip
+import json
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase, override_settings
+
+from core.fingerprint import load_asset_manifest
+from core.service_worker import SERVICE_WORKER_NAME, register_service_worker
+from core.static_build import SiteDirectoryBuilder
+
+PAGE = """<html><head><link rel="stylesheet" href="css/site.css"><script src="js/site.js"></script></head>
+<body><img src="images/logo.png" srcset="images/logo.png 1x, images/logo@2x.png 2x" alt=""></body></html>
+"""
+
+
+@override_settings(STATIC_BUILD_PROCESSORS=[])
+class ServiceWorkerTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        self.source = self.root / 'site'
+        self.output = self.root / 'dist'
+        for directory in ('css', 'images', 'js'):
+            (self.source / directory).mkdir(parents=True)
+        (self.source / 'css' / 'site.css').write_text('body { background: url("../images/bg.jpg"); }')
+        (self.source / 'js' / 'site.js').write_text('console.log(1);')
+        (self.source / 'images' / 'bg.jpg').write_bytes(b'jpg')
+        (self.source / 'images' / 'logo.png').write_bytes(b'png')
+        (self.source / 'images' / 'logo@2x.png').write_bytes(b'png2x')
+        (self.source / 'index.html').write_text(PAGE)
+
+    def build(self, **kwargs):
+        return SiteDirectoryBuilder(self.source, self.output, fingerprint=True, **kwargs).build()
+
+    def precache(self):
+        script = (self.output / SERVICE_WORKER_NAME).read_text()
+        return json.loads(re.search(r'const PRECACHE = (\[.*?\]);', script, re.S).group(1))
+
+    def test_register_service_worker(self):
+        self.assertEqual(
+            register_service_worker('<body></body>', 'sw.js'),
+            "<body><script>if ('serviceWorker' in navigator) { addEventListener('load', function () { "
+            "navigator.serviceWorker.register('sw.js'); }); }</script>\n</body>",
+        )
+
+    def test_precaches_pages_and_their_shell(self):
+        builder = self.build(service_worker=True)
+        paths = load_asset_manifest(self.output)
+        self.assertEqual(self.precache(), sorted(['./', 'index.html', paths['css/site.css'], paths['js/site.js']]))
+        script = (self.output / SERVICE_WORKER_NAME).read_text()
+        self.assertIn(f'const VERSION = "{builder.worker_version}";', script)
+        # images are cached as pages use them
+        self.assertIn("request.destination === 'image'", script)
+        self.assertIn("register('sw.js')", (self.output / 'index.html').read_text())
+        self.assertTrue((self.output / 'sw.js.gz').exists())
+
+    def test_version_follows_content(self):
+        first = self.build(service_worker=True).worker_version
+        self.assertEqual(self.build(service_worker=True).worker_version, first)
+        (self.source / 'images' / 'bg.jpg').write_bytes(b'new jpg')
+        self.assertNotEqual(self.build(service_worker=True).worker_version, first)
+
+    def test_rebuilt_worker_is_compressed_again(self):
+        self.build(service_worker=True)
+        (self.source / 'index.html').write_text(PAGE.replace('<body>', '<body><h1>New</h1>'))
+        self.build(service_worker=True)
+        script = (self.output / SERVICE_WORKER_NAME).read_bytes()
+        self.assertEqual(gzip.decompress((self.output / 'sw.js.gz').read_bytes()), script)
+
+    def test_off_by_default(self):
+        self.build()
+        self.assertFalse((self.output / SERVICE_WORKER_NAME).exists())
+        self.assertNotIn('serviceWorker', (self.output / 'index.html').read_text())
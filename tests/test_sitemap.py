@@ -0,0 +1,67 @@
+import datetime
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase, override_settings
+
+from core.sitemap import (
+    LASTMOD_INDEX_NAME, build_django_sitemap, generated_file, lastmods, load_index, robots_txt, site_page_hashes,
+)
+from core.static_build import SiteDirectoryBuilder
+
+MONDAY, TUESDAY = datetime.date(2026, 10, 12), datetime.date(2026, 10, 13)
+
+
+class LastmodTests(SimpleTestCase):
+    def test_lastmod_moves_only_with_the_hash(self):
+        index = {}
+        self.assertEqual(lastmods({'/': 'a', '/about/': 'b'}, index, MONDAY), {'/': '2026-10-12', '/about/': '2026-10-12'})
+        self.assertEqual(lastmods({'/': 'a', '/about/': 'c'}, index, TUESDAY), {'/': '2026-10-12', '/about/': '2026-10-13'})
+        lastmods({'/': 'a'}, index, TUESDAY)
+        self.assertEqual(set(index), {'/'})
+
+    def test_site_page_hashes(self):
+        self.assertEqual(set(site_page_hashes({'index.html': '', 'docs/index.html': '', 'gilbarco.html': ''})), {'', 'docs/', 'gilbarco.html'})
+
+    def test_robots_txt(self):
+        self.assertEqual(robots_txt('https://x/sitemap.xml'), 'User-agent: *\nDisallow:\n\nSitemap: https://x/sitemap.xml\n')
+
+
+class SitemapBuildTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        override = override_settings(SITEMAP_ROOT=self.root / 'sitemap')
+        override.enable()
+        self.addCleanup(override.disable)
+        generated_file.cache_clear()
+        self.addCleanup(generated_file.cache_clear)
+
+    def test_django_sitemap_is_served_from_memory_with_an_etag(self):
+        build_django_sitemap()
+        self.assertIn('/about/', load_index(self.root / 'sitemap' / LASTMOD_INDEX_NAME)['django'])
+        response = self.client.get('/sitemap.xml')
+        self.assertEqual(response['Content-Type'], 'application/xml')
+        self.assertIn(b'<loc>https://solathomas.com/about/</loc><lastmod>', response.content)
+        self.assertEqual(self.client.get('/sitemap.xml', headers={'If-None-Match': response['ETag']}).status_code, 304)
+        robots = self.client.get('/robots.txt')
+        self.assertIn(b'Disallow: /health/', robots.content)
+        self.assertIn(b'Sitemap: https://solathomas.com/sitemap.xml', robots.content)
+
+    def test_unbuilt_sitemap_has_no_lastmod(self):
+        with self.assertLogs('core.sitemap', 'WARNING'):
+            content = self.client.get('/sitemap.xml').content
+        self.assertIn(b'<loc>https://solathomas.com/</loc>', content)
+        self.assertNotIn(b'<lastmod>', content)
+
+    def test_static_site_sitemap(self):
+        source = self.root / 'site'
+        source.mkdir()
+        (source / 'index.html').write_text('<html><body>Home</body></html>')
+        (source / 'gilbarco.html').write_text('<html><body>Gilbarco</body></html>')
+        SiteDirectoryBuilder(source, self.root / 'out', base_url='https://example.com/').build()
+        sitemap = (self.root / 'out' / 'sitemap.xml').read_text()
+        self.assertIn('<loc>https://example.com/</loc>', sitemap)
+        self.assertIn('<loc>https://example.com/gilbarco.html</loc>', sitemap)
+        self.assertIn('Sitemap: https://example.com/sitemap.xml', (self.root / 'out' / 'robots.txt').read_text())
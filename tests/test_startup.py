@@ -0,0 +1,45 @@
+import sys
+
+from django.test import SimpleTestCase
+
+from core.lazy import lazy_import
+from core.startup import PHASE_MARKER, flatten, parse_importtime, profile_startup
+
+IMPORTTIME = f"""\
+import time: self [us] | cumulative | imported package
+{PHASE_MARKER}setup
+import time:       100 |        100 |     c
+import time:       200 |        300 |   b
+import time:       400 |        700 | a
+import time:        50 |         50 | d
+{PHASE_MARKER}urlconf
+import time:      3000 |       3000 | e
+""".splitlines()
+
+
+class StartupProfileTests(SimpleTestCase):
+    def test_parse_importtime(self):
+        phases = parse_importtime(IMPORTTIME)
+        self.assertEqual([entry.module for entry in phases['setup']], ['a', 'd'])
+        self.assertEqual(phases['setup'][0].cumulative_ms, 0.7)
+        self.assertEqual([child.module for child in phases['setup'][0].children], ['b'])
+        self.assertEqual(phases['setup'][0].children[0].children[0].module, 'c')
+        self.assertEqual([entry.module for entry in flatten(phases['setup'], 1, 0.2)], ['a', 'b'])
+        self.assertEqual(phases['urlconf'][0].self_ms, 3.0)
+
+    def test_profile_startup_leaves_optional_dependencies_unimported(self):
+        timings, imports = profile_startup()
+        self.assertEqual(set(timings), {'setup', 'urlconf'})
+        imported = {entry.module for phase in imports.values() for entry in flatten(phase, 99, 0)}
+        self.assertIn('core.views', imported)
+        self.assertFalse({'sendgrid', 'PIL', 'stripe'} & imported)
+
+
+class LazyImportTests(SimpleTestCase):
+    def test_imports_on_first_use(self):
+        module = lazy_import('json.tool')
+        sys.modules.pop('json.tool', None)
+        self.assertFalse(module.loaded)
+        self.assertTrue(callable(module.main))
+        self.assertTrue(module.loaded)
+        self.assertIn('json.tool', sys.modules)
@@ -0,0 +1,62 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from core.routes import public_urls
+from core.static_build import MANIFEST_NAME, StaticSiteBuilder, output_path
+
+
+class PublicUrlsTests(SimpleTestCase):
+    def test_lists_parameterless_pages(self):
+        urls = dict(public_urls())
+        self.assertEqual(urls['/'], 'core:home')
+        self.assertEqual(urls['/services/home-services/'], 'services:home_services')
+        self.assertNotIn('/health/', urls)
+        self.assertFalse(any('<' in url for url in urls))
+
+    def test_output_path(self):
+        self.assertEqual(output_path('/'), 'index.html')
+        self.assertEqual(output_path('/about/'), 'about/index.html')
+        self.assertEqual(output_path('/robots.txt'), 'robots.txt')
+        self.assertEqual(output_path('/gilbarco'), 'gilbarco.html')
+
+
+class StaticSiteBuilderTests(SimpleTestCase):
+    def setUp(self):
+        self.output = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.output)
+        self.urls = [('/', 'core:home'), ('/about/', 'core:about')]
+
+    def test_build_writes_pages_and_assets(self):
+        builder = StaticSiteBuilder(self.output).build(self.urls)
+        self.assertEqual(builder.rendered, ['/', '/about/'])
+        self.assertIn('Sola-Thomas', (self.output / 'index.html').read_text())
+        self.assertTrue((self.output / 'about' / 'index.html').exists())
+        self.assertTrue(list((self.output / 'static' / 'bundles').glob('*.css')))
+
+        manifest = json.loads((self.output / MANIFEST_NAME).read_text())
+        inputs = manifest['pages']['/']['inputs']
+        self.assertIn('templates/base.html', inputs)
+        self.assertIn('core/templates/core/home.html', inputs)
+        self.assertIn('static/css/theme.css', inputs)
+
+    def test_rebuild_skips_unchanged_pages(self):
+        StaticSiteBuilder(self.output).build(self.urls)
+
+        manifest_path = self.output / MANIFEST_NAME
+        manifest = json.loads(manifest_path.read_text())
+        manifest['pages']['/about/']['inputs']['templates/base.html'] = 'stale'
+        manifest_path.write_text(json.dumps(manifest))
+
+        builder = StaticSiteBuilder(self.output).build(self.urls)
+        self.assertEqual(builder.rendered, ['/about/'])
+        self.assertEqual(builder.skipped, ['/'])
+
+    def test_removes_pages_no_longer_routed(self):
+        StaticSiteBuilder(self.output).build(self.urls)
+        builder = StaticSiteBuilder(self.output).build(self.urls[:1])
+        self.assertEqual(builder.removed, ['/about/'])
+        self.assertFalse((self.output / 'about' / 'index.html').exists())
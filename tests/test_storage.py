@@ -0,0 +1,71 @@
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+
+class CompressedManifestStorageTests(SimpleTestCase):
+    def setUp(self):
+        self.static_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.static_root)
+        self.source = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.source)
+        (self.source / 'css').mkdir()
+        (self.source / 'images').mkdir()
+        (self.source / 'images' / 'logo.png').write_bytes(b'\x89PNG fake')
+        (self.source / 'css' / 'site.css').write_text(
+            'body { background: url("../images/logo.png"); }\n'
+            '.hero { background: url("../images/never-committed.jpg"); }\n' * 20
+        )
+        settings = override_settings(STATIC_ROOT=self.static_root, STATICFILES_DIRS=[self.source])
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_collectstatic_fingerprints_and_compresses(self):
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+        manifest = json.loads((self.static_root / 'staticfiles.json').read_text())
+        hashed_css = manifest['paths']['css/site.css']
+        self.assertRegex(hashed_css, r'^css/site\.[0-9a-f]{12}\.css$')
+        for suffix in ('', '.gz', '.br'):
+            self.assertTrue((self.static_root / (hashed_css + suffix)).exists(), suffix)
+
+        css = (self.static_root / hashed_css).read_text()
+        self.assertIn(manifest['paths']['images/logo.png'].split('/')[-1], css)
+        self.assertIn('url("../images/never-committed.jpg")', css)
+
+    def test_url_uses_hashed_name_and_tolerates_unknown_files(self):
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+        self.assertRegex(staticfiles_storage.url('css/site.css'), r'^/static/css/site\.[0-9a-f]{12}\.css$')
+        with self.assertLogs('core.storage', 'WARNING'):
+            self.assertEqual(staticfiles_storage.url('css/missing.css'), '/static/css/missing.css')
+
+    def test_second_collect_skips_unchanged_files(self):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        compressed = self.static_root / 'staticfiles.compressed.json'
+        first = json.loads(compressed.read_text())
+        self.assertTrue(first)
+
+        with mock.patch('core.storage.compress_file') as compress_file:
+            call_command('collectstatic', interactive=False, verbosity=0)
+        compress_file.assert_not_called()
+        self.assertEqual(json.loads(compressed.read_text()), first)
+
+    def test_changed_content_is_recopied_regardless_of_mtime(self):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        source = self.source / 'css' / 'site.css'
+        stat = source.stat()
+        source.write_text('body { color: red; }\n' * 20)
+        os.utime(source, (stat.st_atime, stat.st_mtime - 3600))
+
+        call_command('collectstatic', interactive=False, verbosity=0)
+        self.assertIn('color: red', (self.static_root / 'css' / 'site.css').read_text())
+        manifest = json.loads((self.static_root / 'staticfiles.json').read_text())
+        self.assertTrue((self.static_root / (manifest['paths']['css/site.css'] + '.br')).exists())
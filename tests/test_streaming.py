@@ -0,0 +1,108 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.core.cache import caches
+from django.http import HttpResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.middleware import PageCacheMiddleware, PreloadMiddleware
+from core.streaming import render_chunks, stream_render
+
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'pages': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-streaming-pages'},
+}
+
+
+class StreamRenderTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        (self.root / 'base.html').write_text(
+            '<html><head><title>{% block title %}Site{% endblock %}</title></head>\n'
+            '<body><nav>{{ name }}</nav>{% block content %}{% endblock %}<footer></footer></body></html>'
+        )
+        (self.root / 'page.html').write_text(
+            '{% extends "base.html" %}{% block title %}Page{% endblock %}'
+            '{% block content %}<main>{% include "part.html" %}</main>{% endblock %}'
+        )
+        (self.root / 'part.html').write_text('<p>{{ name }}</p>')
+        (self.root / 'broken.html').write_text(
+            '{% extends "base.html" %}{% block content %}{% include "missing.html" %}{% endblock %}'
+        )
+        templates = [{'BACKEND': 'django.template.backends.django.DjangoTemplates', 'DIRS': [self.root]}]
+        override = override_settings(TEMPLATES=templates)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.request = RequestFactory().get('/')
+
+    def test_head_comes_first(self):
+        chunks = list(render_chunks('page.html', {'name': 'Ann'}))
+        self.assertEqual(chunks, [
+            '<html><head><title>Page</title></head>\n<body><nav>',
+            'Ann</nav>',
+            '<main><p>Ann</p></main>',
+            '<footer></footer></body></html>',
+        ])
+        self.assertEqual(''.join(chunks), render_to_string('page.html', {'name': 'Ann'}))
+
+    def test_stream_render(self):
+        response = stream_render(self.request, 'page.html', {'name': 'Ann'})
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response['Content-Type'], 'text/html; charset=utf-8')
+        self.assertEqual(b''.join(response.streaming_content), render_to_string('page.html', {'name': 'Ann'}).encode())
+
+    def test_error_after_the_head_cuts_the_page_short(self):
+        response = stream_render(self.request, 'broken.html')
+        with self.assertLogs('core.streaming', 'ERROR'):
+            content = b''.join(response.streaming_content)
+        self.assertTrue(content.startswith(b'<html><head>'))
+        self.assertNotIn(b'<footer>', content)
+
+    @override_settings(CACHES=CACHES, PAGE_CACHE_ALIAS='pages')
+    def test_page_cut_short_is_never_cached(self):
+        caches['pages'].clear()
+        found = []
+        middleware = PreloadMiddleware(PageCacheMiddleware(lambda request: stream_render(request, 'broken.html')))
+        middleware.find_links = lambda *args: found.append(args)
+        for _request in range(2):
+            response = middleware(RequestFactory().get('/about/'))
+            self.assertEqual(response['X-Page-Cache'], 'miss')
+            with self.assertLogs('core.streaming', 'ERROR'):
+                b''.join(response.streaming_content)
+        self.assertEqual(found, [])
+
+    @override_settings(STREAMING_RENDER=False)
+    def test_disabled(self):
+        self.assertIsInstance(stream_render(self.request, 'page.html'), HttpResponse)
+
+
+@override_settings(CACHES=CACHES, PAGE_CACHE_ALIAS='pages')
+class StreamedResponseMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        caches['pages'].clear()
+        self.factory = RequestFactory()
+
+    def view(self, request):
+        return StreamingHttpResponse(iter(['<html><head></head>', '<body>Hi</body></html>']))
+
+    def test_page_cache_stores_streamed_pages_once_sent(self):
+        middleware = PageCacheMiddleware(self.view)
+        unfinished = middleware(self.factory.get('/about/'))
+        self.assertEqual(middleware(self.factory.get('/about/'))['X-Page-Cache'], 'miss')
+        next(iter(unfinished.streaming_content))
+        first = middleware(self.factory.get('/about/'))
+        self.assertEqual(b''.join(first.streaming_content), b'<html><head></head><body>Hi</body></html>')
+        second = middleware(self.factory.get('/about/'))
+        self.assertEqual(second['X-Page-Cache'], 'hit')
+        self.assertEqual(second.content, b'<html><head></head><body>Hi</body></html>')
+
+    def test_preload_links_worked_out_after_the_first_stream(self):
+        middleware = PreloadMiddleware(self.view)
+        middleware.find_links = lambda path, content, charset: middleware.links.setdefault(path, '</a.jpg>; rel=preload')
+        first = middleware(self.factory.get('/about/'))
+        self.assertFalse(first.has_header('Link'))
+        b''.join(first.streaming_content)
+        self.assertEqual(middleware(self.factory.get('/about/'))['Link'], '</a.jpg>; rel=preload')
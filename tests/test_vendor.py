@@ -0,0 +1,108 @@
+import shutil
+import tempfile
+import unittest
+from importlib.util import find_spec
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from core.css import Inventory
+from core.vendor import BOOTSTRAP_CDN, FONT_AWESOME_CDN, download, install, rewrite_references, subset_icon_css
+
+ICONS_CSS = (
+    '.fa,.fas{font-family:"Font Awesome 6 Free";font-weight:900}'
+    '.fa-spin{animation:fa-spin 2s infinite linear}'
+    '.fa-home:before,.fa-house:before{content:"\\f015"}'
+    '.fa-phone:before{content:"\\f095"}'
+    '@font-face{font-family:"Font Awesome 6 Free";src:url(../webfonts/fa-solid-900.woff2) format("woff2")}'
+)
+
+
+class VendorTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        self.fetched = []
+
+    def fetch(self, url):
+        self.fetched.append(url)
+        return ICONS_CSS.encode() if url.endswith('all.min.css') else b'/* ' + url.encode() + b' */'
+
+    def test_download_follows_stylesheet_references_once(self):
+        names = download(self.root, fetch=self.fetch)
+
+        self.assertIn('fontawesome/webfonts/fa-solid-900.woff2', names)
+        self.assertIn(FONT_AWESOME_CDN + 'webfonts/fa-solid-900.woff2', self.fetched)
+        self.assertTrue((self.root / 'bootstrap' / 'js' / 'bootstrap.bundle.min.js').exists())
+
+        self.fetched.clear()
+        download(self.root, fetch=self.fetch)
+        self.assertEqual(self.fetched, [])
+
+    def test_subset_icon_css(self):
+        css, codepoints = subset_icon_css(ICONS_CSS, Inventory(tags={'i'}, classes={'fas', 'fa-home'}))
+
+        self.assertIn('.fa-home:before{content:"\\f015"}', css)
+        self.assertNotIn('fa-phone', css)
+        self.assertNotIn('fa-house', css)
+        self.assertNotIn('fa-spin{', css)
+        self.assertIn('@font-face', css)
+        self.assertEqual(codepoints, {0xf015})
+
+    def test_install_copies_vendor_files(self):
+        (self.root / 'cache' / 'bootstrap' / 'css').mkdir(parents=True)
+        (self.root / 'cache' / 'bootstrap' / 'css' / 'bootstrap.min.css').write_text('.btn{color:red}')
+        install(self.root / 'cache', ['bootstrap/css/bootstrap.min.css'], [self.root / 'a', self.root / 'b'], Inventory())
+
+        for target in ('a', 'b'):
+            self.assertEqual((self.root / target / 'bootstrap' / 'css' / 'bootstrap.min.css').read_text(), '.btn{color:red}')
+
+    @unittest.skipUnless(find_spec('fontTools'), "fontTools is not installed")
+    def test_install_subsets_icon_fonts(self):
+        from fontTools.fontBuilder import FontBuilder
+
+        font = FontBuilder(1000, isTTF=True)
+        glyphs = ['.notdef', 'house', 'phone']
+        font.setupGlyphOrder(glyphs)
+        font.setupCharacterMap({0xf015: 'house', 0xf095: 'phone'})
+        font.setupGlyf({name: _empty_glyph() for name in glyphs})
+        font.setupHorizontalMetrics({name: (1000, 0) for name in glyphs})
+        font.setupHorizontalHeader()
+        font.setupNameTable({'familyName': 'Icons', 'styleName': 'Solid'})
+        font.setupOS2()
+        font.setupPost()
+        cache = self.root / 'cache' / 'fontawesome'
+        (cache / 'css').mkdir(parents=True)
+        (cache / 'webfonts').mkdir()
+        (cache / 'css' / 'all.min.css').write_text(ICONS_CSS.replace('.woff2', '.ttf'))
+        font.save(cache / 'webfonts' / 'fa-solid-900.ttf')
+
+        names = ['fontawesome/css/all.min.css', 'fontawesome/webfonts/fa-solid-900.ttf']
+        install(self.root / 'cache', names, [self.root / 'out'], Inventory(classes={'fas', 'fa-home'}))
+
+        from fontTools.ttLib import TTFont
+        subset = TTFont(self.root / 'out' / 'fontawesome' / 'webfonts' / 'fa-solid-900.ttf')
+        self.assertEqual(set(subset.getBestCmap()), {0xf015})
+
+    def test_rewrite_references(self):
+        html = (
+            f'<link href="{BOOTSTRAP_CDN}css/bootstrap.min.css" rel="stylesheet">\n'
+            f'<link rel="stylesheet" href="{FONT_AWESOME_CDN}css/all.min.css" integrity="sha512-x" '
+            f'crossorigin="anonymous" referrerpolicy="no-referrer" />\n'
+            f'<script src="{BOOTSTRAP_CDN}js/bootstrap.bundle.min.js"></script>\n'
+            '<script async src="https://www.googletagmanager.com/gtag/js?id=G-1"></script>'
+        )
+        rewritten = rewrite_references(html, lambda name: f'vendor/{name}')
+
+        self.assertEqual(rewritten, (
+            '<link href="vendor/bootstrap/css/bootstrap.min.css" rel="stylesheet">\n'
+            '<link rel="stylesheet" href="vendor/fontawesome/css/all.min.css" />\n'
+            '<script src="vendor/bootstrap/js/bootstrap.bundle.min.js"></script>\n'
+            '<script async src="https://www.googletagmanager.com/gtag/js?id=G-1"></script>'
+        ))
+
+
+def _empty_glyph():
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+    return TTGlyphPen(None).glyph()
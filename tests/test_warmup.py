@@ -0,0 +1,35 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.middleware import PageCacheMiddleware
+from core.warmup import compile_templates, import_apps, render_public_pages
+
+
+class WarmUpTests(SimpleTestCase):
+    def test_import_apps(self):
+        self.assertGreater(import_apps(), 0)
+
+    def test_compile_templates_reports_broken_ones(self):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        (directory / 'good.html').write_text('{% if x %}x{% endif %}')
+        (directory / 'bad.html').write_text('{% if x %}never closed')
+        templates = [{'BACKEND': 'django.template.backends.django.DjangoTemplates', 'DIRS': [directory]}]
+        with override_settings(TEMPLATES=templates), self.assertLogs('core.warmup', 'WARNING'):
+            self.assertEqual(compile_templates(), (1, 1))
+
+    def test_render_public_pages(self):
+        self.assertEqual(render_public_pages(), [])
+
+    def test_render_public_pages_fills_the_entries_real_traffic_hits(self):
+        cache = caches[settings.PAGE_CACHE_ALIAS]
+        cache.clear()
+        render_public_pages()
+        request = RequestFactory(HTTP_HOST=settings.SITE_DOMAIN).get('/about/', secure=True)
+        with override_settings(ALLOWED_HOSTS=[settings.SITE_DOMAIN]):
+            self.assertIsNotNone(cache.get(PageCacheMiddleware(None).key(request)))